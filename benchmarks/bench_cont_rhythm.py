@@ -0,0 +1,60 @@
+"""Compares batched and iterative generation of ContRhythm variations.
+
+Run from the root of the repository with
+    python -m benchmarks.bench_cont_rhythm
+"""
+import itertools
+import timeit
+
+from efficient_rhythms import er_misc_funcs
+from efficient_rhythms.er_rhythm.cont_rhythm import ContRhythm
+
+from tests.rhythm.cont_rhythm_reference import generate_iteratively
+
+NUM_VARS = (8, 64, 512)
+NUM_NOTES = (8, 32)
+DUR_DENSITIES = (0.3, 0.8, 1.0)
+VARY_CONSISTENTLY = (True, False)
+REPEATS = 5
+
+
+def _time(generate, dur_density, num_notes, num_vars, vary_consistently):
+    def _run():
+        cr = ContRhythm(
+            dur_density,
+            4.0 * num_notes / 8,  # rhythm_len
+            0.25,  # min_dur
+            num_notes,
+            0.5,  # increment
+            True,  # overlap
+            num_vars,
+            vary_consistently=vary_consistently,
+            var_palindrome=False,
+        )
+        generate(cr)
+
+    return min(timeit.repeat(_run, number=1, repeat=REPEATS))
+
+
+def main():
+    er_misc_funcs.set_seed(0)
+    print(
+        f"{'num_vars':>8} {'notes':>5} {'density':>7} {'consist':>7} "
+        f"{'iterative':>10} {'batched':>10} {'speedup':>7}"
+    )
+    product = itertools.product(
+        NUM_VARS, NUM_NOTES, DUR_DENSITIES, VARY_CONSISTENTLY
+    )
+    for num_vars, num_notes, dur_density, vary_consistently in product:
+        args = (dur_density, num_notes, num_vars, vary_consistently)
+        iterative = _time(generate_iteratively, *args)
+        batched = _time(ContRhythm.generate, *args)
+        print(
+            f"{num_vars:>8} {num_notes:>5} {dur_density:>7} "
+            f"{str(vary_consistently):>7} {iterative:>10.5f} {batched:>10.5f} "
+            f"{iterative / batched:>6.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
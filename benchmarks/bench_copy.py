@@ -0,0 +1,56 @@
+"""Compares Score.copy() with the generic copy.deepcopy() that it replaced.
+
+Run from the root of the repository with
+    python -m benchmarks.bench_copy
+"""
+import contextlib
+import copy
+import timeit
+
+from efficient_rhythms import er_classes
+
+from .suite import _num_notes, _score
+
+NOTE_COUNTS = (5000, 50000)
+REPEATS = 5
+
+
+@contextlib.contextmanager
+def _generic_deepcopy():
+    # Without the __deepcopy__ methods, copy.deepcopy() walks every object
+    #   attribute by attribute, as it did before Score.copy() etc. existed
+    classes = (
+        er_classes.Note,
+        er_classes.Voice,
+        er_classes.VoiceList,
+        er_classes.Score,
+    )
+    methods = {cls: cls.__deepcopy__ for cls in classes}
+    for cls in classes:
+        del cls.__deepcopy__
+    try:
+        yield
+    finally:
+        for cls, method in methods.items():
+            cls.__deepcopy__ = method
+
+
+def main():
+    print(f"{'notes':>6} {'deepcopy':>10} {'copy':>10} {'speedup':>8}")
+    for note_count in NOTE_COUNTS:
+        _, score = _score(note_count)
+        with _generic_deepcopy():
+            deepcopy = min(
+                timeit.repeat(
+                    lambda: copy.deepcopy(score), number=1, repeat=REPEATS
+                )
+            )
+        structural = min(timeit.repeat(score.copy, number=1, repeat=REPEATS))
+        print(
+            f"{_num_notes(score):>6} {deepcopy:>10.4f} {structural:>10.4f} "
+            f"{deepcopy / structural:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Times importing efficient_rhythms.__main__ and lists the slowest imports.
+
+Run from the root of the repository with
+    python -m benchmarks.bench_import
+
+Note that -X importtime only reports modules imported by import statements
+of the form `import x` or `from x import y`, so modules imported with
+`from . import x` are attributed to the module that imports them.
+"""
+import subprocess
+import sys
+
+REPEATS = 5
+N_SLOWEST = 15
+
+
+def _import_times(module):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    # Lines look like
+    #   import time: self [us] | cumulative | imported package
+    #   import time:       241 |     102052 |       mspell
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        try:
+            times.append((int(cumulative_us), int(self_us), name.strip()))
+        except ValueError:
+            # header line
+            continue
+    return times
+
+
+def main():
+    module = "efficient_rhythms.__main__"
+    totals = []
+    for _ in range(REPEATS):
+        times = _import_times(module)
+        totals.append(next(t for t, _, name in times if name == module))
+    print(f"import {module}: {min(totals) / 1000:.1f} ms (best of {REPEATS})")
+    print(f"{'cumulative ms':>13} {'self ms':>8}  module")
+    for cumulative_us, self_us, name in sorted(times, reverse=True)[
+        :N_SLOWEST
+    ]:
+        print(f"{cumulative_us / 1000:>13.1f} {self_us / 1000:>8.1f}  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Compares er_rhythm.get_onset_order() with the loop-based merge it replaced.
+
+Run from the root of the repository with
+    python -m benchmarks.bench_onset_order
+"""
+import fractions
+import timeit
+
+from efficient_rhythms import er_misc_funcs
+from efficient_rhythms import er_rhythm
+from efficient_rhythms import er_settings
+
+NUM_VOICES = (2, 8, 16)
+PATTERN_LENS = (4, 16)
+REPEATS = 20
+
+
+def _loop_onset_order(er):
+    # The previous implementation of get_onset_order(), for comparison
+    end_time = max(er.pattern_len)
+
+    class NoMoreAttacksError(Exception):
+        pass
+
+    def _get_next_onset():
+        next_onset = end_time ** 2
+        increment_i = -1
+        for i in er.voice_order:
+            try:
+                next_onset_in_voice = onsets[i][voice_is[i]]
+            except IndexError:
+                continue
+            if next_onset_in_voice < next_onset:
+                next_onset = next_onset_in_voice
+                increment_i = i
+        if next_onset == end_time ** 2:
+            raise NoMoreAttacksError()
+        voice_is[increment_i] += 1
+        return next_onset, increment_i
+
+    onsets = [
+        rhythm.onsets_between(0, pattern_len)
+        for (rhythm, pattern_len) in zip(er.rhythms, er.pattern_len)
+    ]
+    voice_is = [0 for i in range(er.num_voices)]
+    ordered_onsets = []
+    while True:
+        try:
+            next_onset, voice_i = _get_next_onset()
+        except NoMoreAttacksError:
+            break
+        if next_onset >= end_time:
+            break
+        ordered_onsets.append((voice_i, fractions.Fraction(next_onset)))
+    return ordered_onsets
+
+
+def _get_er(num_voices, pattern_len):
+    er = er_settings.get_settings(
+        {
+            "num_voices": num_voices,
+            "pattern_len": pattern_len,
+            "onset_density": 1.0,
+            "min_dur": 0.25,
+            "voice_ranges": [(36, 84) for _ in range(num_voices)],
+            "choir_assignments": [0 for _ in range(num_voices)],
+        },
+        silent=True,
+    )
+    er_rhythm.init_rhythms(er)
+    er_rhythm.rhythms_handler(er)
+    return er
+
+
+def main():
+    er_misc_funcs.set_seed(0)
+    print(
+        f"{'voices':>6} {'pattern_len':>11} {'onsets':>6} {'loop':>10} "
+        f"{'sorted':>10} {'sorted+cast':>11}"
+    )
+    for num_voices in NUM_VOICES:
+        for pattern_len in PATTERN_LENS:
+            er = _get_er(num_voices, pattern_len)
+            n_onsets = len(er_rhythm.get_onset_order(er))
+            loop = min(
+                timeit.repeat(
+                    lambda: _loop_onset_order(er), number=1, repeat=REPEATS
+                )
+            )
+            vectorized = min(
+                timeit.repeat(
+                    lambda: er_rhythm.get_onset_order(er),
+                    number=1,
+                    repeat=REPEATS,
+                )
+            )
+            # get_onset_order() defers casting to Fraction until items are
+            # accessed, so we also time accessing every item
+            vectorized_all = min(
+                timeit.repeat(
+                    lambda: list(er_rhythm.get_onset_order(er)),
+                    number=1,
+                    repeat=REPEATS,
+                )
+            )
+            print(
+                f"{num_voices:>6} {pattern_len:>11} {n_onsets:>6} "
+                f"{loop:>10.6f} {vectorized:>10.6f} {vectorized_all:>11.6f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Compares er_parse with the eval()-based loading it replaced.
+
+Run from the root of the repository with
+    python -m benchmarks.bench_parse
+"""
+
+import json
+import os
+import tempfile
+import timeit
+
+from efficient_rhythms import er_constants
+from efficient_rhythms import er_parse
+
+NUM_ITEMS = 3000
+NUMBER = 10000
+REPEATS = 5
+
+
+def _time(func, number=1):
+    return min(timeit.repeat(func, number=number, repeat=REPEATS)) / number
+
+
+def main():
+    py_src = (
+        "{"
+        + ", ".join(
+            f'"k{i}": (C * MAJOR_TRIAD, {i} / 4, [1, 2, 3], "D#4")'
+            for i in range(NUM_ITEMS)
+        )
+        + "}"
+    )
+    json_src = json.dumps(
+        {
+            f"k{i}": ["C * MAJOR_TRIAD", i / 4, [1, 2, 3], "D#4"]
+            for i in range(NUM_ITEMS)
+        }
+    )
+    with tempfile.TemporaryDirectory() as temp_dir:
+        py_path = os.path.join(temp_dir, "settings.py")
+        json_path = os.path.join(temp_dir, "settings.json")
+        with open(py_path, "w", encoding="utf-8") as outf:
+            outf.write(py_src)
+        with open(json_path, "w", encoding="utf-8") as outf:
+            outf.write(json_src)
+        print(f"Settings file with {NUM_ITEMS} items:")
+        eval_time = _time(
+            lambda: eval(  # pylint: disable=eval-used
+                py_src, vars(er_constants)
+            )
+        )
+        py_time = _time(lambda: er_parse.read_settings_file(py_path))
+        json_time = _time(lambda: er_parse.read_settings_file(json_path))
+        print(f"{'eval':>20} {eval_time * 1e3:>8.1f} ms")
+        print(f"{'er_parse (.py)':>20} {py_time * 1e3:>8.1f} ms")
+        print(f"{'er_parse (.json)':>20} {json_time * 1e3:>8.1f} ms")
+
+    print("Pitch string 'C * MAJOR_TRIAD':")
+    eval_time = _time(
+        lambda: eval(  # pylint: disable=eval-used
+            "C * MAJOR_TRIAD".replace("#", "_SHARP"), vars(er_constants)
+        ),
+        number=NUMBER,
+    )
+    parse_time = _time(
+        lambda: er_parse.parse_pitch_str("C * MAJOR_TRIAD"), number=NUMBER
+    )
+    print(f"{'eval':>20} {eval_time * 1e6:>8.1f} us")
+    print(f"{'er_parse (cached)':>20} {parse_time * 1e6:>8.1f} us")
+
+
+if __name__ == "__main__":
+    main()
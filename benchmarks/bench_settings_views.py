@@ -0,0 +1,75 @@
+"""Compares ERSettings.get() with the per-voice and per-harmony views.
+
+Run from the root of the repository with
+    python -m benchmarks.bench_settings_views
+"""
+
+import timeit
+
+from efficient_rhythms import er_settings
+
+NUMBER = 100000
+REPEATS = 5
+
+
+def _time(stmt, er):
+    return (
+        min(
+            timeit.repeat(
+                stmt, globals={"er": er}, number=NUMBER, repeat=REPEATS
+            )
+        )
+        / NUMBER
+    )
+
+
+CASES = (
+    (
+        "one voice setting",
+        'er.get(5, "max_alternations")',
+        "er.voice[5].max_alternations",
+    ),
+    (
+        "two voice settings",
+        'er.get(5, "pitch_loop", "hard_pitch_loop")',
+        "v = er.voice[5]; v.pitch_loop; v.hard_pitch_loop",
+    ),
+    (
+        "limiting intervals",
+        'er.get(5, "max_interval_for_non_chord_tones"); '
+        'er.get(5, "max_interval"); '
+        'er.get(5, "min_interval_for_non_chord_tones"); '
+        'er.get(5, "min_interval")',
+        "v = er.voice[5]; v.max_interval_for_non_chord_tones; "
+        "v.max_interval; v.min_interval_for_non_chord_tones; v.min_interval",
+    ),
+    (
+        "harmony setting",
+        'er.get(7, "pc_chords")',
+        "er.harmony[7].pc_chord",
+    ),
+    (
+        "non-sequence setting",
+        'er.get(5, "allow_voice_crossings")',
+        "er.voice[5].allow_voice_crossings",
+    ),
+)
+
+
+def main():
+    er = er_settings.get_settings(
+        {"num_voices": 4, "num_harmonies": 4, "max_alternations": [2, 3]},
+        silent=True,
+    )
+    print(f"{'case':>20} {'er.get (ns)':>12} {'view (ns)':>10} {'speedup':>7}")
+    for name, get_stmt, view_stmt in CASES:
+        get_time = _time(get_stmt, er)
+        view_time = _time(view_stmt, er)
+        print(
+            f"{name:>20} {get_time * 1e9:>12.0f} {view_time * 1e9:>10.0f} "
+            f"{get_time / view_time:>6.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
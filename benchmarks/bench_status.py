@@ -0,0 +1,81 @@
+"""Times building with and without the status printer and timeout checks.
+
+Run from the root of the repository with
+    python -m benchmarks.bench_status
+
+The status output is written to /dev/null.
+"""
+
+import contextlib
+import os
+import timeit
+
+from efficient_rhythms import er_make_handler, er_settings
+
+NUMBER = 100000
+REPEATS = 5
+
+BUILD_REPEATS = 5
+
+SETTINGS = {
+    "num_voices": 4,
+    "num_harmonies": 4,
+    "harmony_len": 4,
+    "pattern_len": 2,
+    "seed": 0,
+}
+
+CASES = (
+    ("silent", {}, True),
+    ("silent with timeout", {"timeout": 1000}, True),
+    ("status printer", {}, False),
+    ("status printer with timeout", {"timeout": 1000}, False),
+)
+
+
+def _time_check_time(timeout):
+    er = er_settings.get_settings(SETTINGS, silent=True)
+    er.set_deadline(timeout)
+    return (
+        min(
+            timeit.repeat(
+                "er.check_time()",
+                globals={"er": er},
+                number=NUMBER,
+                repeat=REPEATS,
+            )
+        )
+        / NUMBER
+    )
+
+
+def _time_build(settings, silent):
+    times = []
+    with open(os.devnull, "w", encoding="utf-8") as devnull:
+        with contextlib.redirect_stdout(devnull):
+            for _ in range(BUILD_REPEATS):
+                er = er_settings.get_settings(settings, silent=silent)
+                times.append(
+                    timeit.timeit(
+                        lambda er=er: er_make_handler.make_super_pattern(
+                            er, debug=False
+                        ),
+                        number=1,
+                    )
+                )
+    return min(times)
+
+
+def main():
+    print(f"{'check_time()':>28} {'time (ns)':>10}")
+    for name, timeout in (("no deadline", None), ("deadline", 1000)):
+        print(f"{name:>28} {_time_check_time(timeout) * 1e9:>10.0f}")
+    print()
+    print(f"{'build':>28} {'time (ms)':>10}")
+    for name, settings, silent in CASES:
+        build_time = _time_build(SETTINGS | settings, silent)
+        print(f"{name:>28} {build_time * 1e3:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,447 @@
+"""Times the main stages of building and saving a pattern, and compares the
+timings against stored baselines.
+
+Run from the root of the repository with
+    python -m benchmarks.suite
+
+To store a baseline (e.g., before making a change) and later compare against
+it:
+    python -m benchmarks.suite --save before
+    python -m benchmarks.suite --compare before
+
+Baselines are stored as JSON in `.benchmarks/` (which is ignored by git).
+`--compare` prints a report of each case's time relative to the baseline and
+exits with status 1 if any case is slower than the baseline by more than
+`--threshold`. (Note that the cases are timed on whatever machine they are
+run on, so baselines should only be compared on the same machine.)
+
+Cases can be selected with `-k`, which matches substrings of the case names,
+e.g.,
+    python -m benchmarks.suite -k "build" -k "midi"
+"""
+
+import argparse
+import contextlib
+import dataclasses
+import itertools
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import timeit
+import typing
+
+import numpy as np
+
+from efficient_rhythms import er_changers
+from efficient_rhythms import er_make_handler
+from efficient_rhythms import er_midi
+from efficient_rhythms import er_output_notation
+from efficient_rhythms import er_settings
+from efficient_rhythms import er_voice_leadings
+from efficient_rhythms.er_classes import Voice
+
+BASELINE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.realpath(__file__))), ".benchmarks"
+)
+
+REPEATS = 5
+QUICK_REPEATS = 2
+# Each repeat runs the case as many times as fit in (at least) this many
+# seconds
+MIN_REPEAT_TIME = 0.2
+QUICK_MIN_REPEAT_TIME = 0.05
+
+# Cases that are slower than the baseline by more than this factor are
+# reported as regressions
+DEFAULT_THRESHOLD = 1.2
+
+BUILD_VOICES = (2, 4)
+BUILD_TETS = (12, 31)
+BUILD_HARMONIES = (2, 8)
+BUILD_CONT_RHYTHMS = ("none", "all", "grid")
+BUILD_SETTINGS = {"harmony_len": 2, "pattern_len": 4, "seed": 0}
+
+VL_CARDINALITIES = (2, 3, 4, 6, 8)
+SOUNDING_PITCHES_LENGTHS = (100, 1000, 10000)
+NUM_QUERIES = 100
+PASSAGE_LENGTHS = (1000, 10000)
+
+# The lengths of the scores that are written to and read from midi, and that
+# changers are applied to, are approximate: we repeat a built pattern until
+# it has at least this many notes.
+MIDI_NOTE_COUNTS = (1000, 10000)
+CHANGERS_NOTE_COUNT = 5000
+KERN_NOTE_COUNT = 10000
+SCORE_SETTINGS = {
+    "num_voices": 4,
+    "num_harmonies": 4,
+    "harmony_len": 4,
+    "pattern_len": 4,
+    "seed": 0,
+}
+
+CHANGERS = (
+    ("transpose", "TransposeTransformer", {"transpose": 3}),
+    ("velocity", "VelocityTransformer", {"scale_by": 0.5}),
+    ("random octave", "RandomOctaveTransformer", {}),
+    ("change durations", "ChangeDurationsTransformer", {"scale_by": 0.5}),
+    ("pitch filter", "PitchFilter", {"filter_range": ((0, 60),)}),
+)
+
+
+@dataclasses.dataclass
+class Case:
+    """A benchmark case.
+
+    `setup()` is called once (untimed) and should return the function to be
+    timed, which is called without arguments.
+    """
+
+    name: str
+    setup: typing.Callable[[], typing.Callable[[], object]]
+
+
+def _silently(func):
+    def wrapper():
+        with open(os.devnull, "w", encoding="utf-8") as devnull:
+            with contextlib.redirect_stdout(devnull):
+                return func()
+
+    return wrapper
+
+
+def _build_cases():
+    def _setup(settings):
+        def _build():
+            er = er_settings.get_settings(settings, silent=True)
+            return er_make_handler.make_super_pattern(er, debug=False)
+
+        return _build
+
+    for voices, tet, harmonies, cont_rhythms in itertools.product(
+        BUILD_VOICES, BUILD_TETS, BUILD_HARMONIES, BUILD_CONT_RHYTHMS
+    ):
+        settings = BUILD_SETTINGS | {
+            "num_voices": voices,
+            "tet": tet,
+            "num_harmonies": harmonies,
+            "cont_rhythms": cont_rhythms,
+        }
+        yield Case(
+            f"build voices={voices} tet={tet} harmonies={harmonies} "
+            f"cont_rhythms={cont_rhythms}",
+            lambda settings=settings: _setup(settings),
+        )
+
+
+def _voice_leading_cases():
+    def _setup(cardinality):
+        rng = random.Random(0)
+        chords = [sorted(rng.sample(range(12), cardinality)) for _ in range(16)]
+        pairs = list(zip(chords, chords[1:]))
+
+        def _voice_lead():
+            for chord1, chord2 in pairs:
+                er_voice_leadings.efficient_voice_leading(chord1, chord2)
+
+        return _voice_lead
+
+    for cardinality in VL_CARDINALITIES:
+        yield Case(
+            f"efficient_voice_leading cardinality={cardinality}",
+            lambda cardinality=cardinality: _setup(cardinality),
+        )
+
+
+def _sounding_pitches_cases():
+    def _setup(length):
+        voice, end_time = _voice(length)
+        queries = np.linspace(0, end_time, NUM_QUERIES, endpoint=False).tolist()
+
+        def _get_sounding_pitches():
+            for query in queries:
+                voice.get_sounding_pitches(query)
+
+        return _get_sounding_pitches
+
+    for length in SOUNDING_PITCHES_LENGTHS:
+        yield Case(
+            f"get_sounding_pitches notes={length}",
+            lambda length=length: _setup(length),
+        )
+
+
+def _voice(length):
+    rng = random.Random(0)
+    voice = Voice()
+    onset = 0
+    for _ in range(length):
+        dur = rng.choice((0.25, 0.5, 1))
+        voice.add_note(rng.randrange(48, 72), onset, dur)
+        onset += dur
+    return voice, onset
+
+
+def _passage_cases():
+    # Each case undoes its edit so that the voice is the same on every call
+    def _setup_displace(length):
+        voice, end_time = _voice(length)
+
+        def _displace():
+            voice.displace_passage(1, end_time / 4, end_time * 3 / 4)
+            voice.displace_passage(-1, end_time / 4 + 1, end_time * 3 / 4 + 1)
+
+        return _displace
+
+    def _setup_repeat(length):
+        voice, end_time = _voice(length)
+
+        def _repeat():
+            voice.repeat_passage(0, end_time / 2, end_time)
+            voice.remove_passage(end_time)
+
+        return _repeat
+
+    for length in PASSAGE_LENGTHS:
+        yield Case(
+            f"displace_passage notes={length}",
+            lambda length=length: _setup_displace(length),
+        )
+        yield Case(
+            f"repeat_passage notes={length}",
+            lambda length=length: _setup_repeat(length),
+        )
+
+
+def _num_notes(score):
+    return sum(1 for voice in score for _ in voice)
+
+
+def _score(note_count):
+    """Returns settings and a built score with at least `note_count` notes."""
+    er = er_settings.get_settings(SCORE_SETTINGS, silent=True)
+    # the super pattern is repeated er.num_reps_super_pattern times
+    notes_per_rep = (
+        _num_notes(er_make_handler.make_super_pattern(er, debug=False))
+        // er.num_reps_super_pattern
+    )
+    er = er_settings.get_settings(
+        SCORE_SETTINGS
+        | {"num_reps_super_pattern": -(-note_count // notes_per_rep)},
+        silent=True,
+    )
+    return er, er_make_handler.make_super_pattern(er, debug=False)
+
+
+def _midi_cases(tmp_dir):
+    def _setup_write(note_count):
+        er, score = _score(note_count)
+        path = os.path.join(tmp_dir, f"write_{note_count}.mid")
+        return lambda: er_midi.write_er_midi(er, score, path)
+
+    def _setup_read(note_count):
+        er, score = _score(note_count)
+        path = os.path.join(tmp_dir, f"read_{note_count}.mid")
+        er_midi.write_er_midi(er, score, path)
+        return lambda: er_midi.read_midi_to_internal_data(path, tet=er.tet)
+
+    for note_count in MIDI_NOTE_COUNTS:
+        yield Case(
+            f"write_er_midi notes={note_count}",
+            lambda note_count=note_count: _setup_write(note_count),
+        )
+        yield Case(
+            f"read_midi_to_internal_data notes={note_count}",
+            lambda note_count=note_count: _setup_read(note_count),
+        )
+
+
+def _kern_cases():
+    def _setup():
+        _, score = _score(KERN_NOTE_COUNT)
+        return lambda: er_output_notation.get_kern(score)
+
+    yield Case(f"get_kern notes={KERN_NOTE_COUNT}", _setup)
+
+
+def _changer_cases():
+    def _setup(changer_name, kwargs):
+        _, score = _score(CHANGERS_NOTE_COUNT)
+        changers = {0: getattr(er_changers, changer_name)(score, **kwargs)}
+        # er_changers.apply() prints its progress
+        return _silently(lambda: er_changers.apply(score, changers))
+
+    for name, changer_name, kwargs in CHANGERS:
+        yield Case(
+            f"changer {name} notes={CHANGERS_NOTE_COUNT}",
+            lambda changer_name=changer_name, kwargs=kwargs: _setup(
+                changer_name, kwargs
+            ),
+        )
+
+
+def get_cases(tmp_dir):
+    return list(
+        itertools.chain(
+            _build_cases(),
+            _voice_leading_cases(),
+            _sounding_pitches_cases(),
+            _passage_cases(),
+            _midi_cases(tmp_dir),
+            _changer_cases(),
+            _kern_cases(),
+        )
+    )
+
+
+def time_case(case, repeats=REPEATS, min_repeat_time=MIN_REPEAT_TIME):
+    """Returns the best and median time (in seconds) of one call of the case."""
+    func = case.setup()
+    timer = timeit.Timer(func)
+    number, total = timer.autorange()
+    # autorange() stops at 0.2 seconds, so we scale the number of calls
+    number = max(1, round(number * min_repeat_time / max(total, 1e-9)))
+    times = [t / number for t in timer.repeat(repeat=repeats, number=number)]
+    return {"best": min(times), "median": float(np.median(times))}
+
+
+def run(cases, repeats=REPEATS, min_repeat_time=MIN_REPEAT_TIME):
+    results = {}
+    print(f"{'case':<58} {'best (ms)':>10} {'median (ms)':>12}")
+    for case in cases:
+        result = results[case.name] = time_case(
+            case, repeats=repeats, min_repeat_time=min_repeat_time
+        )
+        print(
+            f"{case.name:<58} {result['best'] * 1e3:>10.3f} "
+            f"{result['median'] * 1e3:>12.3f}"
+        )
+    return results
+
+
+def _baseline_path(name):
+    return os.path.join(BASELINE_DIR, f"{name}.json")
+
+
+def save_baseline(name, results):
+    os.makedirs(BASELINE_DIR, exist_ok=True)
+    path = _baseline_path(name)
+    with open(path, "w", encoding="utf-8") as outf:
+        json.dump(
+            {
+                "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "machine": platform.node(),
+                "python": platform.python_version(),
+                "results": results,
+            },
+            outf,
+            indent=2,
+        )
+    print(f"Baseline saved to {path}")
+
+
+def load_baseline(name):
+    with open(_baseline_path(name), "r", encoding="utf-8") as inf:
+        return json.load(inf)
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """Prints a report comparing `results` to `baseline`.
+
+    Returns the names of the cases whose best time is slower than the
+    baseline's by more than a factor of `threshold`.
+    """
+    regressions = []
+    print(
+        f"Compared with baseline from {baseline['date']} "
+        f"({baseline['machine']}, Python {baseline['python']}):"
+    )
+    print(f"{'case':<58} {'baseline (ms)':>13} {'now (ms)':>10} {'ratio':>7}")
+    for name, result in results.items():
+        try:
+            old = baseline["results"][name]["best"]
+        except KeyError:
+            print(f"{name:<58} {'-':>13} {result['best'] * 1e3:>10.3f}")
+            continue
+        ratio = result["best"] / old
+        flag = ""
+        if ratio > threshold:
+            flag = "  SLOWER"
+            regressions.append(name)
+        elif ratio < 1 / threshold:
+            flag = "  faster"
+        print(
+            f"{name:<58} {old * 1e3:>13.3f} {result['best'] * 1e3:>10.3f} "
+            f"{ratio:>7.2f}{flag}"
+        )
+    if regressions:
+        print(
+            f"\n{len(regressions)} case(s) slower than the baseline by more "
+            f"than a factor of {threshold}"
+        )
+    return regressions
+
+
+def parse_args(args=None):
+    parser = argparse.ArgumentParser(
+        description="Time the stages of building and saving a pattern"
+    )
+    parser.add_argument(
+        "-k",
+        action="append",
+        default=[],
+        metavar="SUBSTRING",
+        help="only run cases whose names contain SUBSTRING "
+        "(can be given more than once)",
+    )
+    parser.add_argument(
+        "--save", metavar="NAME", help="save the results as baseline NAME"
+    )
+    parser.add_argument(
+        "--compare", metavar="NAME", help="compare the results to baseline NAME"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="report cases that are slower than the baseline by more than "
+        f"this factor (default {DEFAULT_THRESHOLD})",
+    )
+    parser.add_argument(
+        "--quick",
+        action="store_true",
+        help="time fewer repeats (faster but noisier)",
+    )
+    return parser.parse_args(args)
+
+
+def main(args=None):
+    args = parse_args(args)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cases = [
+            case
+            for case in get_cases(tmp_dir)
+            if not args.k or any(k in case.name for k in args.k)
+        ]
+        if args.quick:
+            results = run(
+                cases,
+                repeats=QUICK_REPEATS,
+                min_repeat_time=QUICK_MIN_REPEAT_TIME,
+            )
+        else:
+            results = run(cases)
+    if args.save:
+        save_baseline(args.save, results)
+    if args.compare:
+        print()
+        if compare(results, load_baseline(args.compare), args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,47 @@
+import importlib
 import os
 
-# PACKAGE_DIR needs to be defined before the below imports
 PACKAGE_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), "..")
 
-from .er_constant_groups import (  # pylint: disable=wrong-import-position
-    CONSTANT_GROUPS,
-    CONSTANTS_BY_NAME,
-)
-from .er_exceptions import (  # pylint: disable=wrong-import-position
-    ErSettingsError,
-    ErMakeError,
-    ErTimeoutError,
-)
+# Maps the names that can be imported from the package to the modules that
+# define them. Importing the package's modules is slow (they import numpy,
+# mido, etc.), so rather than importing them here we import them when the
+# names are first accessed, in __getattr__() below. That way, e.g., headless
+# builds from the command line only import the modules they use.
+_LAZY_ATTRS = {
+    "BuildContext": "er_build_context",
+    "CONSTANT_GROUPS": "er_constant_groups",
+    "CONSTANTS_BY_NAME": "er_constant_groups",
+    "ErSettingsError": "er_exceptions",
+    "ErMakeError": "er_exceptions",
+    "ErTimeoutError": "er_exceptions",
+    "make_super_pattern": "er_make_handler",
+    "ERSettings": "er_settings",
+    "CATEGORIES": "er_settings",
+    "get_settings": "er_settings",
+    "write_er_midi": "er_midi",
+}
 
-from .er_make_handler import (  # pylint: disable=wrong-import-position
-    make_super_pattern,
-)
-from .er_settings import (  # pylint: disable=wrong-import-position
-    ERSettings,
-    CATEGORIES,
-    get_settings,
-)
-from .er_midi import write_er_midi  # pylint: disable=wrong-import-position
+
+def __getattr__(name):
+    if name in _LAZY_ATTRS:
+        module = importlib.import_module(f".{_LAZY_ATTRS[name]}", __name__)
+        value = getattr(module, name)
+    else:
+        # Previously all submodules were imported when the package was
+        # imported, so `efficient_rhythms.er_make`, etc., were always
+        # available as attributes. We preserve that behavior here.
+        try:
+            value = importlib.import_module(f".{name}", __name__)
+        except ModuleNotFoundError as exc:
+            if exc.name != f"{__name__}.{name}":
+                raise
+            raise AttributeError(
+                f"module {__name__!r} has no attribute {name!r}"
+            ) from exc
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRS))
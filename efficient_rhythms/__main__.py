@@ -1,6 +1,5 @@
 import itertools
 import os
-import pdb
 import random
 import subprocess
 import sys
@@ -14,9 +13,17 @@ from . import (
     er_make_handler,
     er_midi,
     er_midi_settings,
-    er_output_notation,
+    er_parse,
+    er_profile,
+    er_random_search,
+    er_randomize,
     er_settings,
 )
+from .er_settings.postprocess_helpers import get_output_path
+
+# er_output_notation (and pdb) are only imported when needed, to keep startup
+# fast. (Likewise, er_interface only imports er_playback, which imports
+# pygame, when the interactive interface is entered.)
 
 MAX_RANDOM_TRIES = 10
 
@@ -29,7 +36,12 @@ def get_settings(args, seed, settings_dict=None):
             output_path=args.output,
         )
     else:
-        settings = er_settings.get_settings(
+        get_settings_func = (
+            er_settings.get_cached_settings
+            if args.cache_settings
+            else er_settings.get_settings
+        )
+        settings = get_settings_func(
             args.settings if settings_dict is None else settings_dict,
             random_settings=args.random,
             seed=seed,
@@ -44,8 +56,7 @@ def get_changer_settings(args):
     changer_settings = []
     for path in args.changers:
         print(f"Reading changers from {path}")
-        with open(path, "r", encoding="utf-8") as inf:
-            changer_settings.extend(eval(inf.read()))  # pylint: disable=eval-used
+        changer_settings.extend(er_parse.read_settings_file(path))
     return changer_settings
 
 
@@ -86,7 +97,59 @@ def make_pattern(args, settings):
     return pattern
 
 
+def search(args, seed=None, settings_dict=None):
+    stats = (
+        er_randomize.RandomizationStats.load(args.random_stats)
+        if args.random_stats
+        else None
+    )
+    try:
+        candidates = er_random_search.random_search(
+            args.settings if settings_dict is None else settings_dict,
+            num_results=args.random_search,
+            jobs=args.jobs,
+            stats=stats,
+            seed=seed,
+            output_path=args.output,
+        )
+    except er_random_search.RandomSearchError as exc:
+        er_interface.fail_and_exit(exc, random_failures=exc.num_candidates)
+    finally:
+        if stats is not None:
+            stats.save(args.random_stats)
+    for candidate in candidates:
+        print(f"Randomized settings (seed {candidate.seed}):")
+        for attr, val in candidate.values.items():
+            er_randomize.print_setting(attr, val)
+    return candidates
+
+
 def build(args, seed=None, settings_dict=None):
+    if args.random_search:
+        candidates = search(args, seed=seed, settings_dict=settings_dict)
+        changer_settings = get_changer_settings(args)
+        results = []
+        for candidate in candidates:
+            settings, pattern = candidate.settings, candidate.pattern
+            # The workers chose the output paths concurrently, so they may
+            # clash
+            settings.output_path = get_output_path(settings, "output_path")
+            changers = get_changers(changer_settings, pattern)
+            changed_pattern = er_changers.apply(
+                pattern, changers, seed=settings.seed
+            )
+            save(
+                args,
+                settings,
+                changed_pattern if changed_pattern is not None else pattern,
+            )
+            results.append((settings, changers, pattern, changed_pattern))
+        if len(results) > 1:
+            print("Other random candidates written to:")
+            for settings, *_ in results[1:]:
+                print(f"    {settings.output_path}")
+        return results[0]
+
     for try_i in itertools.count():
         # The reason we re-initialize the settings inside this loop is because,
         # if args.random is True, there is randomness in how the settings
@@ -110,7 +173,7 @@ def build(args, seed=None, settings_dict=None):
 
     changer_settings = get_changer_settings(args)
     changers = get_changers(changer_settings, pattern)
-    changed_pattern = er_changers.apply(pattern, changers)
+    changed_pattern = er_changers.apply(pattern, changers, seed=settings.seed)
 
     save(
         args,
@@ -120,7 +183,21 @@ def build(args, seed=None, settings_dict=None):
     return settings, changers, pattern, changed_pattern
 
 
+def save_profile(args):
+    profiler = er_profile.disable()
+    if profiler is None:
+        return
+    if args.profile:
+        profiler.save_json(args.profile)
+        print(f"Profile written to {args.profile}")
+    if args.trace:
+        profiler.save_chrome_trace(args.trace)
+        print(f"Trace written to {args.trace}")
+
+
 def output_notation(settings, pattern, args):
+    from . import er_output_notation  # pylint: disable=import-outside-toplevel
+
     rhythms_ok = er_output_notation.check_rhythms(settings)
     if not rhythms_ok:
         # check_rhythms already prints an error message so we don't print
@@ -147,6 +224,7 @@ def main():
     args = er_interface.parse_cmd_line_args()
 
     if args.debug:
+        import pdb  # pylint: disable=import-outside-toplevel
 
         def custom_excepthook(exc_type, exc_value, exc_traceback):
             traceback.print_exception(
@@ -155,7 +233,10 @@ def main():
             pdb.post_mortem(exc_traceback)
 
         sys.excepthook = custom_excepthook
+    if args.profile or args.trace:
+        er_profile.enable()
     settings, changers, pattern, changed_pattern = build(args)
+    save_profile(args)
 
     if args.no_interface:
         print(f"Output written to {settings.output_path}")
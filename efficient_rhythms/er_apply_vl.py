@@ -1,8 +1,10 @@
 from . import er_make2
 from . import er_misc_funcs
 from . import er_classes
+from . import er_profile
 
 
+@er_profile.phase("voice-leading step", trace=False)
 def apply_voice_leading(
     er,
     score,
@@ -17,6 +19,7 @@ def apply_voice_leading(
     voice_leading,
     new_notes,
     voice_lead_error,
+    rng=None,
 ):
     # MAYBE something about the number of arguments for this function?
     # LONGTERM use PossibleNote class
@@ -73,12 +76,12 @@ def apply_voice_leading(
     new_pitch = prev_pitch + voice_leading_interval
 
     if er.constrain_voice_leading_to_ranges and not er.parallel_voice_leading:
-        min_pitch, max_pitch = er.get(voice_i, "voice_ranges")
+        min_pitch, max_pitch = er.voice[voice_i].voice_ranges
         if min_pitch > new_pitch or max_pitch < new_pitch:
             voice_lead_error.out_of_range()
             return _fail()
 
-    l_bound, u_bound = er.get(voice_i, "hard_bounds")
+    l_bound, u_bound = er.voice[voice_i].hard_bounds
     while new_pitch < l_bound:
         new_pitch += er.tet
     while new_pitch > u_bound:
@@ -108,11 +111,13 @@ def apply_voice_leading(
             voice_lead_error.check_intervals()
             return _fail()
     if er.vl_maintain_consonance:
-        if er.get(
-            voice_i, "chord_tones_no_diss_treatment"
-        ) and er_make2.check_if_chord_tone(er, score, new_onset, new_pitch):
+        voice_settings = er.voice[voice_i]
+        if (
+            voice_settings.chord_tones_no_diss_treatment
+            and er_make2.check_if_chord_tone(er, score, new_onset, new_pitch)
+        ):
             pass
-        elif new_dur < er.get(voice_i, "min_dur_for_cons_treatment"):
+        elif new_dur < voice_settings.min_dur_for_cons_treatment:
             pass
         elif not er_make2.check_consonance(
             er, score, new_pitch, new_onset, new_dur, voice_i
@@ -139,7 +144,13 @@ def apply_voice_leading(
             er, voice_i, chord_tone
         )
         if not er_make2.check_melodic_intervals(
-            er, new_pitch, last_pitch, max_interval, min_interval, new_harmony_i
+            er,
+            new_pitch,
+            last_pitch,
+            max_interval,
+            min_interval,
+            new_harmony_i,
+            rng=rng,
         ):
             voice_lead_error.limit_intervals()
 
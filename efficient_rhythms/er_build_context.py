@@ -0,0 +1,97 @@
+"""The state of a single build.
+
+The settings (an ERSettings object) describe what is to be built, and aren't
+modified by building. Whatever a build computes and keeps track of as it goes
+(the rhythms, the order in which the initial pattern is filled in, the times
+of the foots in the bass, the midi track numbers, the deadline, etc.) is
+instead stored on a BuildContext, a new one of which is made for each build.
+
+The generation functions take the context in place of the settings (as the
+`er` argument): any attribute that isn't set on the context is looked up on
+the settings. Since builds draw from random streams derived from the seed
+(see er_rng) rather than from global generators, several builds can run
+concurrently in threads, and a settings object can be used for any number of
+builds.
+
+Note that processing the settings themselves isn't thread-safe, since
+random settings are drawn from the global generators.
+"""
+import collections
+import inspect
+import types
+
+# Cached properties of the settings that hold per-build state. Rather than
+# being shared with the settings, they are computed anew (with the same
+# functions as on the settings) for each context.
+PER_BUILD_PROPERTIES = ("build_status_printer", "pattern_vl_order")
+
+
+class BuildContext:
+    """Holds the state of a single build with the given settings.
+
+    Attributes are looked up on the settings unless they are set on the
+    context; assigning to an attribute of the context never modifies the
+    settings. Methods of the settings (e.g., `get()` and `check_time()`) are
+    bound to the context, so they also see the state of the build.
+
+    >>> from efficient_rhythms import er_settings
+    >>> er = er_settings.get_settings({"num_voices": 3}, silent=True)
+    >>> context = BuildContext(er)
+    >>> context.num_voices
+    3
+    >>> context.rhythm_len = [4, 4, 4]
+    >>> context.get(2, "rhythm_len") == 4 != er.get(2, "rhythm_len")
+    True
+    >>> context.pattern_vl_order is er.pattern_vl_order
+    False
+    >>> build_context(context) is context
+    True
+    """
+
+    def __init__(self, settings):
+        self.settings = settings
+        self.rhythms = None
+        self.grid = None
+        self.initial_pattern_order = None
+        self.bass_foot_times = []
+        self.track_dict = {}
+        self.note_counter = collections.Counter()
+        # Certain warnings should only occur once per build, even though the
+        #   situation that provokes them may occur many times
+        self.already_warned = collections.defaultdict(set)
+        # The notes of the existing voices are transposed along with the
+        #   pattern, so each build needs its own copy
+        if settings.existing_score is not None:
+            self.existing_score = settings.existing_score.copy()
+        # A deadline set on the settings (with set_deadline()) applies to the
+        #   builds that are started afterwards
+        self._deadline = settings._deadline  # pylint: disable=protected-access
+        # i.e., the next call to check_time() reads the clock
+        self._time_check_countdown = 0
+
+    def __getattr__(self, name):
+        # Only called for attributes that aren't set on the context
+        if name == "settings":
+            # e.g., while the context is being copied or unpickled
+            raise AttributeError(name)
+        # getattr_static() doesn't unwrap staticmethods and classmethods, so
+        #   only plain functions are bound to the context; anything else
+        #   (including staticmethods and classmethods) comes from the settings
+        settings_attr = inspect.getattr_static(type(self.settings), name, None)
+        if name in PER_BUILD_PROPERTIES:
+            val = settings_attr.func(self)
+        elif inspect.isfunction(settings_attr):
+            val = types.MethodType(settings_attr, self)
+        else:
+            return getattr(self.settings, name)
+        # Per-build properties and bound methods are cached on the context
+        setattr(self, name, val)
+        return val
+
+
+def build_context(er):
+    """Returns a new BuildContext for the settings `er`, or `er` itself if it
+    is already a BuildContext."""
+    if isinstance(er, BuildContext):
+        return er
+    return BuildContext(er)
@@ -41,4 +41,4 @@ from .prob_curves import (
     PROB_CURVES,
 )
 
-from .apply import apply
+from .apply import apply, ChangerCache
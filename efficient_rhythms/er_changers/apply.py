@@ -1,37 +1,224 @@
 from .. import er_misc_funcs
+from .. import er_rng
 
 from .changers import ChangeFuncError
 
 
-def apply(score, changers):
+class ChangerCache:
+    """Caches the output of each stage of applying a sequence of changers.
+
+    When apply() is called with a cache, it starts from the output of the
+    longest sequence of leading changers whose settings are unchanged since the
+    last call with the same score and seed, so that (e.g.) after the Nth
+    changer is adjusted only changers N onward are applied again.
+
+    Note that when no seed is given, the changers draw from the global
+    generator, so cached stages keep the random values that were drawn when
+    they were first applied.
+    """
+
+    def __init__(self):
+        self.score = None
+        self.seed = None
+        # a list of (key, changed score, changed) tuples, one per stage. The
+        #   scores are never modified; apply() works on copies of them.
+        self.stages = []
+
+    def get_stages(self, score, seed, keys):
+        """Returns the cached stages that match the leading items of `keys`."""
+        if score is not self.score or seed != self.seed:
+            return []
+        matching = []
+        for key, stage in zip(keys, self.stages):
+            if stage[0] != key:
+                break
+            matching.append(stage)
+        return matching
+
+    def set_stages(self, score, seed, stages):
+        self.score = score
+        self.seed = seed
+        self.stages = stages
+
+
+def _can_fuse(changer):
+    return (
+        changer.can_fuse()
+        and changer.by_voice
+        and not changer.require_score
+        # a voice that is listed twice is changed twice
+        and len(set(changer.voices)) == len(changer.voices)
+    )
+
+
+def _get_groups(changers, start_i, fuse):
+    """Groups the changers from `start_i` onward into runs that are to be
+    applied together.
+
+    Returns a list of lists of changer indices. Each run of changers that can
+    be fused is a group, except that a changer that only applies to notes
+    marked by other changers begins a new group, since it checks that such
+    notes exist before it is applied. Every other changer is a group on its
+    own.
+    """
+    groups = []
+    for changer_i in range(start_i, len(changers)):
+        changer = changers[changer_i]
+        if (
+            fuse
+            and _can_fuse(changer)
+            and groups
+            and _can_fuse(changers[groups[-1][-1]])
+            and not changer.marked_by
+        ):
+            groups[-1].append(changer_i)
+        else:
+            groups.append([changer_i])
+    return groups
+
+
+def _apply_fused(score, changers):
+    """Applies the changers (which must already be prepared) in a single pass
+    over each voice, in which each note is passed through each changer in
+    turn.
+    """
+    voice_idxs = sorted(
+        {
+            changer.all_voice_idxs[interface_voice_i]
+            for changer in changers
+            for interface_voice_i in changer.voices
+        }
+    )
+    for voice_i in voice_idxs:
+        voice = score.voices[voice_i]
+        selectors = []
+        for changer in changers:
+            if voice_i not in (
+                changer.all_voice_idxs[interface_voice_i]
+                for interface_voice_i in changer.voices
+            ):
+                continue
+            start_time, end_time = changer.get(
+                voice_i, "start_time", "end_time"
+            )
+            # the indices of the onsets between start_time and end_time
+            onset_is = range(
+                voice.get_i_at_or_after(start_time),
+                voice.get_i_at_or_after(end_time),
+            )
+            selectors.append(
+                (
+                    changer,
+                    changer._note_selector(  # pylint: disable=protected-access
+                        voice, voice_i
+                    ),
+                    onset_is,
+                )
+            )
+        for onset_i in range(
+            min(onset_is.start for _, _, onset_is in selectors),
+            max(onset_is.stop for _, _, onset_is in selectors),
+        ):
+            for note in list(voice.get_notes_by_i(onset_i)):
+                for changer, select, onset_is in selectors:
+                    if onset_i in onset_is and select(note):
+                        changer.change_note(voice, note)
+
+
+def _print_change_func_error(err):
+    print("ERROR!")
+    print(
+        er_misc_funcs.add_line_breaks(
+            err.args[0], indent_width=8, indent_type="all"
+        )
+    )
+    input(
+        er_misc_funcs.add_line_breaks(
+            "Press enter to continue",
+            indent_width=12,
+            indent_type="all",
+        )
+    )
+
+
+def apply(score, changers, seed=None, cache=None, fuse=True):
+    """Applies the changers to a copy of `score`.
+
+    If `seed` is given, each changer draws from its own Generator, derived from
+    `seed` and the changer's position in `changers`. Otherwise, the changers
+    draw from the global generator `er_globals.RNG`.
+
+    If `cache` (a ChangerCache) is given, the changers whose settings (and
+    those of all the changers before them) are unchanged since the last call
+    with the same cache are not applied again; their cached output is used
+    instead.
+
+    If `fuse` is True, consecutive changers that change notes one at a time
+    (see Changer.can_fuse()) are applied together, in a single pass over each
+    voice, rather than one after another. The result is the same (also with a
+    given seed, since each changer draws from its own streams for each voice).
+
+    Returns the changed copy, or None if no changer applied without error.
+    """
     if not changers:
         return None
+    rng_streams = None if seed is None else er_rng.RNGStreams(seed)
 
     print("Applying:")
     # changed is True if at least one changer applied without error
     changed = False
 
+    base_score = score
+    changers = list(changers.values())
+    stages = []
+    if cache is not None:
+        keys = [
+            (changer.settings_key(), changer.condition, fuse)
+            for changer in changers
+        ]
+        stages = cache.get_stages(base_score, seed, keys)
+        # The scores after changers that were fused with the changers after
+        #   them aren't cached
+        while stages and stages[-1][1] is None:
+            stages.pop()
+        for changer in changers[: len(stages)]:
+            print(f"    {changer.pretty_name}... done (cached).")
+        if stages:
+            _, score, changed = stages[-1]
+    # stages after a ChangeFuncError aren't cached, so that the error is
+    #   reported again
+    caching = cache is not None
+
     score = score.copy()
-    for changer in changers.values():
-        print(f"    {changer.pretty_name}... ", end="")
-        try:
-            changer.apply(score)
-            print("done.")
-            changed = True
-        except ChangeFuncError as err:
-            # CHANGER_TODO are ChangeFuncErrors also bugs? Should they be caught below?
-            print("ERROR!")
-            print(
-                er_misc_funcs.add_line_breaks(
-                    err.args[0], indent_width=8, indent_type="all"
-                )
-            )
-            input(
-                er_misc_funcs.add_line_breaks(
-                    "Press enter to continue",
-                    indent_width=12,
-                    indent_type="all",
-                )
+    for group in _get_groups(changers, len(stages), fuse):
+        prepared = []
+        for changer_i in group:
+            changer = changers[changer_i]
+            print(f"    {changer.pretty_name}... ", end="")
+            rng = (
+                None
+                if rng_streams is None
+                else rng_streams.generator("changer", changer_i)
             )
+            try:
+                if len(group) == 1:
+                    changer.apply(score, rng=rng)
+                else:
+                    changer.prepare(score, rng=rng)
+                    prepared.append(changer)
+                print("done.")
+                changed = True
+            except ChangeFuncError as err:
+                caching = False
+                # CHANGER_TODO are ChangeFuncErrors also bugs? Should they be caught below?
+                _print_change_func_error(err)
+            if caching and changer_i != group[-1]:
+                stages.append((keys[changer_i], None, changed))
+        if prepared:
+            _apply_fused(score, prepared)
+        if caching:
+            stages.append((keys[group[-1]], score.copy(), changed))
 
+    if cache is not None:
+        cache.set_stages(base_score, seed, stages)
     return score if changed else None
@@ -18,6 +18,14 @@ def ensure_list(obj, attr_str):
         ]
 
 
+def _freeze(value):
+    if isinstance(value, AttributeAdder):
+        return value.settings_key()
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
 # TODO can't get "Range(s) to pass through filter" to work
 
 
@@ -81,6 +89,17 @@ class AttributeAdder:
         self.display_if[attr_name] = display_if
         self.desc_dict[attr_name] = description
 
+    def settings_key(self):
+        """Returns a hashable key of the class and the values of all the
+        attributes that were added with add_attribute(). (Attribute values that
+        are themselves AttributeAdders, like the probability curves of
+        changers, are replaced by their keys.)
+        """
+        return (type(self).__name__,) + tuple(
+            (attr_name, _freeze(getattr(self, attr_name)))
+            for attr_name in self.interface_dict
+        )
+
     def get(self, voice_i, *params):
         out = []
         for param_name in params:
@@ -4,6 +4,7 @@ import numbers
 from typing import Iterable
 
 from .. import er_misc_funcs
+from .. import er_parse
 
 
 class AttributeValidator:
@@ -168,8 +169,7 @@ class AttributeValidator:
                 enquoted.append(f"'{bit}'")
             joined = ", ".join(enquoted)
             listed = f"[{joined}]"
-            # TODO I suspect ast.literal_eval would be just fine here and below
-            answer = eval(listed)  # pylint: disable=eval-used
+            answer = er_parse.parse_expression(listed, names={})
 
             return answer
 
@@ -177,10 +177,8 @@ class AttributeValidator:
             if "'" not in answer and '"' not in answer:
                 answer = str(enquote(answer, self.unique))
         try:
-            answer = eval(answer)  # pylint: disable=eval-used
-        except SyntaxError:
-            return None
-        except NameError:
+            answer = er_parse.parse_expression(answer, names={})
+        except er_parse.SettingsParseError:
             return None
 
         if not self.unique:
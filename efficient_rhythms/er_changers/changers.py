@@ -1,9 +1,9 @@
 import fractions
 import itertools
-import random
 
 from .. import er_classes
 from .. import er_misc_funcs
+from .. import er_rng
 
 from . import prob_curves
 from .attribute_adder import AttributeAdder
@@ -77,6 +77,10 @@ class Changer(AttributeAdder, InfoGetter):
             changer_counter[self.pretty_name] += 1
             self.pretty_name += " " + str(changer_counter[self.pretty_name])
         self.condition = condition
+        # the Generator that the changer draws from while it is being applied
+        self.rng = None
+        # the streams of each voice (see _use_voice_rngs())
+        self._voice_streams = None
         self.total_len = float(score.total_dur)
         super().__init__()
         self.all_voice_idxs = score.all_voice_idxs
@@ -246,49 +250,77 @@ class Changer(AttributeAdder, InfoGetter):
             return not self.invert_exempt  # pylint: disable=no-member
         return self.invert_exempt  # pylint: disable=no-member
 
-    def _apply_by_voice(self, score):
+    def can_fuse(self):
+        """Whether the changer can be applied note by note, along with other
+        changers, in a single pass over each voice (see er_changers.apply()).
+
+        That is the case for changers that implement change_note(), which
+        changes a single note in place, without adding or removing notes, and
+        independently of the other notes.
+        """
+        return False
+
+    def _note_selector(self, voice, voice_i):
+        """Returns a function that is to be called with each note of `voice`
+        between the start and end time of the changer, in order, and returns
+        whether the changer should be applied to the note.
+        """
         exemptions = (
             self.exempt  # pylint: disable=no-member
             and self.exempt[0] is not None  # pylint: disable=no-member
         )
+        start_time, end_time = self.get(voice_i, "start_time", "end_time")
+        if "length" in vars(self.prob_curve):  # pylint: disable=no-member
+            self.prob_curve.length = (  # pylint: disable=no-member
+                end_time - start_time
+            )
+        note_is = itertools.count(voice.get_i_at_or_before(start_time))
+        self._use_voice_rngs(voice_i)
+        select_rng = er_rng.get_rng(
+            self.prob_curve.rng  # pylint: disable=no-member
+        )
+
+        def _select(note):
+            note_i = next(note_is)
+            onset = note.onset
+            if exemptions:
+                if self.mod_n is None and self.beat_exempt(onset):
+                    return False
+                if self.mod_n and self.n_exempt(note_i):
+                    return False
+            if not self.condition(note):
+                return False
+            # TODO what exactly is this code doing?
+            try:
+                if (
+                    self.marked_by
+                    and self.marked_by not in note.transformations_
+                ):
+                    return False
+            except AttributeError:
+                return False
+
+            filter_time = onset - start_time
+            func_result = (
+                self.prob_curve.calculate(  # pylint: disable=no-member
+                    filter_time, select_rng.random(), voice_i
+                )
+            )
+            return bool(func_result)
+
+        return _select
+
+    def _apply_by_voice(self, score):
         for interface_voice_i in self.voices:  # pylint: disable=no-member
             voice_i = self.all_voice_idxs[interface_voice_i]
             voice = score.voices[voice_i]
-            notes_to_change = []
             start_time, end_time = self.get(voice_i, "start_time", "end_time")
-            if "length" in vars(self.prob_curve):  # pylint: disable=no-member
-                self.prob_curve.length = (  # pylint: disable=no-member
-                    end_time - start_time
-                )
-
-            offset_i = voice.get_i_at_or_before(start_time)
-            for i, note in enumerate(voice.between(start_time, end_time)):
-                onset = note.onset
-                if exemptions:
-                    if self.mod_n is None and self.beat_exempt(onset):
-                        continue
-                    if self.mod_n and self.n_exempt(i + offset_i):
-                        continue
-                if not self.condition(note):
-                    continue
-                # TODO what exactly is this code doing?
-                try:
-                    if (
-                        self.marked_by
-                        and self.marked_by not in note.transformations_
-                    ):
-                        continue
-                except AttributeError:
-                    continue
-
-                filter_time = onset - start_time
-                func_result = (
-                    self.prob_curve.calculate(  # pylint: disable=no-member
-                        filter_time, random.random(), voice_i
-                    )
-                )
-                if func_result:
-                    notes_to_change.append(note)
+            select = self._note_selector(voice, voice_i)
+            notes_to_change = [
+                note
+                for note in voice.between(start_time, end_time)
+                if select(note)
+            ]
 
             if self.require_score:
                 self.change_func(  # pylint: disable=no-member
@@ -321,7 +353,7 @@ class Changer(AttributeAdder, InfoGetter):
             filter_time = onset - start_time
             func_result = (
                 self.prob_curve.calculate(  # pylint: disable=no-member
-                    filter_time, random.random(), 0
+                    filter_time, self._rng.random(), 0
                 )
             )
             if func_result:
@@ -350,7 +382,43 @@ class Changer(AttributeAdder, InfoGetter):
             else:
                 self.change_func(voice, notes)  # pylint: disable=no-member
 
-    def apply(self, score):
+    @property
+    def _rng(self):
+        return er_rng.get_rng(self.rng)
+
+    def _use_voice_rngs(self, voice_i):
+        """Makes the changer draw from the streams of voice `voice_i`: the
+        notes to change are selected with one generator, and changed with
+        another.
+
+        Thus the values drawn for each voice are the same whether the changer
+        selects all the notes of the voice before changing them, or changes
+        each note as soon as it is selected (as when it is fused with other
+        changers; see er_changers.apply()), and whatever the order in which
+        the voices are changed. If the changer was prepared without a
+        Generator, it keeps drawing from the global generator.
+        """
+        if self._voice_streams is None:
+            return
+        self.rng = self._voice_streams.generator("change", voice_i)
+        self.prob_curve.rng = (  # pylint: disable=no-member
+            self._voice_streams.generator("select", voice_i)
+        )
+
+    def prepare(self, score, rng=None):
+        """Validates the changer and resets its state before it is applied to
+        `score`.
+
+        Keyword args:
+            rng: the NumPy Generator to draw from. If None, the global
+                generator `er_globals.RNG` is used. Changers that are applied
+                by voice draw from streams for each voice, derived from `rng`
+                (see _use_voice_rngs()).
+        """
+        self.rng = self.prob_curve.rng = rng  # pylint: disable=no-member
+        self._voice_streams = (
+            None if rng is None else er_rng.RNGStreams(int(rng.integers(2**63)))
+        )
         try:
             self.validate(score)
         except AttributeError:
@@ -366,6 +434,14 @@ class Changer(AttributeAdder, InfoGetter):
         except AttributeError:
             pass
 
+    def apply(self, score, rng=None):
+        """Applies the changer to `score` in place.
+
+        Keyword args:
+            rng: the NumPy Generator to draw from. If None, the global
+                generator `er_globals.RNG` is used.
+        """
+        self.prepare(score, rng=rng)
         if self.by_voice:  # pylint: disable=no-member
             self._apply_by_voice(score)
 
@@ -1,7 +1,8 @@
 import fractions
 import inspect
 import math
-import random
+
+from .. import er_rng
 
 from .attribute_adder import AttributeAdder
 from .get_info import InfoGetter
@@ -12,6 +13,7 @@ class NullProbCurve(AttributeAdder, InfoGetter):
 
     def __init__(self, **kwargs):  # pylint: disable=unused-argument
         super().__init__()
+        self.rng = None
 
     def _get_seg_len(self, *args):  # pylint: disable=unused-argument,no-self-use
         return 1
@@ -90,7 +92,7 @@ class ProbCurve(NullProbCurve):
 
     def _get_seg_len(self, voice_i):  # pylint: disable=arguments-differ
         lower_b, upper_b = self.seg_len_range[voice_i % len(self.seg_len_range)]
-        return random.randrange(lower_b, upper_b + 1)
+        return er_rng.randrange(er_rng.get_rng(self.rng), lower_b, upper_b + 1)
 
     def _new_grain(self, x, voice_i):
         granularity, grain_offset = self.get(voice_i, "granularity", "grain_offset")
@@ -449,7 +451,7 @@ class RandomToggle(ProbCurve):
         try:
             on_or_off = self._on_dict[voice_i]
         except KeyError:
-            on_or_off = random.choice((True, False))
+            on_or_off = er_rng.choice(er_rng.get_rng(self.rng), (True, False))
             self._on_dict[voice_i] = on_or_off
         if on_or_off:
             result = self.get(voice_i, "off_prob")
@@ -1,9 +1,12 @@
 import collections
 import fractions
 import inspect
-import random
+import math
+
+import numpy as np
 
 from .. import er_misc_funcs
+from .. import er_rng
 
 from .changers import Changer, ChangeFuncError, Mediator
 
@@ -14,6 +17,31 @@ class Transformer(Changer):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
+    def _randrange(self, low, high):
+        """Returns an array of random ints, one in range(low[i], high[i]) for
+        each item of the arrays `low` and `high`.
+
+        The values are drawn in a single batch but are the same as those of
+        successive calls to er_rng.randrange().
+        """
+        return low + (self._rng.random(len(low)) * (high - low)).astype(int)
+
+    def _transpose(self, voice, notes_to_change, intervals, preserve=False):
+        """Transposes each note of `notes_to_change` by the corresponding
+        item of the array `intervals`. If `preserve` is True, the transposed
+        notes are copies that are added to `voice`.
+        """
+        pitches = np.array([note.pitch for note in notes_to_change]) + intervals
+        for note, pitch in zip(notes_to_change, pitches.tolist()):
+            if preserve:
+                note_copy = note.copy()
+                note_copy.pitch = pitch
+                voice.add_note(note_copy)
+                self.mark_note(note_copy)
+            else:
+                note.pitch = pitch
+            self.mark_note(note)
+
     def mark_note(self, note):
         """Marks notes that have been transformed by appending name of
         transformer to note.transformations_ list. If note has not been
@@ -31,7 +59,23 @@ class Transformer(Changer):
             ]
 
 
-class ForcePitchTransformer(Transformer):
+class NoteByNoteMixin:
+    """Mixin for transformers that change each note independently of the
+    others, and so can be fused with other changers (see Changer.can_fuse()).
+
+    Subclasses implement change_note(); change_func() applies it to each note
+    in turn, unless the subclass overrides it with a faster batched version.
+    """
+
+    def change_func(self, voice, notes_to_change):
+        for note in notes_to_change:
+            self.change_note(voice, note)
+
+    def change_note(self, voice, note):
+        raise NotImplementedError
+
+
+class ForcePitchTransformer(NoteByNoteMixin, Transformer):
     pretty_name = "Force pitch transformer"
 
     def __init__(self, *args, force_pitches=(), **kwargs):
@@ -44,15 +88,15 @@ class ForcePitchTransformer(Transformer):
             attr_val_kwargs={"min_value": 1, "max_value": -1},
         )
 
-    def change_func(
-        self, voice, notes_to_change
-    ):  # pylint: disable=unused-argument
-        for note in notes_to_change:
-            pitch_to_force = random.choice(
-                self.force_pitches  # pylint: disable=no-member
-            )
-            note.pitch = pitch_to_force
-            self.mark_note(note)
+    def can_fuse(self):
+        return True
+
+    def change_note(self, voice, note):  # pylint: disable=unused-argument
+        pitch_to_force = er_rng.choice(
+            self._rng, self.force_pitches  # pylint: disable=no-member
+        )
+        note.pitch = pitch_to_force
+        self.mark_note(note)
 
     def validate(self, *args):
         super().validate(*args)
@@ -62,7 +106,7 @@ class ForcePitchTransformer(Transformer):
             raise ChangeFuncError("'Pitches to force' contains an empty list.")
 
 
-class ForcePitchClassesTransformer(Transformer):
+class ForcePitchClassesTransformer(NoteByNoteMixin, Transformer):
     pretty_name = "Force pitch-classes transformer"
 
     def __init__(self, *args, force_pcs=(), **kwargs):
@@ -79,22 +123,23 @@ class ForcePitchClassesTransformer(Transformer):
             },
         )
 
-    def change_func(self, voice, notes_to_change):
-        voice_i = voice.voice_i
-        pcs = self.get(voice_i, "force_pcs")
-        for note in notes_to_change:
-            sign = random.choice([1, -1])
-            adjust = 0
-            pitch = note.pitch
-            while True:
-                if (pitch + adjust * sign) % voice.tet in pcs:
-                    note.pitch = pitch + adjust * sign
-                    break
-                if (pitch + adjust * sign * -1) % voice.tet in pcs:
-                    note.pitch = pitch + adjust * sign * -1
-                    break
-                adjust += 1
-            self.mark_note(note)
+    def can_fuse(self):
+        return True
+
+    def change_note(self, voice, note):
+        pcs = self.get(voice.voice_i, "force_pcs")
+        sign = er_rng.choice(self._rng, [1, -1])
+        adjust = 0
+        pitch = note.pitch
+        while True:
+            if (pitch + adjust * sign) % voice.tet in pcs:
+                note.pitch = pitch + adjust * sign
+                break
+            if (pitch + adjust * sign * -1) % voice.tet in pcs:
+                note.pitch = pitch + adjust * sign * -1
+                break
+            adjust += 1
+        self.mark_note(note)
 
     def validate(self, *args):
         super().validate(*args)
@@ -106,7 +151,7 @@ class ForcePitchClassesTransformer(Transformer):
             )
 
 
-class VelocityTransformer(Transformer, Mediator):
+class VelocityTransformer(NoteByNoteMixin, Transformer, Mediator):
     pretty_name = "Velocity transformer"
 
     def __init__(self, *args, **kwargs):
@@ -143,39 +188,62 @@ class VelocityTransformer(Transformer, Mediator):
             attr_val_kwargs={"min_value": 0, "max_value": 127},
         )
 
-    def change_func(self, voice, notes_to_change):
+    def can_fuse(self):
+        return True
+
+    def change_note(self, voice, note):
         voice_i = voice.voice_i
         if self.trans_type == "Scale":  # pylint: disable=no-member
             scale_by, humanize = self.get(voice_i, "scale_by", "humanize")
-            for note in notes_to_change:
-                unmediated_vel = round(
-                    max(0, min(127, note.velocity * scale_by))
-                )
-                mediated_vel = round(
-                    self.mediate(
-                        voice_i, unmediated_vel, note.velocity, note.onset
-                    )
-                )
-                note.velocity = random.randrange(
-                    max(mediated_vel - humanize, 0),
-                    min(mediated_vel + humanize + 1, 128),
-                )
-                self.mark_note(note)
+            unmediated_vel = round(max(0, min(127, note.velocity * scale_by)))
+        elif self.trans_type == "Fix":  # pylint: disable=no-member
+            fix_to, humanize = self.get(voice_i, "fix_to", "humanize")
+            unmediated_vel = round(max(0, min(127, fix_to)))
+        else:
+            return
+        mediated_vel = round(
+            self.mediate(voice_i, unmediated_vel, note.velocity, note.onset)
+        )
+        note.velocity = er_rng.randrange(
+            self._rng,
+            max(mediated_vel - humanize, 0),
+            min(mediated_vel + humanize + 1, 128),
+        )
+        self.mark_note(note)
 
+    def change_func(self, voice, notes_to_change):
+        voice_i = voice.voice_i
+        if not notes_to_change:
+            return
+        orig_vels = np.array([note.velocity for note in notes_to_change])
+        if self.trans_type == "Scale":  # pylint: disable=no-member
+            scale_by, humanize = self.get(voice_i, "scale_by", "humanize")
+            unmediated_vels = np.round(np.clip(orig_vels * scale_by, 0, 127))
         elif self.trans_type == "Fix":  # pylint: disable=no-member
             fix_to, humanize = self.get(voice_i, "fix_to", "humanize")
-            for note in notes_to_change:
-                unmediated_vel = round(max(0, min(127, fix_to)))
-                mediated_vel = round(
-                    self.mediate(
-                        voice_i, unmediated_vel, note.velocity, note.onset
+            unmediated_vels = np.full(len(orig_vels), max(0, min(127, fix_to)))
+        else:
+            return
+        if self.func_str == "thru":  # pylint: disable=no-member
+            mediated_vels = unmediated_vels.astype(int)
+        else:
+            mediated_vels = np.array(
+                [
+                    round(self.mediate(voice_i, unmediated_vel, vel, onset))
+                    for unmediated_vel, vel, onset in zip(
+                        unmediated_vels.tolist(),
+                        orig_vels.tolist(),
+                        (note.onset for note in notes_to_change),
                     )
-                )
-                note.velocity = random.randrange(
-                    max(mediated_vel - humanize, 0),
-                    min(mediated_vel + humanize + 1, 128),
-                )
-                self.mark_note(note)
+                ]
+            )
+        new_vels = self._randrange(
+            np.maximum(mediated_vels - humanize, 0),
+            np.minimum(mediated_vels + humanize + 1, 128),
+        )
+        for note, new_vel in zip(notes_to_change, new_vels.tolist()):
+            note.velocity = new_vel
+            self.mark_note(note)
 
 
 class ChangeDurationsTransformer(Transformer, Mediator):
@@ -263,7 +331,7 @@ class ChangeDurationsTransformer(Transformer, Mediator):
             voice.remove_note(note)
 
 
-class RandomOctaveTransformer(Transformer):
+class RandomOctaveTransformer(NoteByNoteMixin, Transformer):
     pretty_name = "Random octave transformer"
 
     def __init__(self, *args, ranges=0, avoid_orig_oct=False, **kwargs):
@@ -289,9 +357,19 @@ class RandomOctaveTransformer(Transformer):
             bool,
             unique=True,
         )
+        self._voice_ranges = {}
 
-    def change_func(self, voice, notes_to_change):
+    def validate(self, *args):
+        super().validate(*args)
+        self._voice_ranges = {}
+
+    def can_fuse(self):
+        return True
+
+    def _get_voice_range(self, voice):
         voice_i = voice.voice_i
+        if voice_i in self._voice_ranges:
+            return self._voice_ranges[voice_i]
         voice_range = self.get(voice_i, "ranges")
         if isinstance(voice_range, tuple):
             voice_range = sorted(voice_range)
@@ -303,26 +381,59 @@ class RandomOctaveTransformer(Transformer):
                     "defaulting to (36, 84)"
                 )
                 voice_range = (36, 84)
-        low, high = voice_range
-        for note in notes_to_change:
-            choices = []
-            new_pitch = note.pitch % voice.tet
-            while new_pitch <= high:
-                if new_pitch >= low:
-                    choices.append(new_pitch)
-                new_pitch += voice.tet
-            if (
-                self.avoid_orig_oct  # pylint: disable=no-member
-                and note.pitch in choices
-                and len(choices) > 1
-            ):
-                choices.remove(note.pitch)
-            new_pitch = random.choice(choices)
+        self._voice_ranges[voice_i] = voice_range
+        return voice_range
+
+    def change_note(self, voice, note):
+        low, high = self._get_voice_range(voice)
+        choices = []
+        new_pitch = note.pitch % voice.tet
+        while new_pitch <= high:
+            if new_pitch >= low:
+                choices.append(new_pitch)
+            new_pitch += voice.tet
+        if (
+            self.avoid_orig_oct  # pylint: disable=no-member
+            and note.pitch in choices
+            and len(choices) > 1
+        ):
+            choices.remove(note.pitch)
+        if not choices:
+            # the pitch-class doesn't occur within the range
+            choices.append(note.pitch)
+        new_pitch = er_rng.choice(self._rng, choices)
+        note.pitch = new_pitch
+        self.mark_note(note)
+
+    def change_func(self, voice, notes_to_change):
+        if not notes_to_change:
+            return
+        low, high = self._get_voice_range(voice)
+        tet = voice.tet
+        pitches = np.array([note.pitch for note in notes_to_change])
+        # the lowest octave of each pitch-class within the range, and the
+        #   number of octaves within the range
+        lowest = pitches % tet
+        lowest += -((lowest - low) // tet) * tet
+        num_octaves = np.maximum((high - lowest) // tet + 1, 0)
+        avoid = np.zeros(len(pitches), dtype=int)
+        if self.avoid_orig_oct:  # pylint: disable=no-member
+            avoid[(pitches >= low) & (pitches <= high) & (num_octaves > 1)] = 1
+        octave_is = (
+            self._rng.random(len(pitches)) * (num_octaves - avoid)
+        ).astype(int)
+        # skip over the original octave if it is to be avoided
+        octave_is += avoid & (octave_is >= (pitches - lowest) // tet)
+        # pitch-classes that don't occur within the range are left unchanged
+        new_pitches = np.where(
+            num_octaves > 0, lowest + octave_is * tet, pitches
+        )
+        for note, new_pitch in zip(notes_to_change, new_pitches.tolist()):
             note.pitch = new_pitch
             self.mark_note(note)
 
 
-class TransposeTransformer(Transformer):
+class TransposeTransformer(NoteByNoteMixin, Transformer):
     pretty_name = "Transpose transformer"
 
     def __init__(self, *args, transpose=0, **kwargs):
@@ -378,20 +489,19 @@ class TransposeTransformer(Transformer):
             display_if={"trans_type": ("Cumulative", "Random")},
         )
         self._count_dict = collections.Counter()
+        self.rand_trans = None
+
+    def validate(self, *args):
+        super().validate(*args)
+        # so that each application starts afresh (and draws the same random
+        #   transpositions given the same generator)
+        self._count_dict = collections.Counter()
+        self.rand_trans = None
 
     def standard(self, voice, notes_to_change):
         voice_i = voice.voice_i
         transpose, preserve = self.get(voice_i, "transpose", "preserve")
-        for note in notes_to_change:
-            if preserve:
-                note_copy = note.copy()
-                note_copy.pitch += transpose
-                voice.add_note(note_copy)
-                self.mark_note(note_copy)
-                self.mark_note(note)
-            else:
-                note.pitch += transpose
-                self.mark_note(note)
+        self._transpose(voice, notes_to_change, transpose, preserve=preserve)
 
     def get_seg_i(self, voice_i, note):
         seg_dur, seg_card = self.get(voice_i, "seg_dur", "seg_card")
@@ -402,35 +512,43 @@ class TransposeTransformer(Transformer):
             self._count_dict[voice_i] += 1
         return seg_i
 
+    def get_cum_trans(self, voice, note):
+        voice_i = voice.voice_i
+        transpose, bound = self.get(voice_i, "transpose", "bound")
+        seg_i = self.get_seg_i(voice_i, note)
+        cum_trans = transpose * seg_i
+        if bound:
+            if cum_trans > 0:
+                while cum_trans > bound:
+                    cum_trans -= voice.tet
+            elif cum_trans < 0:
+                while cum_trans < -bound:
+                    cum_trans += voice.tet
+        return cum_trans
+
     def cumulative(self, voice, notes_to_change):
         voice_i = voice.voice_i
         transpose, bound, preserve = self.get(
             voice_i, "transpose", "bound", "preserve"
         )
-
-        for note in notes_to_change:
-            seg_i = self.get_seg_i(voice_i, note)
-            cum_trans = transpose * seg_i
-            if bound:
-                if cum_trans > 0:
-                    while cum_trans > bound:
-                        cum_trans -= voice.tet
-                elif cum_trans < 0:
-                    while cum_trans < -bound:
-                        cum_trans += voice.tet
-            # note.pitch += cum_trans
-            if preserve:
-                note_copy = note.copy()
-                note_copy.pitch += cum_trans
-                voice.add_note(note_copy)
-                self.mark_note(note_copy)
-                self.mark_note(note)
-            else:
-                note.pitch += cum_trans
-                self.mark_note(note)
+        seg_is = np.array(
+            [self.get_seg_i(voice_i, note) for note in notes_to_change],
+            dtype=int,
+        )
+        cum_trans = transpose * seg_is
+        if bound:
+            # shift the transpositions beyond the bound by as many octaves as
+            #   it takes to bring them within it
+            tet = voice.tet
+            cum_trans = (
+                cum_trans
+                - np.maximum(-((bound - cum_trans) // tet), 0) * tet
+                + np.maximum(-((bound + cum_trans) // tet), 0) * tet
+            )
+        self._transpose(voice, notes_to_change, cum_trans, preserve=preserve)
 
     def build_rand_trans(self):
-        self.rand_trans = []  # pylint: disable=attribute-defined-outside-init
+        self.rand_trans = []
         length = (
             1
             if not self.by_voice  # pylint: disable=no-member
@@ -444,45 +562,49 @@ class TransposeTransformer(Transformer):
             ):
                 continue
             transpose, seg_dur = self.get(voice_i, "transpose", "seg_dur")
+            transpose = abs(transpose)
             if seg_dur:
-                time = 0
-                while time < self.total_len:
-                    self.rand_trans[-1].append(
-                        random.randrange(-transpose, transpose + 1)
-                    )
-                    time += seg_dur
+                num_segs = math.ceil(self.total_len / seg_dur)
             else:
                 # Thus function doesn't have access to how many
                 # segments there will actually be, but we can assume
                 # that no one will notice a repeating pattern of 1024!
-                seg_i = 0
-                while seg_i < 1024:
-                    self.rand_trans[-1].append(
-                        random.randrange(-transpose, transpose + 1)
-                    )
-                    seg_i += 1
+                num_segs = 1024
+            self.rand_trans[-1] = self._randrange(
+                np.full(num_segs, -transpose), transpose + 1
+            )
 
     def random(self, voice, notes_to_change):
-        try:
-            self.rand_trans
-        except AttributeError:
+        if self.rand_trans is None:
             self.build_rand_trans()
         voice_i = voice.voice_i
         rand_trans = self.rand_trans[voice_i % len(self.rand_trans)]
         preserve = self.get(voice_i, "preserve")
-        for note in notes_to_change:
-            seg_i = self.get_seg_i(voice_i, note)
-            transpose = rand_trans[seg_i % len(rand_trans)]
-            if preserve:
-                note_copy = note.copy()
-                note_copy.pitch += transpose
-                voice.add_note(note_copy)
-                self.mark_note(note_copy)
-                # QUESTION should the original note be marked in this case?
-                self.mark_note(note)
-            else:
-                note.pitch += transpose
-                self.mark_note(note)
+        seg_is = np.array(
+            [self.get_seg_i(voice_i, note) for note in notes_to_change],
+            dtype=int,
+        )
+        # QUESTION should the original note be marked when it is preserved?
+        self._transpose(
+            voice,
+            notes_to_change,
+            rand_trans[seg_is % len(rand_trans)],
+            preserve=preserve,
+        )
+
+    def can_fuse(self):
+        # Preserving the original notes adds notes to the voice, and random
+        #   transpositions are drawn when they are first needed
+        trans_type = self.trans_type  # pylint: disable=no-member
+        preserve = self.preserve  # pylint: disable=no-member
+        return trans_type in ("Standard", "Cumulative") and not any(preserve)
+
+    def change_note(self, voice, note):
+        if self.trans_type == "Standard":  # pylint: disable=no-member
+            note.pitch += self.get(voice.voice_i, "transpose")
+        else:
+            note.pitch += self.get_cum_trans(voice, note)
+        self.mark_note(note)
 
     def change_func(self, voice, notes_to_change):
         if self.trans_type == "Standard":  # pylint: disable=no-member
@@ -497,7 +619,7 @@ class TransposeTransformer(Transformer):
             )
 
 
-class ChannelTransformer(Transformer):
+class ChannelTransformer(NoteByNoteMixin, Transformer):
     pretty_name = "Channel transformer"
 
     def __init__(self, *args, dest_channels=(), **kwargs):
@@ -514,12 +636,13 @@ class ChannelTransformer(Transformer):
             },
         )
 
-    def change_func(self, voice, notes_to_change):
-        voice_i = voice.voice_i
-        dest_channels = self.get(voice_i, "dest_channels")
-        for note in notes_to_change:
-            note.choir = random.choice(dest_channels)
-            self.mark_note(note)
+    def can_fuse(self):
+        return True
+
+    def change_note(self, voice, note):
+        dest_channels = self.get(voice.voice_i, "dest_channels")
+        note.choir = er_rng.choice(self._rng, dest_channels)
+        self.mark_note(note)
 
     def validate(self, *args):
         super().validate(*args)
@@ -818,10 +941,12 @@ class TrackRandomizerTransformer(Transformer):
                 score.add_voice()
 
     def change_func(self, score, voice_i, notes_to_change):
-        for note in notes_to_change:
-            dest_voice_i = random.choice(
-                self.dest_voices
-            )  # pylint: disable=no-member
+        dest_voices = self.dest_voices  # pylint: disable=no-member
+        dest_voice_is = (
+            self._rng.random(len(notes_to_change)) * len(dest_voices)
+        ).astype(int)
+        for note, dest_i in zip(notes_to_change, dest_voice_is.tolist()):
+            dest_voice_i = dest_voices[dest_i]
             score.voices[dest_voice_i].add_note(note)
             score.voices[voice_i].remove_note(note)
             self.mark_note(note)
@@ -4,7 +4,9 @@ import itertools
 import random
 import warnings
 
-from . import er_tuning
+import numpy as np
+
+from . import er_profile, er_tuning
 
 
 class ChoirError(Exception):
@@ -62,6 +64,39 @@ def get_choir_prog(choirs, choir_i, pitch):
     return choir_program_i
 
 
+def get_choir_progs(choirs, choir_is, pitches):
+    """Returns an array of the choir program indices of notes in the choirs
+    `choir_is` with the pitches `pitches`, like get_choir_prog().
+
+    >>> choirs = [0, Choir([1, 2, 3], [60, 72]), 4]
+    >>> get_choir_progs(choirs, [0, 1, 1, 1, 2, 3], [60, 59, 60, 72, 60, 60])
+    array([0, 1, 2, 3, 4, 5])
+    """
+    choir_is = np.asarray(choir_is, dtype=int)
+    pitches = np.asarray(pitches)
+    # The index of the first program of each choir. Choirs beyond the end of
+    #   `choirs` have a single program each.
+    first_progs = np.cumsum(
+        [0]
+        + [
+            len(choir.sub_choirs) if isinstance(choir, Choir) else 1
+            for choir in choirs
+        ]
+    )
+    progs = np.where(
+        choir_is < len(choirs),
+        first_progs[np.minimum(choir_is, len(choirs))],
+        first_progs[-1] + choir_is - len(choirs),
+    )
+    for choir_i, choir in enumerate(choirs):
+        if isinstance(choir, Choir):
+            in_choir = choir_is == choir_i
+            progs[in_choir] += np.searchsorted(
+                choir.split_points, pitches[in_choir], side="right"
+            )
+    return progs
+
+
 def order_choirs(er, max_len=100, warn_if_loop_too_short=False):
     """Construct a random choir order.
 
@@ -143,6 +178,7 @@ def order_choirs(er, max_len=100, warn_if_loop_too_short=False):
     return out
 
 
+@er_profile.phase("choirs")
 def assign_choirs(er, super_pattern):
     """Apply the choir order and settings."""
 
@@ -155,28 +191,35 @@ def assign_choirs(er, super_pattern):
             return
 
         for voice_i, voice in enumerate(super_pattern.voices):
-            prev_choir = None
-            choir_assignments = er.choir_order[voice_i]
-            for note in voice:
-                onset = note.onset
-                choir_i = int(onset // er.length_choir_segments)
-                if er.choir_segments_dovetail:
-                    try:
-                        prev_choir = choir
-                    except UnboundLocalError:
-                        pass
-                choir = choir_assignments[choir_i % len(choir_assignments)]
+            notes = list(voice)
+            if not notes:
+                continue
+            choir_assignments = np.asarray(er.choir_order[voice_i])
+            # an object array, so that the onsets (which are usually
+            #   Fractions) are divided exactly
+            onsets = np.array([note.onset for note in notes], dtype=object)
+            choir_is = (onsets // er.length_choir_segments).astype(int)
+            choirs = choir_assignments[choir_is % len(choir_assignments)]
+            for note, choir in zip(notes, choirs.tolist()):
                 note.choir = choir
-                # if (er.choir_segments_dovetail and choir_i > 0
-                #         and prev_choir != choir):
-                if (
-                    er.choir_segments_dovetail
-                    and prev_choir is not None
-                    and prev_choir != choir
-                ):
-                    new_note = note.copy()
+            if not er.choir_segments_dovetail:
+                continue
+            # The notes at the first onset of each choir assignment are
+            #   doubled in the previous choir. (Since notes at the same onset
+            #   are assigned to the same choir, the first note whose choir
+            #   differs from that of the previous note is the first note at
+            #   its onset.)
+            dovetails = np.flatnonzero(choirs[1:] != choirs[:-1]) + 1
+            new_notes = []
+            for note_i in dovetails.tolist():
+                prev_choir = choirs[note_i - 1].item()
+                onset = notes[note_i].onset
+                while note_i < len(notes) and notes[note_i].onset == onset:
+                    new_note = notes[note_i].copy()
                     new_note.choir = prev_choir
-                    voice.add_note(new_note)
+                    new_notes.append(new_note)
+                    note_i += 1
+            voice.add_notes(new_notes)
 
         return
 
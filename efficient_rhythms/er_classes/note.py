@@ -1,4 +1,3 @@
-import copy
 import operator
 
 # constants for writing notes
@@ -23,8 +22,23 @@ class Note:
             a note belongs to.
         finetune: a number, indicates arbitrary tuning in cents (i.e., 100ths
             of a semitone)
+
+    Notes that have been transformed by a changer also have a
+    `transformations_` attribute (see Transformer.mark_note()).
     """
 
+    __slots__ = (
+        "pitch",
+        "onset",
+        "dur",
+        "velocity",
+        "choir",
+        "voice",
+        "finetune",
+        "_spelling",
+        "transformations_",
+    )
+
     def __init__(
         self,
         pitch,
@@ -88,8 +102,42 @@ class Note:
         return False
 
     def copy(self):
-        # note should not have any data that requires deep copy
-        return copy.copy(self)
+        """Returns a copy of the note.
+
+        Scores are copied note by note, so this is written out attribute by
+        attribute rather than going through the copy module.
+
+        >>> note = Note(60, 0, 1)
+        >>> note.transformations_ = ["Transposer"]
+        >>> copied = note.copy()
+        >>> copied == note, copied is note
+        (True, False)
+        >>> copied.transformations_ is note.transformations_
+        False
+        """
+        new = Note.__new__(Note)
+        new.pitch = self.pitch
+        new.onset = self.onset
+        new.dur = self.dur
+        new.velocity = self.velocity
+        new.choir = self.choir
+        new.voice = self.voice
+        new.finetune = self.finetune
+        new._spelling = self._spelling
+        # transformations_ is left unset on notes that have not been
+        # transformed (see Transformer.mark_note()), so we only copy it if
+        # it is set
+        try:
+            # pylint: disable=attribute-defined-outside-init
+            new.transformations_ = self.transformations_.copy()
+        except AttributeError:
+            pass
+        return new
+
+    def __deepcopy__(self, memo):
+        # note should not have any data that requires deep copy other than
+        #   the transformations_ list, which copy() copies
+        return self.copy()
 
     def __lt__(self, other):
         return self._comparison_sequence(other, operator.lt)
@@ -2,9 +2,8 @@ import copy
 
 import sortedcontainers
 
-import mspell
-
 from ..er_classes import VoiceList, Voice, DEFAULT_CHOIR, DEFAULT_VELOCITY
+from .voice import get_speller
 
 
 class HarmonyTimes:
@@ -91,10 +90,6 @@ class Score:
         else:
             self.harmony_times_dict = None
         self.tet = tet
-        try:
-            self.speller = mspell.Speller(tet, pitches=True)
-        except ValueError:
-            self.speller = lambda x: x
         self.existing_voices = []
         if existing_score:
             for voice in existing_score.voices:
@@ -111,6 +106,10 @@ class Score:
         for i in range(num_voices):
             self.add_voice(voice_range=ranges[i % len(ranges)])
 
+    @property
+    def speller(self):
+        return get_speller(self.tet)
+
     def __str__(self, head=-1):
         strings = []
         for voice_type, voice_list in (
@@ -619,5 +618,45 @@ class Score:
                 )
         return first_onset, first_notes
 
-    def copy(self):
-        return copy.deepcopy(self)
+    def copy(self, memo=None):
+        """Returns a copy of the score with copies of its voices and notes.
+
+        Like copy.deepcopy() but much faster (see Voice.copy()). The harmony
+        times aren't modified once they are built, so they are shared with the
+        copy (although the containers that hold them aren't).
+
+        >>> score = Score(num_voices=2, harmony_len=[2], total_len=4)
+        >>> score.add_note(0, 60, 0, 1)
+        >>> copied = score.copy()
+        >>> copied.voices[0][0][0] is score.voices[0][0][0]
+        False
+        >>> copied.get_harmony_times(1) is score.get_harmony_times(1)
+        True
+        """
+        if memo is None:
+            memo = {}
+        new = Score.__new__(Score)
+        memo[id(self)] = new
+        for attr, val in self.__dict__.items():
+            if attr == "existing_voices":
+                val = [voice.copy(memo) for voice in val]
+                # so that the copy of self.voices.existing_voices (if it is
+                #   the same list) is this list as well
+                memo[id(self.existing_voices)] = val
+            elif attr == "voices":
+                # done after existing_voices (below)
+                continue
+            elif attr == "meta_messages":
+                val = [copy.copy(msg) for msg in val]
+            elif attr in ("harmony_times_dict", "_harmony_idx_to_time"):
+                val = None if val is None else val.copy()
+            elif attr == "_harmony_time_to_idx":
+                val = sortedcontainers.SortedDict(val.items())
+            else:
+                val = copy.deepcopy(val, memo)
+            setattr(new, attr, val)
+        new.voices = self.voices.copy(memo)
+        return new
+
+    def __deepcopy__(self, memo):
+        return self.copy(memo)
@@ -1,7 +1,6 @@
 import collections
 import copy
-
-import mspell
+import functools
 
 # LONGTERM how does sortedcontainers compare to just using bisect from the
 #   standard library?
@@ -10,6 +9,21 @@ import sortedcontainers
 from ..er_classes import DEFAULT_CHOIR, DEFAULT_VELOCITY, Note
 
 
+@functools.lru_cache(maxsize=None)
+def get_speller(tet):
+    """Returns a function that spells pitches in the given tet.
+
+    mspell is only used to print notes, so we only import it (which is slow)
+    when a speller is first needed.
+    """
+    import mspell  # pylint: disable=import-outside-toplevel
+
+    try:
+        return mspell.Speller(tet, pitches=True)
+    except ValueError:
+        return lambda x: x
+
+
 class DumbSortedList(list):
     """A list that stays sorted.
 
@@ -44,6 +58,11 @@ class DumbSortedList(list):
         super().append(*args, **kwargs)
         self.sort()
 
+    def update(self, items):
+        """Adds several items, sorting only once."""
+        super().extend(items)
+        self.sort()
+
     def __copy__(self):
         new = DumbSortedList()
         super(DumbSortedList, new).extend(self)
@@ -58,6 +77,22 @@ class DumbSortedList(list):
             super(DumbSortedList, new).append(copy.deepcopy(item, memo))
         return new
 
+    def __reduce__(self):
+        # By default, list subclasses are unpickled with extend(), which we
+        # disallow
+        return (self.__class__, (list(self),))
+
+    @classmethod
+    def from_sorted(cls, items):
+        """Returns a DumbSortedList of `items`, which must already be sorted.
+
+        Unlike the constructor, doesn't sort the items (comparing notes is
+        relatively slow).
+        """
+        new = list.__new__(cls)
+        list.extend(new, items)
+        return new
+
 
 class BreakWhile(Exception):
     pass
@@ -125,12 +160,12 @@ class Voice:
         self.other_messages = []
         self.voice_i = voice_i
         self.tet = tet
-        try:
-            self.speller = mspell.Speller(tet, pitches=True)
-        except ValueError:
-            self.speller = lambda x: x
         self.range = voice_range
 
+    @property
+    def speller(self):
+        return get_speller(self.tet)
+
     def __len__(self):
         # returns the number of onsets (each of which potentially has more than
         # one note)
@@ -230,6 +265,27 @@ class Voice:
         else:
             self._releases[release].add(note_obj)
 
+    def add_notes(self, notes):
+        """Adds Note objects in bulk, rather than one by one with add_note().
+
+        `notes` needn't be sorted. Notes that are equal to notes already in
+        the voice are placed after them.
+
+        >>> voice = Voice()
+        >>> voice.add_note(60, 0, 1)
+        >>> voice.add_notes([Note(64, 1, 1), Note(62, 0, 1), Note(60, 0, 1)])
+        >>> [(note.pitch, note.onset) for note in voice]
+        [(60, 0), (60, 0), (62, 0), (64, 1)]
+        """
+        by_onset = collections.defaultdict(list)
+        for note in notes:
+            note.voice = self.voice_i
+            by_onset[note.onset].append(note)
+        self._add_items(
+            (onset, sorted(onset_notes))
+            for onset, onset_notes in by_onset.items()
+        )
+
     def move_note(self, note_object, new_onset):
         """Moves a note object to a new onset time."""
         self.remove_note(note_object)
@@ -465,6 +521,89 @@ class Voice:
             include_start_time=True,
         )
 
+    # The following methods edit the voice in bulk. Rather than removing and
+    #   adding notes one by one with remove_note() and add_note() (each of
+    #   which updates both _data and _releases), they remove a range of
+    #   onsets from _data with a single slice deletion, and add groups of
+    #   notes with a single SortedDict.update(). Unlike add_note(), they don't
+    #   set the "voice" attribute of the notes.
+
+    def _onset_slice(self, start_time=None, end_time=None):
+        """Returns a slice of the indices of the onsets in the half-open
+        interval [start_time, end_time)."""
+        start_i = (
+            0 if start_time is None else self._data.bisect_left(start_time)
+        )
+        end_i = (
+            len(self._data)
+            if end_time is None
+            else self._data.bisect_left(end_time)
+        )
+        return slice(start_i, end_i)
+
+    def _pop_items(self, start_time=None, end_time=None):
+        """Removes the notes onset in [start_time, end_time) and returns them
+        as a list of (onset, notes) pairs."""
+        index = self._onset_slice(start_time, end_time)
+        items = self._data.items()[index]
+        del self._data.keys()[index]
+        if items:
+            self._remove_releases([note for _, notes in items for note in notes])
+        return items
+
+    def _remove_releases(self, notes):
+        # The releases of notes that are onset in a range of time mostly fall
+        #   in a range of time as well, so we remove the whole range of
+        #   releases and then put back the (usually few) notes that remain.
+        releases = [note.onset + note.dur for note in notes]
+        index = slice(
+            self._releases.bisect_left(min(releases)),
+            self._releases.bisect_right(max(releases)),
+        )
+        items = self._releases.items()[index]
+        del self._releases.keys()[index]
+        ids = {id(note) for note in notes}
+        remaining = {}
+        for release, release_notes in items:
+            kept = [note for note in release_notes if id(note) not in ids]
+            if len(kept) == len(release_notes):
+                remaining[release] = release_notes
+            elif kept:
+                remaining[release] = DumbSortedList.from_sorted(kept)
+        self._releases.update(remaining)
+
+    def _add_items(self, items):
+        """Adds notes given as (onset, notes) pairs, where each onset occurs
+        only once and each list of notes is sorted.
+
+        Lists of notes that are DumbSortedLists are stored in the voice
+        as they are, so they shouldn't belong to another voice.
+        """
+        # Notes at existing onsets and releases are added to the existing
+        #   lists in place, since SortedDict.update() re-sorts all the keys
+        #   when many items are added
+        data = {}
+        releases = collections.defaultdict(list)
+        for onset, notes in items:
+            existing = self._data.get(onset)
+            if existing is not None:
+                existing.update(notes)
+            elif isinstance(notes, DumbSortedList):
+                data[onset] = notes
+            else:
+                data[onset] = DumbSortedList.from_sorted(notes)
+            for note in notes:
+                releases[note.onset + note.dur].append(note)
+        self._data.update(data)
+        new_releases = {}
+        for release, notes in releases.items():
+            existing = self._releases.get(release)
+            if existing is not None:
+                existing.update(notes)
+            else:
+                new_releases[release] = DumbSortedList(notes)
+        self._releases.update(new_releases)
+
     def get_passage(self, start_time, end_time, make_copy=True):
 
         """Returns a single voice of a given passage.
@@ -482,13 +621,12 @@ class Voice:
         """
 
         new_voice = Voice(tet=self.tet, voice_range=self.range)
-        onsets = self._data.irange(
-            start_time, end_time, inclusive=(True, False)
-        )
-        for onset in onsets:
-            new_voice._data[onset] = [  # pylint: disable=protected-access
-                note.copy() if make_copy else note for note in self._data[onset]
+        new_voice._add_items(  # pylint: disable=protected-access
+            (onset, [note.copy() if make_copy else note for note in notes])
+            for onset, notes in self._data.items()[
+                self._onset_slice(start_time, end_time)
             ]
+        )
         return new_voice
 
     def remove_passage(self, start_time=None, end_time=None):
@@ -496,30 +634,28 @@ class Voice:
         If either of start_time or end_time are not passed,
         removes to the start or end of the voice, respectively."""
         new_voice = Voice(tet=self.tet, voice_range=self.range)
-        # We must cast the return value to a tuple because otherwise, it is
-        # lazily evaluated and this causes problems because we are changing
-        # the underlying data as we iterate through onsets
-        onsets = tuple(
-            self._data.irange(start_time, end_time, inclusive=(True, False))
+        new_voice._add_items(  # pylint: disable=protected-access
+            self._pop_items(start_time, end_time)
         )
-        for onset in onsets:
-            new_voice._data[onset] = self.remove_onset(onset)
         return new_voice
 
     def repeat_passage(
         self, original_start_time, original_end_time, repeat_start_time
     ):
         """Repeats a voice."""
-        original_onsets = self._data.irange(
-            original_start_time, original_end_time, inclusive=(True, False)
-        )
-        for onset in original_onsets:
-            for note in self._data[onset]:
+        original_items = self._data.items()[
+            self._onset_slice(original_start_time, original_end_time)
+        ]
+        repeat_items = []
+        for onset, notes in original_items:
+            repeat_onset = repeat_start_time + onset - original_start_time
+            repeat_notes = []
+            for note in notes:
                 repeat_note = note.copy()
-                repeat_note.onset = (
-                    repeat_start_time + onset - original_start_time
-                )
-                self.add_note(repeat_note)
+                repeat_note.onset = repeat_onset
+                repeat_notes.append(repeat_note)
+            repeat_items.append((repeat_onset, repeat_notes))
+        self._add_items(repeat_items)
 
     def transpose(
         self,
@@ -532,12 +668,10 @@ class Voice:
         end_time=None,
     ):
         """Transposes a passage."""
-        onsets = self._data.irange(
-            start_time, end_time, inclusive=(True, False)
-        )
+        items = self._data.items()[self._onset_slice(start_time, end_time)]
         if er is None:  # specific transpose
-            for onset in onsets:
-                for note in self._data[onset]:
+            for _, notes in items:
+                for note in notes:
                     note.pitch += interval
                     note.finetune += finetune
             return
@@ -553,23 +687,35 @@ class Voice:
             else:
                 harmony_i += 1
             harmony_times = score.get_harmony_times(harmony_i)
-            scale = er.get(harmony_i, "gamut_scales")
+            scale = er.harmony[harmony_i].gamut_scale_index
             adjusted_interval = interval
             while adjusted_interval > abs(max_interval):
-                adjusted_interval -= len(er.get(harmony_i, "pc_scales"))
+                adjusted_interval -= len(er.harmony[harmony_i].pc_scale)
             while adjusted_interval < -abs(max_interval):
-                adjusted_interval += len(er.get(harmony_i, "pc_scales"))
+                adjusted_interval += len(er.harmony[harmony_i].pc_scale)
+
+        def _transpose_notes(notes):
+            # The notes during each harmony are transposed together
+            for note, pitch in zip(
+                notes,
+                scale.transpose(
+                    [note.pitch for note in notes], adjusted_interval
+                ),
+            ):
+                note.pitch = pitch
 
         _update_harmony_times()
-        for onset in onsets:
+        notes_in_harmony = []
+        for onset, notes in items:
             if (
                 harmony_times.end_time is not None
                 and onset >= harmony_times.end_time
             ):
+                _transpose_notes(notes_in_harmony)
+                notes_in_harmony = []
                 _update_harmony_times()
-            for note in self._data[onset]:
-                orig_sd = scale.index(note.pitch)
-                note.pitch = scale[orig_sd + adjusted_interval]
+            notes_in_harmony.extend(notes)
+        _transpose_notes(notes_in_harmony)
 
     def displace_passage(self, displacement, start_time=None, end_time=None):
         if displacement == 0:
@@ -584,10 +730,13 @@ class Voice:
         if end_time is not None and start_time >= end_time:
             return
 
-        passage = self.remove_passage(start_time, end_time)
-        for note in passage:
-            note.onset += displacement
-            self.add_note(note)
+        items = self._pop_items(start_time, end_time)
+        for onset, notes in items:
+            for note in notes:
+                note.onset += displacement
+        self._add_items(
+            (onset + displacement, notes) for onset, notes in items
+        )
 
     def fill_with_rests(self, until):
         prev_release = 0
@@ -607,9 +756,58 @@ class Voice:
         for onset, dur in rests:
             self.add_rest(onset, dur)
 
-    def copy(self):
+    def copy(self, memo=None):
+        """Returns a copy of the voice with copies of its notes.
+
+        Like copy.deepcopy() but much faster: the notes are copied with
+        Note.copy(), and the sorted containers are built in bulk from the
+        items of the existing ones, which are already sorted. The same note
+        object is stored in both `_data` and `_releases`, so the copies are as
+        well.
+
+        `memo` is as for copy.deepcopy(), which also calls this method.
+
+        >>> voice = Voice(tet=12)
+        >>> voice.add_note(60, 0, 1)
+        >>> voice.add_note(64, 0, 2)
+        >>> copied = voice.copy()
+        >>> list(copied) == list(voice)
+        True
+        >>> copied[0][0] is voice[0][0]
+        False
+        >>> copied.last_release_and_notes[1][0] is copied[0][1]
+        True
+        """
+        if memo is None:
+            memo = {}
+        new = Voice.__new__(Voice)
+        memo[id(self)] = new
+        note_copies = {}
+
+        def _copy_notes(notes):
+            copied_notes = []
+            for note in notes:
+                copied_note = note_copies.get(id(note))
+                if copied_note is None:
+                    copied_note = note_copies[id(note)] = note.copy()
+                copied_notes.append(copied_note)
+            return DumbSortedList.from_sorted(copied_notes)
+
+        for attr, val in self.__dict__.items():
+            if attr in ("_data", "_releases"):
+                val = sortedcontainers.SortedDict(
+                    (onset, _copy_notes(notes)) for onset, notes in val.items()
+                )
+            elif attr == "other_messages":
+                val = [copy.copy(msg) for msg in val]
+            else:
+                # e.g., voice_i, tet, range
+                val = copy.deepcopy(val, memo)
+            setattr(new, attr, val)
+        return new
 
-        return copy.deepcopy(self)
+    def __deepcopy__(self, memo):
+        return self.copy(memo)
 
 
 class VoiceList(collections.UserList):
@@ -673,5 +871,25 @@ class VoiceList(collections.UserList):
         self.num_new_voices -= 1
         return out
 
-    def copy(self):
-        return copy.deepcopy(self)
+    def copy(self, memo=None):
+        """Returns a copy of the list with copies of its voices (see
+        Voice.copy()).
+
+        `existing_voices` is copied as well, unless it is found in `memo`
+        (e.g., when the list is copied along with a Score that holds the same
+        list of existing voices).
+        """
+        if memo is None:
+            memo = {}
+        new = VoiceList.__new__(VoiceList)
+        memo[id(self)] = new
+        for attr, val in self.__dict__.items():
+            if attr == "data":
+                val = [voice.copy(memo) for voice in val]
+            else:
+                val = copy.deepcopy(val, memo)
+            setattr(new, attr, val)
+        return new
+
+    def __deepcopy__(self, memo):
+        return self.copy(memo)
@@ -49,7 +49,6 @@ class AvailablePitchMaterialsError(ErMakeError):
         )
         self._max_count = er.max_available_pitch_materials_deadends
         self.num_attempts = er.initial_pattern_attempts
-        self.printer = er.build_status_printer
 
     def reset_inner_counts(self):
         self._no_available_pcs = 0
@@ -74,7 +73,6 @@ class AvailablePitchMaterialsError(ErMakeError):
 
     def _update_count(self):
         self._all_count += 1
-        self.status()
         if self._all_count >= self._max_count:
             raise self
 
@@ -160,8 +158,18 @@ class AvailablePitchMaterialsError(ErMakeError):
             ),
         )
 
-    def status(self):
-        self.printer.initial_pattern_status(*self.counts)
+    @property
+    def total_counts(self):
+        return {
+            "no_available_pcs": self._total_no_available_pcs,
+            "no_available_pitches": self._total_no_available_pitches,
+            "exceeding_max_interval": self._total_exceeding_max_interval,
+            "forbidden_parallels": self._total_forbidden_parallels,
+            "unable_to_choose_pitch": self._total_unable_to_choose_pitch,
+            "excess_alternations": self._total_excess_alternations,
+            "excess_repeated_notes": self._total_excess_repeated_notes,
+            "pitch_loop_just_one_pitch": self._total_pitch_loop_just_one_pitch,
+        }
 
 
 class NoMoreVoiceLeadingsError(ErMakeError):
@@ -199,7 +207,6 @@ class VoiceLeadingError(ErMakeError):
         # check allows the instances to be copied for debugging purposes.
         if er is not None:
             self.num_attempts = er.voice_leading_attempts
-            self.printer = er.build_status_printer
 
     def reset_inner_counts(self):
         self._out_of_range = 0
@@ -225,8 +232,15 @@ class VoiceLeadingError(ErMakeError):
             (self._parallel_intervals, self._total_parallel_intervals),
         )
 
-    def status(self):
-        self.printer.voice_leading_status(*self.counts)
+    @property
+    def total_counts(self):
+        return {
+            "out_of_range": self._total_out_of_range,
+            "check_intervals": self._total_check_intervals,
+            "check_consonance": self._total_check_consonance,
+            "limit_intervals": self._total_limit_intervals,
+            "parallel_intervals": self._total_parallel_intervals,
+        }
 
     def __str__(self):
         counter_strs = []
@@ -1,13 +1,15 @@
 from .build_status_printer import (
     BuildStatusPrinter,
+    NullStatusPrinter,
 )
 
 from .args import (
     parse_cmd_line_args,
 )
 
+from .terminal import line_width
+
 from .cli import (
-    line_width,
     print_hello,
     input_loop,
     fail_and_exit,
@@ -29,6 +29,34 @@ def parse_cmd_line_args():
     parser.add_argument(
         "-r", "--random", help="randomize settings", action="store_true"
     )
+    parser.add_argument(
+        "--random-search",
+        type=int,
+        metavar="N",
+        help=(
+            "randomize settings, building many random candidates in parallel "
+            "and keeping the first N that succeed. Each is written to its own "
+            "output file"
+        ),
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        help=(
+            "number of processes to use with '--random-search' (default: the "
+            "number of CPUs)"
+        ),
+    )
+    parser.add_argument(
+        "--random-stats",
+        metavar="PATH",
+        help=(
+            "with '--random-search', read statistics on which random values "
+            "have led to failed builds from this JSON file (if it exists), "
+            "and write the updated statistics to it afterwards"
+        ),
+    )
     # parser.add_argument(
     #     "-ts",
     #     help="Time signature to use with midi file "
@@ -45,13 +73,28 @@ def parse_cmd_line_args():
         "-s",
         "--settings",
         nargs="*",
-        help="path to settings files, each containing a Python dictionary",
+        help=(
+            "path to settings files, each containing a Python dictionary, or "
+            "settings in JSON or TOML format"
+        ),
+    )
+    parser.add_argument(
+        "--cache-settings",
+        help=(
+            "load processed settings from a snapshot, compiling it if it "
+            "doesn't exist or if the settings files have changed. Speeds up "
+            "repeated builds from the same settings files with different seeds"
+        ),
+        action="store_true",
     )
     parser.add_argument(
         "-c",
         "--changers",
         nargs="*",
-        help="path to changers files, each containing a Python dictionary",
+        help=(
+            "path to changers files, each containing a Python list, or "
+            "changers in JSON format"
+        ),
     )
     parser.add_argument(
         "-n",
@@ -83,6 +126,23 @@ def parse_cmd_line_args():
             "path to output midi file, overriding any value specified in " "settings"
         ),
     )
+    parser.add_argument(
+        "--profile",
+        metavar="PATH",
+        help=(
+            "write timings and call counts of each phase of the build, and the "
+            "rate at which each constraint rejects steps, to PATH as JSON"
+        ),
+    )
+    parser.add_argument(
+        "--trace",
+        metavar="PATH",
+        help=(
+            "write the phases of the build to PATH as a Chrome trace-event "
+            "file (which can be opened in chrome://tracing or "
+            "https://ui.perfetto.dev)"
+        ),
+    )
     parser.add_argument("--debug", action="store_true")
     # parser.add_argument(
     #     "--debug",
@@ -99,6 +159,14 @@ def parse_cmd_line_args():
             "'--output-notation' has no effect unless "
             "'--no-interface' is also passed"
         )
+    if args.random_search is not None and (args.profile or args.trace):
+        warnings.warn(
+            "'--profile' and '--trace' don't record builds made in other "
+            "processes with '--random-search'"
+        )
+    if args.random_search is not None and args.input_midi:
+        print("'--random-search' can't be used with '--input-midi'")
+        sys.exit(1)
     if args.input_midi and args.no_interface:
         print("Both '--input-midi' and '--no-interface' passed. " "Nothing to do!")
         sys.exit(1)
@@ -1,10 +1,49 @@
+"""Prints the status of the build.
+
+The search loop in er_make only increments counters (in the printer and in
+the error objects). A background "ticker" thread reads the counters every
+STATUS_TICK_INTERVAL seconds and redraws the status, so the search loop never
+writes to the terminal itself. When building silently, NullStatusPrinter is
+used instead, which does nothing and starts no thread.
+"""
+import contextlib
 import math
+import threading
 
 
 from .. import er_misc_funcs
 from .. import er_shell_constants
 
-from .cli import line_width
+from .terminal import line_width
+
+# Time (in seconds) between redraws of the status
+STATUS_TICK_INTERVAL = 0.1
+
+
+class NullStatusPrinter:
+    """A status printer that does nothing, for silent builds."""
+
+    def increment_ip_attempt(self):
+        pass
+
+    def increment_total_attempt_count(self):
+        pass
+
+    def reset_ip_attempt_count(self):
+        pass
+
+    def success(self):
+        pass
+
+    @staticmethod
+    def ticking(
+        ip_error=None, vl_error=None  # pylint: disable=unused-argument
+    ):
+        return contextlib.nullcontext()
+
+    @staticmethod
+    def paused():
+        return contextlib.nullcontext()
 
 
 class BuildStatusPrinter:
@@ -38,7 +77,7 @@ class BuildStatusPrinter:
         )
         self._ip_header_fmt_str = f"Initial pattern attempt {ip_num_str}"
 
-    def __init__(self, er):
+    def __init__(self, er, tick_interval=STATUS_TICK_INTERVAL):
         # We hope that the user doesn't change the window width too much during
         # building!
         self.line_width = line_width()
@@ -56,6 +95,10 @@ class BuildStatusPrinter:
         self.spin_i = -1
         self.total_attempt_count = 0
         self.ip_attempt_count = 0
+        self.tick_interval = tick_interval
+        self._ip_error = self._vl_error = None
+        self._drawn_state = None
+        self._paused = False
         self.initial_print()
 
     def increment_ip_attempt(self):
@@ -63,11 +106,75 @@ class BuildStatusPrinter:
 
     def increment_total_attempt_count(self):
         self.total_attempt_count += 1
-        self.print_header()
 
     def reset_ip_attempt_count(self):
         self.ip_attempt_count = 0
 
+    @contextlib.contextmanager
+    def ticking(self, ip_error=None, vl_error=None):
+        """Redraws the status in a background thread until the context exits.
+
+        Keyword args:
+            ip_error: the AvailablePitchMaterialsError whose counts are shown
+                in the initial pattern table.
+            vl_error: the VoiceLeadingError whose counts are shown in the
+                voice-leading table.
+        """
+        self._ip_error = ip_error
+        self._vl_error = vl_error
+        stop_event = threading.Event()
+
+        def _tick():
+            while not stop_event.wait(self.tick_interval):
+                if not self._paused:
+                    self.redraw()
+
+        ticker = threading.Thread(target=_tick, daemon=True)
+        ticker.start()
+        try:
+            yield self
+        finally:
+            stop_event.set()
+            ticker.join()
+            # So that the final counts are shown
+            self.redraw()
+
+    @contextlib.contextmanager
+    def paused(self):
+        """Stops redrawing the status (e.g., while prompting the user)."""
+        self._paused = True
+        try:
+            yield self
+        finally:
+            self._paused = False
+
+    def _state(self):
+        return (
+            self.total_attempt_count,
+            self.ip_attempt_count,
+            None if self._ip_error is None else self._ip_error.counts,
+            None if self._vl_error is None else self._vl_error.counts,
+        )
+
+    def redraw(self):
+        """Redraws whatever has changed since the last redraw, and spins."""
+        state = self._state()
+        drawn_state = self._drawn_state
+        if drawn_state is None:
+            drawn_state = (None, None, None, None)
+        total, ip_attempts, ip_counts, vl_counts = state
+        if total != drawn_state[0]:
+            self.print_header()
+        if ip_counts is not None and (ip_attempts, ip_counts) != (
+            drawn_state[1],
+            drawn_state[2],
+        ):
+            self.initial_pattern_status(*ip_counts)
+        if vl_counts is not None and vl_counts != drawn_state[3]:
+            self.voice_leading_status(*vl_counts)
+        self._drawn_state = state
+        self.spin()
+
     @property
     def _spinning_line(self):
         self.spin_i += 1
@@ -82,7 +189,7 @@ class BuildStatusPrinter:
         )
 
     def spin(self):
-        print(f"\r{self._spinning_line} ", end="")
+        print(f"\r{self._spinning_line} ", end="", flush=True)
 
     @staticmethod
     def _table(subhead, colheads, n_cols, col_width, *vals):
@@ -133,14 +240,12 @@ class BuildStatusPrinter:
         assert (
             self.vl_table(vals).count("\n") == 2
         ), 'self.vl_table(vals).count("\n") != 2'
-        self.spin()
 
     def initial_pattern_status(self, *vals):
         print(er_shell_constants.START_OF_PREV_LINE * 6, end="")
         print(
             self.ip_table(vals), end=er_shell_constants.START_OF_NEXT_LINE * 4
         )
-        self.spin()
 
     def print_header(self):
         print(er_shell_constants.START_OF_PREV_LINE * 7, end="")
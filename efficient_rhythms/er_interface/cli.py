@@ -14,12 +14,11 @@ from .. import (
     er_globals,
     er_midi,
     er_misc_funcs,
-    er_output_notation,
-    er_playback,
     er_settings,
     er_shell_constants,
 )
 from .objects import CHANGER_DICT
+from .terminal import line_width
 
 SELECT_HEADER = "Active filters and transformers"
 FILTERS_HEADER = "Filters"
@@ -30,13 +29,6 @@ def clear():  # from https://stackoverflow.com/a/684344/10155119
     os.system("cls" if os.name == "nt" else "clear")
 
 
-def line_width():
-    try:
-        return os.get_terminal_size().columns
-    except OSError:
-        return 80
-
-
 def print_hello():
     title = "Efficient rhythms: generate splendiferous midi loops"
     underline = "=" * min(len(title), line_width())
@@ -549,7 +541,13 @@ def select_changer_prompt(active_changers, score, changer_counter):
         return True
 
 
-def changer_interface(score, active_changers, changer_counter):
+def changer_interface(score, active_changers, changer_counter, cache=None):
+    """Runs the interface for adding and adjusting changers, then applies them.
+
+    Keyword args:
+        cache: an er_changers.ChangerCache. If passed, only the changers from
+            the first one whose settings have changed onward are applied again.
+    """
     first_loop = True
 
     # select changer loop:
@@ -561,7 +559,7 @@ def changer_interface(score, active_changers, changer_counter):
             print("")
             break
     try:
-        changed_pattern = er_changers.apply(score, active_changers)
+        changed_pattern = er_changers.apply(score, active_changers, cache=cache)
     except Exception:  # pylint: disable=broad-except
         if er_globals.DEBUG:
             raise
@@ -589,6 +587,11 @@ def mac_open(midi_path):
 
 
 def verovio_interface(score, midi_path, verovio_arguments):
+    # We only import notation and playback modules when they are needed so
+    # that headless builds (which use print_hello(), fail_and_exit(), etc.)
+    # don't have to import them
+    from .. import er_output_notation  # pylint: disable=import-outside-toplevel
+
     verovio_prompt = "Enter output file type, or leave blank to cancel: "
     lines = ["", er_misc_funcs.make_header("Output notation"), ""]
     file_types = [".svg", ".png", ".pdf"]
@@ -701,6 +704,7 @@ def fail_and_exit(exc, random_failures=None):
 
 def input_loop(er, score, args, active_changers):
     """Run the user input loop for efficient_rhythms"""
+    from .. import er_playback  # pylint: disable=import-outside-toplevel
 
     def get_input_prompt():
         return "".join(
@@ -746,6 +750,11 @@ def input_loop(er, score, args, active_changers):
 
     answer = ""
     changer_counter = collections.Counter()
+    # The output of each changer, and the midi messages of each voice, are
+    #   cached, so that after adjusting a changer only what has changed is
+    #   computed again
+    changer_cache = er_changers.ChangerCache()
+    midi_cache = er_midi.MidiCache()
     current_pattern = score
     changer_midi_i = 0
     current_midi_path = midi_path
@@ -770,14 +779,14 @@ def input_loop(er, score, args, active_changers):
 
         elif answer == "a":
             changed_pattern, active_changers = changer_interface(
-                score, active_changers, changer_counter
+                score, active_changers, changer_counter, cache=changer_cache
             )
             if changed_pattern is not None and active_changers:
                 changer_midi_i += 1
                 if isinstance(er, er_settings.ERSettings):
                     current_midi_path = er_misc_funcs.get_changed_midi_path(midi_path)
                     non_empty = er_midi.write_er_midi(
-                        er, changed_pattern, current_midi_path
+                        er, changed_pattern, current_midi_path, cache=midi_cache
                     )
                 else:
                     current_midi_path = er.output_path
@@ -790,7 +799,9 @@ def input_loop(er, score, args, active_changers):
 
         if answer == "c" and isinstance(er, er_settings.ERSettings):
             update_midi_type(er)
-            non_empty = er_midi.write_er_midi(er, current_pattern, current_midi_path)
+            non_empty = er_midi.write_er_midi(
+                er, current_pattern, current_midi_path, cache=midi_cache
+            )
 
         elif answer == "o":
             mac_open(current_midi_path)
@@ -0,0 +1,14 @@
+"""Terminal helpers that don't depend on the rest of the package.
+
+These are kept separate from cli.py so that modules that only need to know
+about the terminal (e.g., to print build status) can import them without
+importing the interactive interface.
+"""
+import os
+
+
+def line_width():
+    try:
+        return os.get_terminal_size().columns
+    except OSError:
+        return 80
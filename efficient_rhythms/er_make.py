@@ -5,16 +5,18 @@ import functools
 import itertools
 import math
 import os
-import random
 
 import numpy as np
 
+from . import er_build_context
 from . import er_choirs
 from . import er_classes
 from . import er_exceptions
 from . import er_make2
 from . import er_misc_funcs
+from . import er_profile
 from . import er_rhythm
+from . import er_rng
 from . import er_vl_strict_and_flex
 
 
@@ -76,9 +78,9 @@ def get_repeated_pitch(super_pattern, poss_note):
     )
 
 
-def get_looped_pitch(er, poss_note):
+def get_looped_pitch(er, poss_note, rng=None):
 
-    loop_len = er.get(poss_note.voice_i, "pitch_loop")
+    loop_len = er.voice[poss_note.voice_i].pitch_loop
     prev_n_pitches = poss_note.voice.get_prev_n_pitches(
         loop_len, poss_note.onset
     )
@@ -86,9 +88,9 @@ def get_looped_pitch(er, poss_note):
 
     if pitch_to_loop <= 0:
         return 0
-    scale = er.get(poss_note.harmony_i, "gamut_scales")
+    scale = er.harmony[poss_note.harmony_i].gamut_scale_index
     if pitch_to_loop not in scale:
-        look_first = random.choice([1, -1])
+        look_first = er_rng.choice(er_rng.get_rng(rng), (1, -1))
         look_second = -1 * look_first
         i = 1
         while True:
@@ -127,7 +129,7 @@ def get_looped_pitch(er, poss_note):
     return pitch_to_loop
 
 
-def get_forced_parallel_motion(er, super_pattern, poss_note):
+def get_forced_parallel_motion(er, super_pattern, poss_note, rng=None):
 
     parallel_motion_info = er.parallel_motion_followers[poss_note.voice_i]
     leader_i = parallel_motion_info.leader_i
@@ -162,10 +164,14 @@ def get_forced_parallel_motion(er, super_pattern, poss_note):
             return None
 
         generic_interval = er_misc_funcs.get_generic_interval(
-            er, poss_note.harmony_i, leader_pitch, leader_prev_pitch
+            er, poss_note.harmony_i, leader_pitch, leader_prev_pitch, rng=rng
         )
         follower_pitch = er_misc_funcs.apply_generic_interval(
-            er, poss_note.harmony_i, generic_interval, follower_prev_pitch
+            er,
+            poss_note.harmony_i,
+            generic_interval,
+            follower_prev_pitch,
+            rng=rng,
         )
 
         min_pitch, max_pitch = get_boundary_pitches(
@@ -206,7 +212,7 @@ def check_other_voices_for_chord_tones(
             continue
         prev_note = prev_voice[onset][0]
         pc = prev_note.pitch % er.tet
-        if pc in er.get(harmony_i, "pc_chords"):
+        if pc in er.harmony[harmony_i].pc_chord:
             return True
     return False
 
@@ -230,7 +236,7 @@ def get_n_since_chord_tone(er, super_pattern, onset, voice_i):
     return n
 
 
-def choose_whether_chord_tone(er, super_pattern, poss_note):
+def choose_whether_chord_tone(er, super_pattern, poss_note, rng=None):
     def _chord_tone_probability():
         x = er.max_n_between_chord_tones
         if x == 0:
@@ -288,7 +294,7 @@ def choose_whether_chord_tone(er, super_pattern, poss_note):
         return False
 
     # Finally, apply remaining chord_tone settings.
-    rest_dur = er.get(poss_note.voice_i, "chord_tone_before_rests")
+    rest_dur = er.voice[poss_note.voice_i].chord_tone_before_rests
 
     if rest_dur:
         if er.rhythms[poss_note.voice_i].rest_before_onset(
@@ -322,7 +328,7 @@ def choose_whether_chord_tone(er, super_pattern, poss_note):
 
     # LONGTERM chord tone probability influenced by metric position
 
-    if random.random() < _chord_tone_probability():
+    if er_rng.get_rng(rng).random() < _chord_tone_probability():
         return True
 
     return False
@@ -359,12 +365,17 @@ def get_pitches_to_check_for_crossings(super_pattern, onset, dur, voice_i):
     return below, above
 
 
-def _get_available_pcs(er, super_pattern, poss_note, include_if_possible=None):
+@er_profile.phase("available pcs", trace=False)
+def _get_available_pcs(
+    er, super_pattern, poss_note, include_if_possible=None, rng=None
+):
 
-    pc_chord = er.get(poss_note.harmony_i % er.num_harmonies, "pc_chords")
-    pc_scale = er.get(poss_note.harmony_i % er.num_harmonies, "pc_scales")
+    pc_chord = er.harmony[poss_note.harmony_i % er.num_harmonies].pc_chord
+    pc_scale = er.harmony[poss_note.harmony_i % er.num_harmonies].pc_scale
 
-    chord_tone = choose_whether_chord_tone(er, super_pattern, poss_note)
+    chord_tone = choose_whether_chord_tone(
+        er, super_pattern, poss_note, rng=rng
+    )
 
     pc_non_chord = [pc for pc in pc_scale if pc not in pc_chord]
 
@@ -396,8 +407,8 @@ def _get_available_pcs(er, super_pattern, poss_note, include_if_possible=None):
 
 
 def get_boundary_pitches(er, super_pattern, poss_note):
-    min_pitch, max_pitch = er.get(poss_note.voice_i, "voice_ranges")
-    if not er.get(poss_note.voice_i, "allow_voice_crossings"):
+    min_pitch, max_pitch = er.voice[poss_note.voice_i].voice_ranges
+    if not er.voice[poss_note.voice_i].allow_voice_crossings:
         (
             highest_pitch_below,
             lowest_pitch_above,
@@ -414,9 +425,11 @@ def get_boundary_pitches(er, super_pattern, poss_note):
     return min_pitch, max_pitch
 
 
+@er_profile.phase("available pitches", trace=False)
 def get_available_pitches(er, score, available_pcs, poss_note):
 
     min_pitch, max_pitch = get_boundary_pitches(er, score, poss_note)
+    voice_settings = er.voice[poss_note.voice_i]
 
     out = []
 
@@ -434,15 +447,14 @@ def get_available_pitches(er, score, available_pcs, poss_note):
                 poss_note.dur,
                 poss_note.voice_i,
             ):
-                if er.get(
-                    poss_note.voice_i, "chord_tones_no_diss_treatment"
-                ) and er_make2.check_if_chord_tone(
-                    er, score, poss_note.onset, available_pitch
+                if (
+                    voice_settings.chord_tones_no_diss_treatment
+                    and er_make2.check_if_chord_tone(
+                        er, score, poss_note.onset, available_pitch
+                    )
                 ):
                     sub_out.append(available_pitch)
-                elif poss_note.dur < er.get(
-                    poss_note.voice_i, "min_dur_for_cons_treatment"
-                ):
+                elif poss_note.dur < voice_settings.min_dur_for_cons_treatment:
                     sub_out.append(available_pitch)
                 else:
                     consonant = er_make2.check_consonance(
@@ -459,7 +471,10 @@ def get_available_pitches(er, score, available_pcs, poss_note):
     return out
 
 
-def within_limit_intervals(er, super_pattern, available_pitches, poss_note):
+@er_profile.phase("limit intervals", trace=False)
+def within_limit_intervals(
+    er, super_pattern, available_pitches, poss_note, rng=None
+):
 
     prev_note = poss_note.prev_note
 
@@ -480,11 +495,13 @@ def within_limit_intervals(er, super_pattern, available_pitches, poss_note):
             max_interval,
             min_interval,
             poss_note.harmony_i,
+            rng=rng,
         )
         for sub_available_pitches in available_pitches
     ]
 
 
+@er_profile.phase("parallels", trace=False)
 def remove_parallels(er, super_pattern, available_pitches, poss_note):
 
     forbidden_parallels = er.prohibit_parallels
@@ -511,7 +528,9 @@ def remove_parallels(er, super_pattern, available_pitches, poss_note):
                     available_pitches.remove(available_pitch)
 
 
-def weight_intervals_and_choose(intervals, log_base=1.01, unison_weighted_as=3):
+def weight_intervals_and_choose(
+    intervals, log_base=1.01, unison_weighted_as=3, rng=None
+):
     """Returns a choice from a list of intervals, weighted according
     to the size of each interval, where smaller intervals get a larger weight.
 
@@ -523,6 +542,8 @@ def weight_intervals_and_choose(intervals, log_base=1.01, unison_weighted_as=3):
         log_base: Must be greater than 1.0. Increasing it increases the
             probability of larger intervals. 1.5 seems to be a decent value.
         unison_weighted_as: Unisons will be weighted the same as this interval.
+        rng: the NumPy Generator to choose with. If None, the global generator
+            is used.
     """
     # maybe cache weighted_choices
     weighted_choices = []
@@ -537,37 +558,39 @@ def weight_intervals_and_choose(intervals, log_base=1.01, unison_weighted_as=3):
 
     choices, weights = zip(*weighted_choices)
     cum_dist = list(itertools.accumulate(weights))
-    random_x = random.random() * cum_dist[-1]
+    random_x = er_rng.get_rng(rng).random() * cum_dist[-1]
     choice = choices[bisect.bisect(cum_dist, random_x)]
     return choice
 
 
-def apply_melodic_control(er, available_pitches, poss_note):
+def apply_melodic_control(er, available_pitches, poss_note, rng=None):
+    rng = er_rng.get_rng(rng)
     # prev_pitch should be -1 at start of score, in which case
     # applying melodic control is meaningless
     prev_pitch = poss_note.prev_pitch
     if prev_pitch < 0:
         # Not sure that we really want to choose the initial pitch
         #   from a uniform distribution
-        return random.choice(available_pitches)
+        return er_rng.choice(rng, available_pitches)
     available_intervals = {}
     harmony_i = poss_note.harmony_i
     for available_pitch in available_pitches:
         generic_interval = er_misc_funcs.get_generic_interval(
-            er, harmony_i, available_pitch, prev_pitch
+            er, harmony_i, available_pitch, prev_pitch, rng=rng
         )
         available_intervals[generic_interval] = available_pitch
     chosen_interval = weight_intervals_and_choose(
         list(available_intervals.keys()),
         log_base=er.control_log_base,
         unison_weighted_as=er.unison_weighted_as,
+        rng=rng,
     )
     pitch = available_intervals[chosen_interval]
     return pitch
 
 
 def too_many_alternations(er, super_pattern, pitch, onset, voice_i):
-    max_alternations = er.get(voice_i, "max_alternations")
+    max_alternations = er.voice[voice_i].max_alternations
     prev_n_pitches = super_pattern.get_prev_n_pitches(
         max_alternations * 2 - 1, onset, voice_i
     )
@@ -594,16 +617,16 @@ def too_many_repeated_notes(er, super_pattern, pitch, onset, voice_i):
 
 
 def choose_pitch(
-    er, super_pattern, available_pitches, poss_note, choose_first=None
+    er, super_pattern, available_pitches, poss_note, choose_first=None, rng=None
 ):
     if choose_first and choose_first in available_pitches:
         pitch = choose_first
     elif er.prefer_small_melodic_intervals:
-        pitch = apply_melodic_control(er, available_pitches, poss_note)
+        pitch = apply_melodic_control(er, available_pitches, poss_note, rng=rng)
     else:
-        pitch = random.choice(available_pitches)
+        pitch = er_rng.choice(er_rng.get_rng(rng), available_pitches)
 
-    if er.get(poss_note.voice_i, "max_alternations") and too_many_alternations(
+    if er.voice[poss_note.voice_i].max_alternations and too_many_alternations(
         er, super_pattern, pitch, poss_note.onset, poss_note.voice_i
     ):
         return pitch, "too_many_alternations"
@@ -615,7 +638,7 @@ def choose_pitch(
         last_n_pitches = super_pattern.voices[
             poss_note.voice_i
         ].get_prev_n_pitches(
-            er.get(poss_note.voice_i, "pitch_loop") - 1, poss_note.onset
+            er.voice[poss_note.voice_i].pitch_loop - 1, poss_note.onset
         ) + [
             pitch,
         ]
@@ -627,8 +650,9 @@ def choose_pitch(
     return pitch, "success"
 
 
+@er_profile.phase("choose pitch", trace=False)
 def choose_from_pitches(
-    er, super_pattern, available_pitches, poss_note, choose_first=None
+    er, super_pattern, available_pitches, poss_note, choose_first=None, rng=None
 ):
     result = ""
     failure_count = er_exceptions.UnableToChoosePitchError()
@@ -641,6 +665,7 @@ def choose_from_pitches(
             available_pitches,
             poss_note,
             choose_first=choose_first,
+            rng=rng,
         )
         if result == "success":
             break
@@ -685,10 +710,9 @@ def check_whether_to_force_foot(er, super_pattern, poss_note):
 
 
 def attempt_initial_pattern(
-    er, super_pattern, available_pitch_error, onset_i=0
+    er, super_pattern, available_pitch_error, onset_i=0, rng=None
 ):
 
-    er.build_status_printer.spin()
     er.check_time()
 
     try:
@@ -698,11 +722,11 @@ def attempt_initial_pattern(
 
     choose_first = None
 
-    pitch_loop, hard_pitch_loop = er.get(
-        poss_note.voice_i, "pitch_loop", "hard_pitch_loop"
-    )
+    voice_settings = er.voice[poss_note.voice_i]
+    pitch_loop = voice_settings.pitch_loop
+    hard_pitch_loop = voice_settings.hard_pitch_loop
     if pitch_loop:
-        looped_pitch = get_looped_pitch(er, poss_note)
+        looped_pitch = get_looped_pitch(er, poss_note, rng=rng)
         if looped_pitch:
             if hard_pitch_loop:
                 poss_note.voice.add_note(
@@ -713,6 +737,7 @@ def attempt_initial_pattern(
                     super_pattern,
                     available_pitch_error,
                     onset_i=onset_i + 1,
+                    rng=rng,
                 ):
                     return True
                 del poss_note.voice[poss_note.onset]
@@ -732,7 +757,11 @@ def attempt_initial_pattern(
                 forced_foot, poss_note.onset, poss_note.dur
             )
             if attempt_initial_pattern(
-                er, super_pattern, available_pitch_error, onset_i=onset_i + 1
+                er,
+                super_pattern,
+                available_pitch_error,
+                onset_i=onset_i + 1,
+                rng=rng,
             ):
                 return True
             del poss_note.voice[poss_note.onset]
@@ -745,7 +774,11 @@ def attempt_initial_pattern(
                 repeated_pitch, poss_note.onset, poss_note.dur
             )
             if attempt_initial_pattern(
-                er, super_pattern, available_pitch_error, onset_i=onset_i + 1
+                er,
+                super_pattern,
+                available_pitch_error,
+                onset_i=onset_i + 1,
+                rng=rng,
             ):
                 return True
             del poss_note.voice[poss_note.onset]
@@ -754,21 +787,29 @@ def attempt_initial_pattern(
     if poss_note.voice_i in er.parallel_motion_followers:
         # MAYBE allow parallel motion to follow an existing voice?
         parallel_pitch = get_forced_parallel_motion(
-            er, super_pattern, poss_note
+            er, super_pattern, poss_note, rng=rng
         )
         if parallel_pitch:
             poss_note.voice.add_note(
                 parallel_pitch, poss_note.onset, poss_note.dur
             )
             if attempt_initial_pattern(
-                er, super_pattern, available_pitch_error, onset_i=onset_i + 1
+                er,
+                super_pattern,
+                available_pitch_error,
+                onset_i=onset_i + 1,
+                rng=rng,
             ):
                 return True
             del poss_note.voice[poss_note.onset]
             return False
 
     available_pcs = _get_available_pcs(
-        er, super_pattern, poss_note, include_if_possible=choose_first
+        er,
+        super_pattern,
+        poss_note,
+        include_if_possible=choose_first,
+        rng=rng,
     )
 
     if er_misc_funcs.empty_nested(available_pcs):
@@ -782,7 +823,7 @@ def attempt_initial_pattern(
         available_pitch_error.no_available_pitches()
         return False
     available_pitches = within_limit_intervals(
-        er, super_pattern, available_pitches, poss_note
+        er, super_pattern, available_pitches, poss_note, rng=rng
     )
     if er_misc_funcs.empty_nested(available_pitches):
         available_pitch_error.exceeding_max_interval()
@@ -805,6 +846,7 @@ def attempt_initial_pattern(
                     sub_available_pitches,
                     poss_note,
                     choose_first=choose_first,
+                    rng=rng,
                 )
 
             except er_exceptions.UnableToChoosePitchError as unable_error:
@@ -822,7 +864,11 @@ def attempt_initial_pattern(
                 break
             poss_note.voice.add_note(pitch, poss_note.onset, poss_note.dur)
             if attempt_initial_pattern(
-                er, super_pattern, available_pitch_error, onset_i=onset_i + 1
+                er,
+                super_pattern,
+                available_pitch_error,
+                onset_i=onset_i + 1,
+                rng=rng,
             ):
                 return True
             sub_available_pitches.remove(pitch)
@@ -846,7 +892,7 @@ def _get_bass_foot_times(er, super_pattern):
             all_pitches_in_harmony = bass.get_all_ps_onset_between(
                 harmony_times.start_time, harmony_times.end_time
             )
-            foot_pc = er.get(harmony_i, "pc_chords")[FOOT]
+            foot_pc = er.harmony[harmony_i].pc_chord[FOOT]
             lowest_of_each_pc = er_misc_funcs.get_lowest_of_each_pc_in_set(
                 all_pitches_in_harmony, tet=er.tet
             )
@@ -867,18 +913,20 @@ def _get_bass_foot_times(er, super_pattern):
         #     er.bass_foot_times.append(onset)
 
 
-def make_initial_pattern(er, available_pitch_error):
-    """Makes the basic pattern."""
+@er_profile.phase("initial pattern")
+def make_initial_pattern(er, available_pitch_error, rhythm_pool, rng_streams):
+    """Makes the basic pattern.
+
+    The n-th attempt chooses its pitches with `rng_streams.generator(n)`.
+    """
 
     er.build_status_printer.reset_ip_attempt_count()
-    er_rhythm.init_rhythms(er)
+    attempt_i = 0
     for rep in itertools.count(start=1):
         for _ in range(er.initial_pattern_attempts):
             available_pitch_error.reset_inner_counts()
             er.build_status_printer.increment_ip_attempt()
-            available_pitch_error.status()
-            er_rhythm.rhythms_handler(er)
-            er.initial_pattern_order = er_rhythm.get_onset_order(er)
+            rhythm_pool.draw()
             super_pattern = er_classes.Score(
                 num_voices=er.num_voices,
                 tet=er.tet,
@@ -889,22 +937,27 @@ def make_initial_pattern(er, available_pitch_error):
                 existing_score=er.existing_score,
             )
             try:
-                if attempt_initial_pattern(
-                    er, super_pattern, available_pitch_error
-                ):
-                    success = True
-                    break
+                success = attempt_initial_pattern(
+                    er,
+                    super_pattern,
+                    available_pitch_error,
+                    rng=rng_streams.generator(attempt_i),
+                )
             except er_exceptions.AvailablePitchMaterialsError:
-                pass
-            success = False
+                success = False
+            rhythm_pool.record(success)
+            attempt_i += 1
+            if success:
+                break
         if success or not er.ask_for_more_attempts:
             break
-        answer = input(
-            f"\nFailed after {rep * er.initial_pattern_attempts}"
-            " initial pattern attempts. Try another "
-            f"{er.initial_pattern_attempts} attempts "
-            "(y/n)?"
-        )
+        with er.build_status_printer.paused():
+            answer = input(
+                f"\nFailed after {rep * er.initial_pattern_attempts}"
+                " initial pattern attempts. Try another "
+                f"{er.initial_pattern_attempts} attempts "
+                "(y/n)?"
+            )
         if answer != "y":
             break
         er.build_status_printer.reset_ip_attempt_count()
@@ -942,7 +995,7 @@ def transpose_foots(er, super_pattern):
                 harmony_times.start_time, harmony_times.end_time
             )
 
-            foot_pc = er.get(harmony_i, "pc_chords")[FOOT]
+            foot_pc = er.harmony[harmony_i].pc_chord[FOOT]
             lowest_pitch_in_harmony = min(all_pitches_in_harmony)
             lowest_of_each_pc = er_misc_funcs.get_lowest_of_each_pc_in_set(
                 all_pitches_in_harmony, tet=er.tet
@@ -963,14 +1016,19 @@ def transpose_foots(er, super_pattern):
         #     note.pitch = new_pitch
 
 
-def voice_lead_pattern(er, super_pattern, voice_lead_error):
+@er_profile.phase("voice leading")
+def voice_lead_pattern(er, super_pattern, voice_lead_error, rng=None):
 
     voice_lead_error.reset_inner_counts()
 
     if (
         er.allow_strict_voice_leading
         and er_vl_strict_and_flex.voice_lead_pattern_strictly(
-            er, super_pattern, voice_lead_error, pattern_vl_i=er.num_voices
+            er,
+            super_pattern,
+            voice_lead_error,
+            pattern_vl_i=er.num_voices,
+            rng=rng,
         )
     ):
         return True
@@ -978,7 +1036,11 @@ def voice_lead_pattern(er, super_pattern, voice_lead_error):
     if (
         er.allow_flexible_voice_leading
         and er_vl_strict_and_flex.voice_lead_pattern_flexibly(
-            er, super_pattern, voice_lead_error, pattern_vl_i=er.num_voices
+            er,
+            super_pattern,
+            voice_lead_error,
+            pattern_vl_i=er.num_voices,
+            rng=rng,
         )
     ):
         return True
@@ -986,47 +1048,75 @@ def voice_lead_pattern(er, super_pattern, voice_lead_error):
     return False
 
 
+@er_profile.phase("make super pattern")
 def make_super_pattern(er):
-    """Makes the super pattern."""
+    """Makes the super pattern.
 
+    `er` can be either the settings or a BuildContext. In the former case,
+    a new BuildContext is made, so the settings aren't modified.
+
+    Each component of the build draws from its own random stream, derived
+    from `er.seed` (see er_rng), so the result only depends on the seed.
+    """
+
+    er = er_build_context.build_context(er)
+    rng_streams = er_rng.RNGStreams(er.seed)
     voice_lead_error = er_exceptions.VoiceLeadingError(er)
     available_pitch_error = er_exceptions.AvailablePitchMaterialsError(er)
+    er_profile.watch(available_pitch_error, voice_lead_error)
+    rhythm_pool = er_rhythm.RhythmPool(er, rng_streams.child("rhythms"))
 
-    for rep in itertools.count(start=1):
-        for _ in range(er.voice_leading_attempts):
-            er.build_status_printer.increment_total_attempt_count()
-            super_pattern = make_initial_pattern(er, available_pitch_error)
-            if voice_lead_pattern(er, super_pattern, voice_lead_error):
-                er.build_status_printer.success()
-                success = True
-                break
-            er.build_status_printer.spin()
-            er.check_time()
-            voice_lead_error.status()
+    attempt_indices = itertools.count()
+    with er.build_status_printer.ticking(
+        available_pitch_error, voice_lead_error
+    ):
+        for rep in itertools.count(start=1):
+            for attempt_i in itertools.islice(
+                attempt_indices, er.voice_leading_attempts
+            ):
+                er.build_status_printer.increment_total_attempt_count()
+                super_pattern = make_initial_pattern(
+                    er,
+                    available_pitch_error,
+                    rhythm_pool,
+                    rng_streams.child("initial pattern", attempt_i),
+                )
+                if voice_lead_pattern(
+                    er,
+                    super_pattern,
+                    voice_lead_error,
+                    rng=rng_streams.generator("voice leading", attempt_i),
+                ):
+                    success = True
+                    break
+                er.check_time()
 
-            success = False
-        if success or not er.ask_for_more_attempts:
-            break
-        answer = input(
-            f"Failed after {rep * er.voice_leading_attempts}"
-            " voice-leading attempts. Try another "
-            f"{er.voice_leading_attempts} attempts "
-            "(y/n)?"
-        )
-        if answer != "y":
-            break
+                success = False
+            if success or not er.ask_for_more_attempts:
+                break
+            with er.build_status_printer.paused():
+                answer = input(
+                    f"Failed after {rep * er.voice_leading_attempts}"
+                    " voice-leading attempts. Try another "
+                    f"{er.voice_leading_attempts} attempts "
+                    "(y/n)?"
+                )
+            if answer != "y":
+                break
 
     if not success:
         raise voice_lead_error
+    er.build_status_printer.success()
 
     if er.extend_bass_range_for_foots > 0:
         transpose_foots(er, super_pattern)
 
-    complete_pattern(er, super_pattern)
+    complete_pattern(er, super_pattern, rng_streams)
 
     return super_pattern
 
 
+@er_profile.phase("repetition")
 def repeat_super_pattern(er, super_pattern, apply_to_existing_voices=False):
     """Repeats the super pattern the indicated number of times."""
 
@@ -1072,8 +1162,9 @@ def repeat_super_pattern(er, super_pattern, apply_to_existing_voices=False):
 
 
 def apply_specific_transpositions(
-    er, super_pattern, end, apply_to_existing_voices=False
+    er, super_pattern, end, apply_to_existing_voices=False, rng=None
 ):
+    rng = er_rng.get_rng(rng)
     start_time = 0
     end_time = 0
     transpose_i = 0
@@ -1091,9 +1182,9 @@ def apply_specific_transpositions(
         if er.transpose_intervals:
             transpose_interval += er.get(transpose_i, "transpose_intervals")
         else:
-            transpose_interval += random.randrange(1, er.tet) * random.choice(
-                (1, -1)
-            )
+            transpose_interval += er_rng.randrange(
+                rng, 1, er.tet
+            ) * er_rng.choice(rng, (1, -1))
 
         if er.cumulative_max_transpose_interval != 0:
             if transpose_interval > er.cumulative_max_transpose_interval:
@@ -1106,8 +1197,9 @@ def apply_specific_transpositions(
 
 
 def apply_generic_transpositions(
-    er, super_pattern, end, apply_to_existing_voices=False
+    er, super_pattern, end, apply_to_existing_voices=False, rng=None
 ):
+    rng = er_rng.get_rng(rng)
     start_time = 0
     end_time = 0
     transpose_i = 0
@@ -1128,16 +1220,17 @@ def apply_generic_transpositions(
         else:
             # We guess that the length of the first pc_scale is an octave
             # in generic intervals throughout.
-            transpose_interval += random.randrange(
-                1, len(er.pc_scales[0])
-            ) * random.choice((1, -1))
+            transpose_interval += er_rng.randrange(
+                rng, 1, len(er.pc_scales[0])
+            ) * er_rng.choice(rng, (1, -1))
 
         transpose_i += 1
         start_time = end_time
 
 
+@er_profile.phase("transposition")
 def apply_transpositions(
-    er, super_pattern, end, apply_to_existing_voices=False
+    er, super_pattern, end, apply_to_existing_voices=False, rng=None
 ):
     if not er.transpose:
         return
@@ -1156,10 +1249,13 @@ def apply_transpositions(
         super_pattern,
         end,
         apply_to_existing_voices=apply_to_existing_voices,
+        rng=rng,
     )
 
 
-def complete_pattern(er, super_pattern):
+def complete_pattern(er, super_pattern, rng_streams=None):
+    if rng_streams is None:
+        rng_streams = er_rng.RNGStreams(er.seed)
 
     if er.transpose_before_repeat:
         apply_transpositions(
@@ -1167,6 +1263,7 @@ def complete_pattern(er, super_pattern):
             super_pattern,
             er.super_pattern_len,
             apply_to_existing_voices=er.existing_voices_transpose,
+            rng=rng_streams.generator("transpositions"),
         )
 
     repeat_super_pattern(
@@ -1184,6 +1281,7 @@ def complete_pattern(er, super_pattern):
             super_pattern,
             er.total_len,
             apply_to_existing_voices=er.existing_voices_transpose,
+            rng=rng_streams.generator("transpositions"),
         )
 
     er_choirs.assign_choirs(er, super_pattern)
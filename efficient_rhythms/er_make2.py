@@ -1,8 +1,9 @@
 import warnings
 
-from . import er_misc_funcs
+from . import er_misc_funcs, er_profile
 
 
+@er_profile.phase("parallel intervals", trace=False)
 def check_parallel_intervals(
     er, super_pattern, new_pitch, prev_pitch, new_onset, voice_i
 ):
@@ -33,7 +34,7 @@ def check_parallel_intervals(
 
 
 def get_foot_to_force(er, voice_i, harmony_i):
-    foot_pc = er.get(harmony_i, "pc_chords")[0]
+    foot_pc = er.harmony[harmony_i].pc_chord[0]
     foot_pitches = er_misc_funcs.get_all_pitches_in_range(
         foot_pc, er.voice_ranges[voice_i], er.tet
     )
@@ -60,6 +61,7 @@ def get_repeated_pitch(poss_note=None, voice=None, onset=None, min_onset=0):
     return prev_pitch
 
 
+@er_profile.phase("harmonic intervals", trace=False)
 def check_harmonic_intervals(
     er, score, pitch, onset, dur, voice_i, other_voices=None
 ):
@@ -72,7 +74,7 @@ def check_harmonic_intervals(
     if not other_pitches:
         return True
 
-    forbidden_interval_modulo = er.get(voice_i, "forbidden_interval_modulo")
+    forbidden_interval_modulo = er.voice[voice_i].forbidden_interval_modulo
 
     if (
         forbidden_interval_modulo
@@ -102,13 +104,14 @@ def check_harmonic_intervals(
 def check_if_chord_tone(er, super_pattern, onset, pitch):
 
     harmony_i = super_pattern.get_harmony_i(onset)
-    pc_chord = er.get(harmony_i, "pc_chords")
+    pc_chord = er.harmony[harmony_i].pc_chord
     if pitch % er.tet in pc_chord:
         return True
 
     return False
 
 
+@er_profile.phase("consonance", trace=False)
 def check_consonance(er, super_pattern, pitch, onset, dur, voice_i):
     """Checks whether the given pitch fulfills the consonance parameters."""
     # LONGTERM use possible note class (but first update voice-leading functions.)
@@ -116,9 +119,9 @@ def check_consonance(er, super_pattern, pitch, onset, dur, voice_i):
     if er.consonance_treatment == "none":
         return True
 
-    consonance_modulo, min_dur = er.get(
-        voice_i, "consonance_modulo", "min_dur_for_cons_treatment"
-    )
+    voice_settings = er.voice[voice_i]
+    consonance_modulo = voice_settings.consonance_modulo
+    min_dur = voice_settings.min_dur_for_cons_treatment
     if (
         consonance_modulo
         and list(consonance_modulo) != [0]
@@ -165,20 +168,22 @@ def check_consonance(er, super_pattern, pitch, onset, dur, voice_i):
 
 
 def get_limiting_intervals(er, voice_i, chord_tone=False):
-    if er.get(voice_i, "max_interval_for_non_chord_tones") and not chord_tone:
-        max_interval = er.get(voice_i, "max_interval_for_non_chord_tones")
+    voice_settings = er.voice[voice_i]
+    if voice_settings.max_interval_for_non_chord_tones and not chord_tone:
+        max_interval = voice_settings.max_interval_for_non_chord_tones
     else:
-        max_interval = er.get(voice_i, "max_interval")
+        max_interval = voice_settings.max_interval
 
-    if er.get(voice_i, "min_interval_for_non_chord_tones") and not chord_tone:
-        min_interval = er.get(voice_i, "min_interval_for_non_chord_tones")
+    if voice_settings.min_interval_for_non_chord_tones and not chord_tone:
+        min_interval = voice_settings.min_interval_for_non_chord_tones
     else:
-        min_interval = er.get(voice_i, "min_interval")
+        min_interval = voice_settings.min_interval
     return max_interval, min_interval
 
 
+@er_profile.phase("melodic intervals", trace=False)
 def check_melodic_intervals(
-    er, new_p, prev_pitch, max_interval, min_interval, harmony_i
+    er, new_p, prev_pitch, max_interval, min_interval, harmony_i, rng=None
 ):
     """
     Args:
@@ -187,6 +192,7 @@ def check_melodic_intervals(
         max_interval, min_interval: numbers. See ERSettings documentation
             for more detail.
         harmony_i: int.
+        rng: the NumPy Generator passed to er_misc_funcs.get_generic_interval.
 
     Returns:
         a list (possibly empty) of the pitch or pitches from new_p that are
@@ -208,7 +214,7 @@ def check_melodic_intervals(
                     return None
             elif max_interval > 0:
                 generic_interval = er_misc_funcs.get_generic_interval(
-                    er, harmony_i, item, prev_pitch
+                    er, harmony_i, item, prev_pitch, rng=rng
                 )
                 if abs(generic_interval) > max_interval:
                     return None
@@ -223,7 +229,7 @@ def check_melodic_intervals(
                 generic_interval
             except UnboundLocalError:
                 generic_interval = er_misc_funcs.get_generic_interval(
-                    er, harmony_i, item, prev_pitch
+                    er, harmony_i, item, prev_pitch, rng=rng
                 )
             if abs(generic_interval) >= min_interval:
                 return item
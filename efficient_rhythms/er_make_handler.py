@@ -1,83 +1,34 @@
 import contextlib
-import threading
-import time
 
-from . import er_make
+from . import er_build_context, er_make
 from .er_globals import DEBUG
 
 
-def timer(timeout_obj, duration):
-    wait = 0.1
-    for _ in range(int(duration // wait)):
-        if timeout_obj.is_set():
-            return
-        time.sleep(wait)
-    timeout_obj.set()
-
-
-def stop_timer(timeout_obj, timeout_thread):
-    timeout_obj.set()
-    timeout_thread.join()
-
-
 @contextlib.contextmanager
 def timeout(er):
-    if er.timeout is None:
-        # do nothing
-        try:
-            yield None
-        finally:
-            pass
-    else:
-        timeout_event = threading.Event()
-        er.add_timeout_event(timeout_event)
-        timeout_thread = threading.Thread(
-            target=timer, args=[timeout_event, er.timeout]
-        )
-        timeout_thread.start()
-        try:
-            yield None
-        finally:
-            stop_timer(timeout_event, timeout_thread)
+    """Sets a deadline `er.timeout` seconds from now for the duration of the
+    context (unless `er.timeout` is None).
 
-
-# after https://stackoverflow.com/a/65447493/10155119 and
-# https://stackoverflow.com/a/31614591/10155119
-class ThreadWithResult(threading.Thread):
-    def __init__(
-        self,
-        group=None,
-        target=None,
-        name=None,
-        args=(),
-        kwargs=None,
-        *,
-        daemon=None
-    ):
-        def function():
-            try:
-                self.result = target(*args, **kwargs)
-            except Exception as exc:  # pylint: disable=broad-except
-                self.exc = exc
-
-        if kwargs is None:
-            kwargs = {}
-        self.exc = None
-        self.result = None
-        super().__init__(group=group, target=function, name=name, daemon=daemon)
+    er.check_time(), which is called throughout the build, raises
+    ErTimeoutError once the deadline has passed.
+    """
+    er.set_deadline(er.timeout)
+    try:
+        yield None
+    finally:
+        er.set_deadline(None)
 
 
 def make_super_pattern(er, debug=DEBUG):
+    """Makes the super pattern with the settings `er`.
+
+    The state of the build is kept in a new BuildContext, so builds with the
+    same settings can run concurrently (e.g., in threads).
+    """
+    er = er_build_context.build_context(er)
     if debug:
-        # The threading seems to work havoc with pdb, so we just skip it if
-        # we are debugging.
+        # Time spent in the debugger would count towards the timeout, so we
+        # skip it if we are debugging.
         return er_make.make_super_pattern(er)
     with timeout(er):
-        main_thread = ThreadWithResult(
-            target=er_make.make_super_pattern, args=[er]
-        )
-        main_thread.start()
-        main_thread.join()
-    if main_thread.exc is not None:
-        raise main_thread.exc
-    return main_thread.result
+        return er_make.make_super_pattern(er)
@@ -3,15 +3,24 @@
 
 import collections
 import fractions
+import functools
 import os
-import random
+import types
 import warnings
 from multiprocessing.dummy import Pool as ThreadPool
 from typing import Any
 
 import mido
 
-from . import er_choirs, er_classes, er_midi_settings, er_tuning
+from . import (
+    er_build_context,
+    er_choirs,
+    er_classes,
+    er_midi_settings,
+    er_profile,
+    er_rng,
+    er_tuning,
+)
 
 # midi constants
 META_TRACK = 0
@@ -30,25 +39,84 @@ PITCH_BEND = 1
 TIME_PRECISION = 12
 
 
+def _track_abs_to_delta_times(track, ticks_per_beat):
+    # it's important that note-offs don't go after note-ons that should be
+    #   at the same instant. Numerical error with floats sometimes leads to
+    #   that happening, so we round to TIME_PRECISION when sorting here.
+    track.sort(key=lambda x: round(x.time, TIME_PRECISION))
+    current_tick_time = 0  # unrounded
+    for msg_i in range(len(track)):
+        abs_msg = track[msg_i]
+        abs_tick_time = ticks_per_beat * abs_msg.time
+        delta_tick_time = abs_tick_time - current_tick_time
+        if isinstance(abs_msg, (AbsoluteMetaMidiMsg, AbsoluteMidiMsg)):
+            new_msg = abs_msg.parent_msg.copy(time=round(delta_tick_time))
+        else:
+            new_msg = abs_msg.copy(time=round(delta_tick_time))
+        track[msg_i] = new_msg
+        current_tick_time = abs_tick_time
+
+
 def abs_to_delta_times(mf, skip=()):
     for track_i, track in enumerate(mf.tracks):
         if track_i in skip:
             continue
-        # it's important that note-offs don't go after note-ons that should be
-        #   at the same instant. Numerical error with floats sometimes leads to
-        #   that happening, so we round to TIME_PRECISION when sorting here.
-        track.sort(key=lambda x: round(x.time, TIME_PRECISION))
-        current_tick_time = 0  # unrounded
-        for msg_i in range(len(track)):
-            abs_msg = track[msg_i]
-            abs_tick_time = mf.ticks_per_beat * abs_msg.time
-            delta_tick_time = abs_tick_time - current_tick_time
-            if isinstance(abs_msg, (AbsoluteMetaMidiMsg, AbsoluteMidiMsg)):
-                new_msg = abs_msg.parent_msg.copy(time=round(delta_tick_time))
+        _track_abs_to_delta_times(track, mf.ticks_per_beat)
+
+
+class MidiCache:
+    """Caches midi messages between calls to write_er_midi().
+
+    The messages of each voice are cached, as are the tracks (with delta
+    times) made from them, so that when a score is written again (e.g., after
+    adjusting a changer) only the voices that have changed are converted to
+    midi messages again, and only the tracks that contain them are rebuilt.
+
+    Attributes:
+        voices: dict. Maps voice indices to (key, messages, empty) tuples,
+            where `messages` maps track indices to lists of messages.
+        tracks: dict. Maps track indices to (meta messages, voice messages,
+            track) tuples, where `voice messages` are the lists of messages
+            (from `voices`) that the track was made from.
+    """
+
+    def __init__(self):
+        self.voices = {}
+        self.tracks = {}
+
+    def build_tracks(self, mf, voice_messages):
+        """Adds the cached voice messages to the tracks of `mf`, and converts
+        the tracks to delta times.
+
+        Tracks whose messages are the same as when they were cached are
+        replaced by the cached tracks.
+
+        Args:
+            mf: a mido MidiFile, whose tracks contain the messages (with
+                absolute times) that aren't from a voice, like track names and
+                program changes.
+            voice_messages: dict. Maps track indices to lists of lists of
+                voice messages.
+        """
+        for track_i, track in enumerate(mf.tracks):
+            sources = voice_messages.get(track_i, [])
+            try:
+                meta_messages, cached_sources, cached_track = self.tracks[track_i]
+            except KeyError:
+                pass
             else:
-                new_msg = abs_msg.copy(time=round(delta_tick_time))
-            track[msg_i] = new_msg
-            current_tick_time = abs_tick_time
+                if (
+                    len(sources) == len(cached_sources)
+                    and all(a is b for a, b in zip(sources, cached_sources))
+                    and track == meta_messages
+                ):
+                    mf.tracks[track_i] = mido.MidiTrack(cached_track)
+                    continue
+            meta_messages = list(track)
+            for messages in sources:
+                track.extend(messages)
+            _track_abs_to_delta_times(track, mf.ticks_per_beat)
+            self.tracks[track_i] = (meta_messages, sources, list(track))
 
 
 def get_rhythms_from_midi(er):
@@ -246,11 +314,13 @@ def add_note_and_pitch_bend(
         )
 
 
-def humanize(er, note=None, tuning=None):
+def humanize(er, note=None, tuning=None, rng=None):
     # Takes *either* note or tuning as kwarg and returns a humanized version
     #   thereof... I should probably refactor!
+    rng = er_rng.get_rng(rng)
+
     def _get_value(humanize_amount):
-        return random.random() * (humanize_amount) * 2 + 1 - humanize_amount
+        return rng.random() * (humanize_amount) * 2 + 1 - humanize_amount
 
     if note is not None:
         new_note = note.copy()
@@ -266,15 +336,23 @@ def humanize(er, note=None, tuning=None):
     return tuning
 
 
-def add_er_voice(er, voice_i, voice, mf, force_choir=None):
-    """Adds a Voice object to the midi file object."""
+def add_er_voice(er, voice_i, voice, mf, force_choir=None, rng=None):
+    """Adds a Voice object to the midi file object.
+
+    Keyword args:
+        rng: the NumPy Generator used to humanize the notes. If None, the
+            global generator is used.
+    """
     empty = True
-    for note in voice:
-        if force_choir is not None:
-            choir_i = force_choir
-        else:
-            choir_i = note.choir
-        choir_program_i = er_choirs.get_choir_prog(er.choirs, choir_i, note.pitch)
+    notes = list(voice)
+    if force_choir is not None:
+        choir_is = [force_choir] * len(notes)
+    else:
+        choir_is = [note.choir for note in notes]
+    choir_program_is = er_choirs.get_choir_progs(
+        er.choirs, choir_is, [note.pitch for note in notes]
+    )
+    for note, choir_program_i in zip(notes, choir_program_is.tolist()):
         # I used to add 1 because meta track is track 0 but now I've moved that
         # operation into the construction of er.track_dict above
         track_i = er.track_dict[(voice_i, choir_program_i)]
@@ -287,7 +365,7 @@ def add_er_voice(er, voice_i, voice, mf, force_choir=None):
         if note.finetune != 0:
             raise NotImplementedError("note.finetune not yet implemented")
         if er.humanize:
-            note = humanize(er, note=note)
+            note = humanize(er, note=note, rng=rng)
         if er.tet == 12:
             if 0 <= note.pitch <= 127:
                 add_note(mf.tracks[track_i], note)
@@ -304,6 +382,7 @@ def add_er_voice(er, voice_i, voice, mf, force_choir=None):
             pitch_bend = humanize(
                 er,
                 tuning=pitch_bend,
+                rng=rng,
             )
         if not er.logic_type_pitch_bend or er.tet == 12:
             # er.tet == 12 seems to be an unnecessary condition here!
@@ -339,6 +418,47 @@ def add_er_voice(er, voice_i, voice, mf, force_choir=None):
     return empty
 
 
+def _add_er_voice_cached(
+    er,
+    voice_i,
+    voice,
+    mf,  # pylint: disable=unused-argument
+    cache,
+    voice_messages,
+    force_choir=None,
+    rng=None,
+):
+    """Like add_er_voice(), but the midi messages of the voice are taken from
+    `cache` (a MidiCache) if neither the voice nor the track settings have
+    changed since they were cached. Rather than being added to the tracks of
+    `mf`, the messages are added to `voice_messages` (for
+    MidiCache.build_tracks()).
+    """
+    key = (
+        force_choir,
+        er.choirs_separate_channels,
+        tuple(sorted(er.track_dict.items())),
+        tuple(
+            (note.pitch, note.onset, note.dur, note.velocity, note.choir)
+            for note in voice
+        ),
+    )
+    try:
+        cached_key, messages, empty = cache.voices[voice_i]
+    except KeyError:
+        cached_key = None
+    if cached_key != key:
+        voice_mf = types.SimpleNamespace(tracks=collections.defaultdict(list))
+        empty = add_er_voice(
+            er, voice_i, voice, voice_mf, force_choir=force_choir, rng=rng
+        )
+        messages = dict(voice_mf.tracks)
+        cache.voices[voice_i] = (key, messages, empty)
+    for track_i, track_messages in messages.items():
+        voice_messages[track_i].append(track_messages)
+    return empty
+
+
 def write_track_names(settings_obj, mf, abbr_track_names=True):
     """Writes track names to the midi file object."""
 
@@ -412,7 +532,7 @@ def write_program_changes(er, mf, time=0):
                     )
 
 
-def write_tempi(er, mf, total_len):
+def write_tempi(er, mf, total_len, rng=None):
     tempo_i = 0
     time = 0
     while time < total_len:
@@ -420,7 +540,7 @@ def write_tempi(er, mf, total_len):
             tempo = er.get(tempo_i, "tempo")
         else:
             # ideally I should adapt this to preprocessing
-            tempo = random.randrange(*er.tempo_bounds)
+            tempo = er_rng.randrange(er_rng.get_rng(rng), *er.tempo_bounds)
         mf.tracks[META_TRACK].append(
             mido.MetaMessage("set_tempo", tempo=mido.bpm2tempo(tempo), time=time)
         )
@@ -449,6 +569,7 @@ def init_midi(er, super_pattern):
     return mf
 
 
+@er_profile.phase("midi")
 def write_er_midi(
     er,
     super_pattern,
@@ -456,6 +577,7 @@ def write_er_midi(
     reverse_tracks=True,
     return_mf=False,
     dont_write_empty=True,
+    cache=None,
 ):
     """Write a midi file with an ERSettings class.
 
@@ -465,7 +587,15 @@ def write_er_midi(
 
     If return_mf is True, returns the mido MidiFile object. I added this flag
     for testing purposes.
+
+    If cache (a MidiCache) is passed, only the voices that have changed since
+    the last call with the same cache are converted to midi messages again.
     """
+    # The track numbers, etc., are kept in a BuildContext, so the settings
+    #   aren't modified
+    er = er_build_context.build_context(er)
+
+    mf = init_midi(er, super_pattern)
 
     if er.logic_type_pitch_bend and er.tet != 12:
         er.note_counter = collections.Counter()
@@ -474,11 +604,12 @@ def write_er_midi(
             for track_i in range(er.num_new_tracks + er.num_existing_tracks)
         }
 
-    mf = init_midi(er, super_pattern)
-
     write_track_names(er, mf)
 
-    write_tempi(er, mf, er.total_len)
+    # Humanization and random tempi are drawn from streams derived from the
+    #   seed, so that writing the same pattern twice gives the same file
+    rng_streams = er_rng.RNGStreams(er.seed)
+    write_tempi(er, mf, er.total_len, rng=rng_streams.generator("tempi"))
 
     mf.tracks[META_TRACK].append(
         mido.MetaMessage(
@@ -491,12 +622,29 @@ def write_er_midi(
 
     if er.write_program_changes:
         write_program_changes(er, mf)
+    # the pitch-bend channels are shared between the voices on each track when
+    #   logic_type_pitch_bend is True, so the messages of a voice depend on the
+    #   voices before it, and can't be cached
+    if cache is not None and not (er.logic_type_pitch_bend and er.tet != 12):
+        voice_messages = collections.defaultdict(list)
+        add_voice = functools.partial(
+            _add_er_voice_cached, cache=cache, voice_messages=voice_messages
+        )
+    else:
+        voice_messages = None
+        add_voice = add_er_voice
     # non_empty = False
     empty_voices = []
     for voice_i, voice in enumerate(
         super_pattern.voices if not reverse_tracks else reversed(super_pattern.voices)
     ):
-        empty = add_er_voice(er, voice_i, voice, mf)
+        empty = add_voice(
+            er,
+            voice_i,
+            voice,
+            mf,
+            rng=rng_streams.generator("humanize", voice_i),
+        )
         empty_voices.append(empty)
         # if not empty:
         #     non_empty = True
@@ -505,15 +653,17 @@ def write_er_midi(
         if not reverse_tracks
         else reversed(super_pattern.existing_voices)
     ):
-        empty = add_er_voice(
+        voice_i = existing_voice_i + er.num_voices
+        empty = add_voice(
             er,
-            existing_voice_i + er.num_voices,
+            voice_i,
             # I add 1 inside add_er_voice so I don't think adding 1 is necessary
             # here
             # existing_voice_i + er.num_voices + 1,
             existing_voice,
             mf,
             force_choir=0,
+            rng=rng_streams.generator("humanize", voice_i),
         )
         # if not empty:
         #     non_empty = True
@@ -522,7 +672,10 @@ def write_er_midi(
     non_empty = not all(empty_voices)
 
     if non_empty:
-        abs_to_delta_times(mf)
+        if voice_messages is not None:
+            cache.build_tracks(mf, voice_messages)
+        else:
+            abs_to_delta_times(mf)
         if dont_write_empty:
             for i in range(len(mf.tracks) - 1, 0, -1):
                 if not any(msg.type == "note_on" for msg in mf.tracks[i]):
@@ -10,7 +10,7 @@ import typing
 
 import numpy as np
 
-from . import er_globals, er_shell_constants
+from . import er_globals, er_rng, er_shell_constants
 
 MAX_DENOMINATOR = 8192
 
@@ -633,6 +633,19 @@ def binary_search(num_list, num, not_found="none"):
 #             lower_i = i
 
 
+def user_cache_dir():
+    """Returns the directory in which efficient_rhythms caches output between
+    runs (e.g., `~/.cache/efficient_rhythms`).
+    """
+    if os.name == "nt" and "LOCALAPPDATA" in os.environ:
+        base = os.environ["LOCALAPPDATA"]
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+            os.path.expanduser("~"), ".cache"
+        )
+    return os.path.join(base, "efficient_rhythms")
+
+
 def get_changed_midi_path(midi_path):
     root, ext = os.path.splitext(midi_path)
     return increment_fname(root + "_00" + ext, n_digits=2)
@@ -805,7 +818,121 @@ def get_all_pitches_in_range(pcset, boundary_pitches, tet=12):
     return pitches
 
 
-def get_scale_index(scale, pitch, up_or_down=0, return_adjustment_sign=False):
+class ScaleIndex:
+    """Maps pitches to their indices (i.e., scale degrees) in a sorted scale.
+
+    The indices are stored in arrays that span the range of the scale, so
+    that looking up the index of a pitch (or of the nearest pitch in the
+    scale) doesn't require searching the scale.
+
+    >>> scale_index = ScaleIndex([0, 2, 4, 5, 7, 9, 11, 12, 14])
+    >>> scale_index.index(5)
+    3
+    >>> 6 in scale_index, 7 in scale_index
+    (False, True)
+    >>> scale_index.nearest_index(8, up_or_down=1)
+    5
+    >>> scale_index.nearest_index(
+    ...     8, up_or_down=-1, return_adjustment_sign=True
+    ... )
+    (4, -1)
+    >>> scale_index.nearest_index(20)
+    8
+    >>> scale_index.transpose([0, 5, 11], 2)
+    [4, 9, 14]
+    >>> scale_index.transpose([2], -2)
+    Traceback (most recent call last):
+    IndexError: transposing 2 by -2 leaves the scale
+    """
+
+    def __init__(self, scale):
+        self.scale = list(scale)
+        scale = np.array(self.scale)
+        pitches = np.arange(scale[-1] + 1)
+        indices = np.full(len(pitches), -1)
+        indices[scale] = np.arange(len(scale))
+        # the indices of the nearest pitches in the scale at or below, and at
+        #   or above, each pitch
+        below = np.searchsorted(scale, pitches, side="right") - 1
+        above = np.searchsorted(scale, pitches, side="left")
+        dist_below = np.where(below >= 0, pitches - scale[below], len(pitches))
+        dist_above = scale[above] - pitches
+        self._scale = scale
+        self._indices = indices
+        self._index_list = indices.tolist()
+        # when a pitch is equidistant from two pitches in the scale, the first
+        #   list has the index of the higher one, the second of the lower one
+        self._nearest_lists = (
+            np.where(dist_above <= dist_below, above, below).tolist(),
+            np.where(dist_below <= dist_above, below, above).tolist(),
+        )
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.scale})"
+
+    def __contains__(self, pitch):
+        return 0 <= pitch < len(self._index_list) and self._index_list[pitch] >= 0
+
+    def index(self, pitch):
+        """Returns the index of `pitch`, like list.index()."""
+        if 0 <= pitch < len(self._index_list):
+            i = self._index_list[pitch]
+            if i >= 0:
+                return i
+        raise ValueError(f"{pitch} is not in scale")
+
+    def nearest_index(
+        self, pitch, up_or_down=0, return_adjustment_sign=False, rng=None
+    ):
+        """Returns the index of `pitch`, or of the nearest pitch in the scale
+        if `pitch` isn't in the scale.
+
+        The arguments are as for get_scale_index(). The generator is only
+        drawn from if `up_or_down` is 0 and `pitch` is equidistant from two
+        pitches in the scale.
+        """
+        clipped = min(max(pitch, 0), len(self._index_list) - 1)
+        up_first, down_first = (
+            self._nearest_lists[0][clipped],
+            self._nearest_lists[1][clipped],
+        )
+        if up_first == down_first:
+            i = up_first
+        elif up_or_down == 0:
+            i = er_rng.choice(er_rng.get_rng(rng), (up_first, down_first))
+        else:
+            i = up_first if up_or_down > 0 else down_first
+        if return_adjustment_sign:
+            return (i, int(np.sign(self.scale[i] - pitch)))
+        return i
+
+    def transpose(self, pitches, generic_interval):
+        """Transposes a sequence of pitches, all of which must be in the scale,
+        by a generic interval. Returns a list of the transposed pitches.
+
+        Raises ValueError if any of the pitches isn't in the scale, and
+        IndexError if any of the transposed pitches would lie above or below
+        the scale.
+        """
+        pitches = np.asarray(pitches, dtype=np.int64)
+        in_range = (pitches >= 0) & (pitches < len(self._indices))
+        clipped = np.clip(pitches, 0, len(self._indices) - 1)
+        indices = np.where(in_range, self._indices[clipped], -1)
+        if (indices < 0).any():
+            raise ValueError(f"{pitches[indices < 0][0]} is not in scale")
+        indices += generic_interval
+        out_of_range = (indices < 0) | (indices >= len(self._scale))
+        if out_of_range.any():
+            raise IndexError(
+                f"transposing {pitches[out_of_range][0]} by {generic_interval} "
+                "leaves the scale"
+            )
+        return self._scale[indices].tolist()
+
+
+def get_scale_index(
+    scale, pitch, up_or_down=0, return_adjustment_sign=False, rng=None
+):
     """If prev_pitch is in a previous harmony (and not in the present
     harmony), then the generic interval to it is undefined. But we can get an
     appropriate value by taking the nearest pitch to it in the
@@ -822,15 +949,19 @@ def get_scale_index(scale, pitch, up_or_down=0, return_adjustment_sign=False):
             and the sign (-1, 0, or 1) of the adjustment necessary (or not
             necessary, in the case of 0). The idea is that this might be
             useful in some cases...
+        rng: the NumPy Generator used to choose the direction if up_or_down
+            is 0. If None, the global generator is used.
     """
 
     try:
         return scale.index(pitch)
     except ValueError:
+        if up_or_down == 0:
+            rng = er_rng.get_rng(rng)
         i = 1
         while True:
             if up_or_down == 0:
-                adjust = random.choice((i, -i))
+                adjust = er_rng.choice(rng, (i, -i))
             elif up_or_down > 0:
                 adjust = i
             elif up_or_down < 0:
@@ -846,24 +977,26 @@ def get_scale_index(scale, pitch, up_or_down=0, return_adjustment_sign=False):
             i += 1
 
 
-def get_generic_interval(er, harmony_i, pitch, prev_pitch):
-    scale = er.get(harmony_i, "gamut_scales")
+def get_generic_interval(er, harmony_i, pitch, prev_pitch, rng=None):
+    scale = er.harmony[harmony_i].gamut_scale_index
     # I had set up_or_down to 1 at one point because I believe the randomness
     #   was causing issues with testing or reproducibility. But it appears to be
     #   ok now.
-    prev_scale_index = get_scale_index(scale, prev_pitch, up_or_down=0)
+    prev_scale_index = scale.nearest_index(prev_pitch, up_or_down=0, rng=rng)
     scale_index = scale.index(pitch)
 
     return scale_index - prev_scale_index
 
 
-def apply_generic_interval(er, harmony_i, generic_interval, prev_pitch):
-    scale = er.get(harmony_i, "gamut_scales")
+def apply_generic_interval(
+    er, harmony_i, generic_interval, prev_pitch, rng=None
+):
+    scale = er.harmony[harmony_i].gamut_scale_index
     # I had set up_or_down to -1 at one point because I believe the randomness
     #   was causing issues with testing or reproducibility. But it appears to be
     #   ok now.
-    prev_scale_index = get_scale_index(scale, prev_pitch, up_or_down=0)
-    new_pitch = scale[prev_scale_index + generic_interval]
+    prev_scale_index = scale.nearest_index(prev_pitch, up_or_down=0, rng=rng)
+    new_pitch = scale.scale[prev_scale_index + generic_interval]
     return new_pitch
 
 
@@ -10,11 +10,15 @@ Requires quite a few dependencies that are run from the shell:
     - img2pdf (obtainable from pypi)
 """
 # INTERNET: add websites for dependencies
-import copy
+import concurrent.futures
+import functools
+import hashlib
+import heapq
 import math
 import os
 import re
 import shutil
+import tempfile
 from fractions import Fraction
 
 # TODO document mspell requirements, make sure mspell is on
@@ -32,6 +36,17 @@ TEMP_NOTATION_DIR = os.path.join(
 )
 
 
+NOTATION_CACHE_DIR = os.path.join(er_misc_funcs.user_cache_dir(), "notation")
+
+# The number of rendered scores that are kept in the notation cache; the
+#   least recently used are removed first
+NOTATION_CACHE_SIZE = 16
+
+# Scores are split into chunks of (at least) this many measures, which are
+#   rendered concurrently
+CHUNK_MEASURES = 32
+
+
 # def dur_to_kern2(dur, offset, time_sig_dur, unbreakable_value=1):
 #     out = []
 #     while dur:
@@ -215,63 +230,99 @@ def write_kern(super_pattern, kern_file):
         outf.write(get_kern(super_pattern))
 
 
+@functools.lru_cache(maxsize=None, typed=True)
+def _cached_dur_to_kern(dur, offset, unbreakable_value, time_sig_dur):
+    # The durations of a score are mostly the same few values at the same few
+    #   offsets within the bar, so we only compute each conversion once.
+    #   `offset` should already be taken modulo `time_sig_dur`.
+    return tuple(
+        dur_to_kern(
+            dur,
+            offset=offset,
+            unbreakable_value=unbreakable_value,
+            time_sig_dur=time_sig_dur,
+        )
+    )
+
+
+def _get_voice_kern(
+    voice, harmony_times, speller, unbreakable_value, time_sig_dur
+):
+    """Returns a dict mapping the onsets of the kern tokens of a voice
+    (including the onsets of the later segments of tied notes) to the tokens,
+    and a list of the pitches of the voice.
+    """
+    pitches = []
+    notes_by_onset = {}
+    polyphonic_onsets = set()
+    ties = {}
+    for harmony_time in harmony_times:
+        notes = list(
+            voice.between(harmony_time.start_time, harmony_time.end_time)
+        )
+        # the notes are spelled harmony by harmony
+        spelled = speller.pitches([note.pitch for note in notes])
+        pitches.extend([note.pitch for note in notes if note.pitch])
+        for note, spelling in zip(notes, spelled):
+            note.spelling = spelling
+            onset = note.onset
+            if onset in notes_by_onset:
+                polyphonic_onsets.add(onset)
+            else:
+                notes_by_onset[onset] = note
+
+            # add supplementary onsets for tied notes where necessary
+            durs = _cached_dur_to_kern(
+                note.dur, onset % time_sig_dur, unbreakable_value, time_sig_dur
+            )
+            if len(durs) > 1:
+                ties[onset] = "[" + durs[0][1] + spelling
+                supplementary_onset = onset
+                for i in range(1, len(durs)):
+                    supplementary_onset += durs[i - 1][0]
+                    ties[supplementary_onset] = (
+                        durs[i][1]
+                        + spelling
+                        + ("]" if i == len(durs) - 1 else "")
+                    )
+
+    tokens = {}
+    for onset, note in notes_by_onset.items():
+        if onset in ties:
+            continue
+        if onset in polyphonic_onsets:
+            raise NotImplementedError(
+                "No support for writing polyphonic voices to kern yet"
+            )
+        kern_dur = _cached_dur_to_kern(note.dur, 0, Fraction(1, 1), 4)
+        if len(kern_dur) != 1:
+            input("Tied note seems to have gotten through!")
+        tokens[onset] = kern_dur[0][1] + note.spelling
+    tokens.update(ties)
+    return tokens, pitches
+
+
 def get_kern(super_pattern):
     unbreakable_value = Fraction(1, 1)
 
     num_voices = len(super_pattern.voices)
     speller = mspell.GroupSpeller(tet=super_pattern.tet, letter_format="kern")
 
-    voice_ps = [[] for voice_i in range(num_voices)]
-    ties = [{} for voice_i in range(num_voices)]
-    onsets = []
-
     numer, denom = super_pattern.time_sig
     time_sig_dur = numer * 4 / denom
 
     # If there are notes in one more voices that extend past the end
     # of the last harmony, then the other voices will be filled with rests
     # during the relevant duration of the last harmony.
-    for harmony_time in super_pattern.harmony_times:
-        harmony = super_pattern.get_passage(
-            harmony_time.start_time, harmony_time.end_time, make_copy=False
+    harmony_times = super_pattern.harmony_times
+    voice_tokens = []
+    voice_ps = []
+    for voice in super_pattern.voices:
+        tokens, pitches = _get_voice_kern(
+            voice, harmony_times, speller, unbreakable_value, time_sig_dur
         )
-        for voice_i, voice in enumerate(harmony.voices):
-            spelled = speller.pitches([note.pitch for note in voice])
-            voice_ps[voice_i].extend(
-                [note.pitch for note in voice if note.pitch]
-            )
-            for note, spelling in zip(voice, spelled):
-                note.spelling = spelling
-                onset = note.onset
-                onsets.append(onset)
-
-                # add supplementary onsets for tied notes where necessary
-                durs = dur_to_kern(
-                    note.dur,
-                    offset=onset,
-                    unbreakable_value=unbreakable_value,
-                    time_sig_dur=time_sig_dur,
-                )
-                if len(durs) > 1:
-                    ties[voice_i][onset] = (durs[0][1], note.spelling, "start")
-                    for i in range(1, len(durs)):
-                        supplementary_onset = sum(
-                            [
-                                onset,
-                            ]
-                            + [durs[j][0] for j in range(i)]
-                        )
-                        onsets.append(supplementary_onset)
-                        ties[voice_i][supplementary_onset] = (
-                            durs[i][1],
-                            note.spelling,
-                            "end" if i == len(durs) - 1 else "middle",
-                        )
-
-    onsets = sorted(list(set(onsets)))
-
-    # outkern = open(kern_file, "w", encoding="utf8")
-    outkern = []
+        voice_tokens.append(tokens)
+        voice_ps.append(pitches)
 
     # select clefs
     clefs = []
@@ -284,70 +335,37 @@ def get_kern(super_pattern):
         else:
             clefs.append("*clefG2")
 
-    preamble_bits = ["**kern", "*M" + str(numer) + "/" + str(denom)]
+    def _spine_line(tokens):
+        return "\t".join(tokens) + "\n"
 
-    def _kern_white_space(voice):
-        if voice == num_voices - 1:
-            return "\n"
-        return "\t"
-
-    for bit in preamble_bits:
-        for voice_i in range(num_voices):
-            # outkern.write(bit)
-            # outkern.write(_kern_white_space(voice_i))
-            outkern.append(bit)
-            outkern.append(_kern_white_space(voice_i))
-    for i, clef in enumerate(clefs):
-        outkern.append(clef)
-        outkern.append(_kern_white_space(i))
+    outkern = [
+        _spine_line(["**kern"] * num_voices),
+        _spine_line(["*M" + str(numer) + "/" + str(denom)] * num_voices),
+        _spine_line(clefs),
+    ]
 
     measure_counter = 0
 
-    for onset in onsets:
+    # the onsets of all the voices, in order
+    prev_onset = None
+    for onset in heapq.merge(*(sorted(tokens) for tokens in voice_tokens)):
+        if onset == prev_onset:
+            continue
+        prev_onset = onset
         if onset % time_sig_dur == 0:
             # write bar line
             measure_counter += 1
-            for voice in range(num_voices):
-                outkern.append("=" + str(measure_counter))
-                outkern.append(_kern_white_space(voice))
-        for voice in range(num_voices):
-            if onset in ties[voice]:
-                kern_dur, kern_letter, tie_status = ties[voice][onset]
-                if tie_status == "end":
-                    outkern.append(kern_dur + kern_letter + "]")
-                elif tie_status == "start":
-                    outkern.append("[" + kern_dur + kern_letter)
-                else:
-                    outkern.append(kern_dur + kern_letter)
-            elif onset in super_pattern.voices[voice]:
-                note = super_pattern.voices[voice][onset][0]
-                if len(super_pattern.voices[voice][onset]) > 1:
-                    raise NotImplementedError(
-                        "No support for writing polyphonic voices to kern yet"
-                    )
-                dur = note.dur
-                kern_letter = note.spelling
-                kern_dur = dur_to_kern(dur)
-                if len(kern_dur) != 1:
-                    input("Tied note seems to have gotten through!")
-                kern_dur = kern_dur[0][1]
-                outkern.append(kern_dur + kern_letter)
-            else:
-                outkern.append(".")
-            outkern.append(_kern_white_space(voice))
-
-    afterword_bits = [
-        "=" + str(measure_counter),
-        "*-",
-    ]
+            outkern.append(
+                _spine_line(["=" + str(measure_counter)] * num_voices)
+            )
+        outkern.append(
+            _spine_line([tokens.get(onset, ".") for tokens in voice_tokens])
+        )
 
-    for bit in afterword_bits:
-        for voice in range(num_voices):
-            outkern.append(bit)
-            outkern.append(_kern_white_space(voice))
+    outkern.append(_spine_line(["=" + str(measure_counter)] * num_voices))
+    outkern.append(_spine_line(["*-"] * num_voices))
     outkern.append("!!!filter: autobeam")
 
-    # outkern.close()
     return "".join(outkern)
 
 
@@ -387,77 +405,278 @@ def tidy_up(temp_paths, permanent_dirname):
     clean_up_temporary_notation_files()
 
 
-def write_notation(kern_file, dirname, filetype=".pdf", verovio_arguments=None):
-    """Runs shell commands to convert a kern file to pdf."""
+def split_kern(kern, chunk_measures=None):
+    """Splits a kern score into chunks of at least `chunk_measures` measures,
+    which can be rendered separately.
+
+    Each chunk has the preamble (clefs, meter, etc.) of the score, and chunks
+    only begin at bar lines where no tie is held over. Scores that are too
+    short to be split are returned as they are.
+
+    >>> kern = "\\n".join(
+    ...     ["**kern", "*M2/4", "*clefG2"]
+    ...     + ["=1", "[2c", "=2", "2c]", "=3", "2d", "=4", "2e"]
+    ...     + ["=4", "*-", "!!!filter: autobeam"]
+    ... )
+    >>> for chunk in split_kern(kern, chunk_measures=1):
+    ...     print(chunk.split("\\n")[3:-2])
+    ['=1', '[2c', '=2', '2c]', '=3']
+    ['=3', '2d', '=4']
+    ['=4', '2e', '=4']
+    """
+    if chunk_measures is None:
+        chunk_measures = CHUNK_MEASURES
+    lines = kern.split("\n")
+    first_bar_i = next(
+        i for i, line in enumerate(lines) if line.startswith("=")
+    )
+    end_i = lines.index("*-" + "\t*-" * lines[0].count("\t"))
+    # the last bar line (before "*-") closes the final measure
+    preamble, body, ending = (
+        lines[:first_bar_i],
+        lines[first_bar_i : end_i - 1],
+        lines[end_i:],
+    )
+    chunks = []
+    chunk_start_i = 0
+    n_measures = 0
+    open_ties = set()
+    for i, line in enumerate(body):
+        if line.startswith("="):
+            if n_measures >= chunk_measures and not open_ties:
+                chunks.append(body[chunk_start_i:i] + [line])
+                chunk_start_i = i
+                n_measures = 0
+            n_measures += 1
+            continue
+        for spine_i, token in enumerate(line.split("\t")):
+            if token.startswith("["):
+                open_ties.add(spine_i)
+            elif token.endswith("]"):
+                open_ties.discard(spine_i)
+    if not chunks:
+        return [kern]
+    chunks.append(body[chunk_start_i:] + [lines[end_i - 1]])
+    return ["\n".join(preamble + chunk + ending) for chunk in chunks]
+
+
+def _notation_cache_key(kern, filetype, verovio_arguments):
+    hasher = hashlib.sha256()
+    hasher.update(f"{CHUNK_MEASURES}:{filetype}:{verovio_arguments}\n".encode())
+    hasher.update(kern.encode())
+    return hasher.hexdigest()
+
+
+def _output_paths(base_path, filetype, n_pages):
+    if n_pages == 1:
+        return [base_path + filetype]
+    return [f"{base_path}_{i:03d}{filetype}" for i in range(1, n_pages + 1)]
+
+
+def _read_notation_cache(cache_dir, key, base_path):
+    """Copies the cached output files (if any) to the paths of the output of
+    `base_path`, and returns the paths. Returns None if there are no cached
+    output files.
+    """
+    cache_path = os.path.join(cache_dir, key)
+    try:
+        suffixes = sorted(os.listdir(cache_path))
+        # mark the entry as recently used (see _evict_notation_cache())
+        os.utime(cache_path)
+    except FileNotFoundError:
+        return None
+    output_paths = [base_path + suffix for suffix in suffixes]
+    for suffix, output_path in zip(suffixes, output_paths):
+        shutil.copy(os.path.join(cache_path, suffix), output_path)
+    return output_paths
+
+
+def _write_notation_cache(cache_dir, key, base_path, output_paths):
+    """The output files are cached under their names minus `base_path` (e.g.,
+    "_001.svg"), so that a cache hit restores exactly the same names, even if
+    the score is written to a different path.
+    """
+    # The files are written to a temporary directory that is then renamed,
+    #   so that the cache never contains a partial entry
+    os.makedirs(cache_dir, exist_ok=True)
+    temp_path = tempfile.mkdtemp(dir=cache_dir, suffix=".tmp")
+    for output_path in output_paths:
+        shutil.copy(
+            output_path,
+            os.path.join(temp_path, output_path[len(base_path) :]),
+        )
+    try:
+        os.rename(temp_path, os.path.join(cache_dir, key))
+    except OSError:
+        # Another process has cached the same output
+        shutil.rmtree(temp_path)
+    _evict_notation_cache(cache_dir)
+
+
+def _evict_notation_cache(cache_dir):
+    """Removes all but the NOTATION_CACHE_SIZE most recently used entries."""
+    entries = []
+    for entry in os.scandir(cache_dir):
+        if entry.is_dir() and not entry.name.endswith(".tmp"):
+            try:
+                entries.append((entry.stat().st_mtime_ns, entry.path))
+            except FileNotFoundError:  # removed by another process
+                pass
+    for _, path in sorted(entries, reverse=True)[NOTATION_CACHE_SIZE:]:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def _run_verovio(kern_path, verovio_arguments):
+    verovio_proc = er_misc_funcs.silently_run_process(
+        [
+            "verovio",
+            kern_path,
+            "-o",
+            os.path.splitext(kern_path)[0] + ".svg",
+            "--no-footer",
+            "--no-header",
+        ]
+        + verovio_arguments
+    )
+    return re.findall(
+        r"Output written to (.*\.svg)",
+        verovio_proc.stdout.decode(),
+        re.MULTILINE,
+    )
+
+
+def _convert_to_png(svg_path):
+    png_path = os.path.splitext(svg_path)[0] + ".png"
+    er_misc_funcs.silently_run_process(["convert", svg_path, png_path])
+    return png_path
+
+
+def _report_notation_failure():
+    print("Notation output failed: verovio didn't write any output files")
+    clean_up_temporary_notation_files()
+
+
+def write_notation(
+    kern_file,
+    dirname,
+    filetype=".pdf",
+    verovio_arguments=None,
+    max_workers=None,
+    cache_dir=None,
+):
+    """Runs shell commands to convert a kern file to pdf.
+
+    If all pages are rendered (as they are by default), long scores are split
+    into chunks (see split_kern()) which are rendered, and whose pages are
+    converted, concurrently by up to `max_workers` processes (by default, the
+    number of CPUs). Other verovio arguments (e.g., `--page`) refer to the
+    pages of the whole score, so then the score is rendered in one piece. The
+    output is cached in `cache_dir` (by default NOTATION_CACHE_DIR) by the
+    hash of the kern file and the arguments, so re-rendering an unchanged
+    score just copies the cached output. Only the NOTATION_CACHE_SIZE most
+    recently used scores are kept in the cache.
+
+    Returns True if the notation was written, False otherwise. Failed renders
+    are not cached.
+    """
 
     if filetype not in [".svg", ".png", ".pdf"]:
         print(f"filetype {filetype} not recognized!")
-        return
+        return False
     if not shutil.which("verovio"):
         print("'verovio' not found! Make sure it is in your path and re-try.")
-        return
+        return False
     if filetype != ".svg" and not shutil.which("convert"):
         print(
             "'convert' not found! Make sure it is in your path (maybe you need "
             "to install ImageMagick) and re-try."
         )
-        return
+        return False
     if filetype == ".pdf" and not shutil.which("img2pdf"):
         print("'img2pdf' not found! Make sure it is in your path and re-try.")
-        return
+        return False
     if verovio_arguments is not None:
         verovio_arguments = verovio_arguments.split()
     else:
         verovio_arguments = ["--all-pages"]
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if cache_dir is None:
+        cache_dir = NOTATION_CACHE_DIR
+
+    with open(kern_file, "r", encoding="utf8") as inf:
+        kern = inf.read()
+    base_path = os.path.splitext(kern_file)[0]
+    key = _notation_cache_key(kern, filetype, verovio_arguments)
+    cached_paths = _read_notation_cache(cache_dir, key, base_path)
+    if cached_paths is not None:
+        tidy_up(cached_paths, dirname)
+        return True
 
-    vrv_out = os.path.splitext(kern_file)[0] + ".svg"
-    print("Writing svgs...")
-
-    verovio_proc = er_misc_funcs.silently_run_process(
-        [
-            "verovio",
-            kern_file,
-            "-o",
-            vrv_out,
-            "--no-footer",
-            "--no-header",
-        ]
-        + verovio_arguments
-    )
-
-    svg_paths = re.findall(
-        r"Output written to (.*\.svg)",
-        verovio_proc.stdout.decode(),
-        re.MULTILINE,
-    )
-
-    if filetype == ".svg":
-        tidy_up(svg_paths, dirname)
-        return
-
-    # convert svg to png
-    print("Converting svgs to pngs...")
-    png_paths = []
-    for svg_path in svg_paths:
-        png_path = os.path.splitext(svg_path)[0] + ".png"
-        er_misc_funcs.silently_run_process(["convert", svg_path, png_path])
-        png_paths.append(png_path)
-    if filetype == ".png":
-        tidy_up(png_paths, dirname)
-        return
-
-    # convert png to pdf
-    pdf_path = os.path.splitext(kern_file)[0] + ".pdf"
-    print("Converting pngs to pdf...")
-    er_misc_funcs.silently_run_process(
-        [
-            "img2pdf",
+    if "--all-pages" in verovio_arguments or "-a" in verovio_arguments:
+        chunks = split_kern(kern)
+    else:
+        chunks = [kern]
+    if len(chunks) == 1:
+        chunk_paths = [kern_file]
+    else:
+        chunk_paths = []
+        for chunk_i, chunk in enumerate(chunks):
+            chunk_path = f"{base_path}_chunk{chunk_i:03d}.krn"
+            with open(chunk_path, "w", encoding="utf8") as outf:
+                outf.write(chunk)
+            chunk_paths.append(chunk_path)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers) as executor:
+        print("Writing svgs...")
+        svg_paths = [
+            svg_path
+            for chunk_svg_paths in executor.map(
+                functools.partial(
+                    _run_verovio, verovio_arguments=verovio_arguments
+                ),
+                chunk_paths,
+            )
+            for svg_path in chunk_svg_paths
         ]
-        + png_paths
-        + ["-o", pdf_path]
-    )
+        page_paths = svg_paths
+        if filetype != ".svg":
+            # convert svg to png
+            print("Converting svgs to pngs...")
+            page_paths = list(executor.map(_convert_to_png, svg_paths))
+
+    if not page_paths:
+        _report_notation_failure()
+        return False
+    if len(chunks) == 1:
+        output_paths = page_paths
+    else:
+        # the pages are renamed as if they had been rendered together
+        output_paths = _output_paths(
+            base_path, os.path.splitext(page_paths[0])[1], len(page_paths)
+        )
+        for page_path, output_path in zip(page_paths, output_paths):
+            os.replace(page_path, output_path)
+
+    if filetype == ".pdf":
+        # convert png to pdf
+        pdf_path = base_path + ".pdf"
+        print("Converting pngs to pdf...")
+        er_misc_funcs.silently_run_process(
+            [
+                "img2pdf",
+            ]
+            + output_paths
+            + ["-o", pdf_path]
+        )
+        output_paths = [pdf_path]
 
-    tidy_up(pdf_path, dirname)
+    if not all(os.path.exists(path) for path in output_paths):
+        _report_notation_failure()
+        return False
+    _write_notation_cache(cache_dir, key, base_path, output_paths)
+    tidy_up(output_paths, dirname)
+    return True
 
 
 def run_verovio(super_pattern, midi_path, verovio_arguments, file_type):
@@ -476,7 +695,7 @@ def run_verovio(super_pattern, midi_path, verovio_arguments, file_type):
         )
         return False
 
-    copied_pattern = copy.deepcopy(super_pattern)
+    copied_pattern = super_pattern.copy()
     copied_pattern.fill_with_rests(super_pattern.total_dur)
 
     kern_basename = os.path.basename(os.path.splitext(midi_path)[0] + ".krn")
@@ -486,10 +705,9 @@ def run_verovio(super_pattern, midi_path, verovio_arguments, file_type):
     init_temp_notation_dir()
 
     write_kern(copied_pattern, kern_path)
-    write_notation(
+    return write_notation(
         kern_path,
         dirname,
         filetype=file_type,
         verovio_arguments=verovio_arguments,
     )
-    return True
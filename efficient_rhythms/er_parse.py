@@ -0,0 +1,403 @@
+"""Parses settings and changer files without eval().
+
+Settings files contain Python literals, together with the names of the
+constants in er_constants and simple arithmetic on them (e.g.,
+`C * MAJOR_TRIAD`). Rather than eval()-ing the files, we parse them with the
+ast module and evaluate only this subset of Python. Besides being safe, this
+lets us cache parsed pitch expressions.
+
+Settings can also be read from JSON or TOML files. (Since these formats have
+no arithmetic, any constants must be given as strings, e.g.,
+`"chords": ["MAJOR_TRIAD", "C * MINOR_TRIAD"]`, which are then processed
+like other pitch strings.)
+"""
+import ast
+import functools
+import json
+import operator
+import os
+import re
+
+import numpy as np
+
+from . import er_constants
+from . import er_exceptions
+
+CONSTANTS = {
+    name: val
+    for name, val in vars(er_constants).items()
+    if not name.startswith("_") and name != "np"
+}
+
+# Limits on the size of what settings can compute, so that an expression like
+#   `9 ** 9 ** 9` or `[0 for i in range(10 ** 12)]` raises a SettingsParseError
+#   rather than hanging or exhausting memory
+MAX_EXPONENT = 1024
+MAX_INT_BITS = 4096
+MAX_LENGTH = 100_000
+
+
+def _pow(base, exponent):
+    if np.any(np.abs(exponent) > MAX_EXPONENT):
+        raise SettingsParseError(
+            f"Exponent in settings exceeds {MAX_EXPONENT}: {exponent}"
+        )
+    if (
+        isinstance(base, int)
+        and isinstance(exponent, int)
+        and abs(base).bit_length() * exponent > MAX_INT_BITS
+    ):
+        raise SettingsParseError(
+            f"Result of {base} ** {exponent} in settings is too large"
+        )
+    return operator.pow(base, exponent)
+
+
+def _mul(a, b):
+    # Sequence repetition like `[0] * n`
+    for seq, n in ((a, b), (b, a)):
+        if (
+            isinstance(seq, (list, tuple, str))
+            and isinstance(n, int)
+            and len(seq) * n > MAX_LENGTH
+        ):
+            raise SettingsParseError(
+                f"Sequence in settings exceeds {MAX_LENGTH} items"
+            )
+    return operator.mul(a, b)
+
+
+def _range(*args):
+    out = range(*args)
+    if len(out) > MAX_LENGTH:
+        raise SettingsParseError(
+            f"Range in settings exceeds {MAX_LENGTH} items"
+        )
+    return out
+
+
+_BIN_OPS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: _mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: _pow,
+}
+
+_UNARY_OPS = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+    ast.Not: operator.not_,
+}
+
+_COMPARE_OPS = {
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+    ast.In: lambda a, b: a in b,
+    ast.NotIn: lambda a, b: a not in b,
+}
+
+# The only functions that can be called in settings
+FUNCTIONS = {
+    func.__name__: func
+    for func in (
+        abs,
+        float,
+        int,
+        len,
+        list,
+        max,
+        min,
+        round,
+        sum,
+        tuple,
+    )
+}
+FUNCTIONS["range"] = _range
+
+# Pitch names followed by an octave number, like "D_SHARP4" (from "D#4") or
+# "Eb3". Following scientific pitch notation, C4 is middle C.
+_PITCH_WITH_OCTAVE_RE = re.compile(r"^([A-G](?:_SHARP|_FLAT|b)*)(\d)$")
+
+
+class SettingsParseError(er_exceptions.ErSettingsError):
+    pass
+
+
+class _Evaluator:
+    def __init__(self, names):
+        self.names = names
+        self.scopes = []
+        # Total iterations of all comprehensions in the expression
+        self.iterations = 0
+
+    def __call__(self, node):
+        try:
+            method = getattr(self, "_" + node.__class__.__name__)
+        except AttributeError:
+            raise SettingsParseError(  # pylint: disable=raise-missing-from
+                f"Unsupported syntax in settings: {ast.unparse(node)}"
+            )
+        return method(node)
+
+    def _Expression(self, node):
+        return self(node.body)
+
+    def _Constant(self, node):
+        return node.value
+
+    def _Tuple(self, node):
+        return tuple(self._elts(node.elts))
+
+    def _List(self, node):
+        return list(self._elts(node.elts))
+
+    def _Set(self, node):
+        return set(self._elts(node.elts))
+
+    def _elts(self, elts):
+        out = []
+        for elt in elts:
+            if isinstance(elt, ast.Starred):
+                out.extend(self(elt.value))
+            else:
+                out.append(self(elt))
+        return out
+
+    def _Dict(self, node):
+        out = {}
+        for key, val in zip(node.keys, node.values):
+            if key is None:
+                # **unpacking
+                out.update(self(val))
+            else:
+                out[self(key)] = self(val)
+        return out
+
+    def _Name(self, node):
+        name = node.id
+        for scope in reversed(self.scopes):
+            if name in scope:
+                return scope[name]
+        return lookup_name(name, self.names)
+
+    def _UnaryOp(self, node):
+        return self._op(_UNARY_OPS, node.op)(self(node.operand))
+
+    def _BinOp(self, node):
+        return self._op(_BIN_OPS, node.op)(self(node.left), self(node.right))
+
+    def _BoolOp(self, node):
+        is_and = isinstance(node.op, ast.And)
+        for value_node in node.values:
+            val = self(value_node)
+            if bool(val) != is_and:
+                return val
+        return val  # pylint: disable=undefined-loop-variable
+
+    def _Compare(self, node):
+        left = self(node.left)
+        for op, right_node in zip(node.ops, node.comparators):
+            right = self(right_node)
+            if not self._op(_COMPARE_OPS, op)(left, right):
+                return False
+            left = right
+        return True
+
+    def _IfExp(self, node):
+        return self(node.body) if self(node.test) else self(node.orelse)
+
+    def _Subscript(self, node):
+        return self(node.value)[self(node.slice)]
+
+    def _Slice(self, node):
+        return slice(
+            *(
+                None if item is None else self(item)
+                for item in (node.lower, node.upper, node.step)
+            )
+        )
+
+    def _Call(self, node):
+        if not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS:
+            raise SettingsParseError(
+                f"Unsupported function call in settings: {ast.unparse(node)}"
+            )
+        args = self._elts(node.args)
+        kwargs = {keyword.arg: self(keyword.value) for keyword in node.keywords}
+        return FUNCTIONS[node.func.id](*args, **kwargs)
+
+    def _ListComp(self, node):
+        return list(self._comprehension(node.elt, node.generators))
+
+    def _GeneratorExp(self, node):
+        # We evaluate generator expressions eagerly
+        return tuple(self._comprehension(node.elt, node.generators))
+
+    def _SetComp(self, node):
+        return set(self._comprehension(node.elt, node.generators))
+
+    def _DictComp(self, node):
+        return dict(
+            self._comprehension(
+                ast.Tuple(elts=[node.key, node.value], ctx=ast.Load()),
+                node.generators,
+            )
+        )
+
+    def _comprehension(self, elt, generators):
+        generator, *remaining = generators
+        for item in self(generator.iter):
+            self.iterations += 1
+            if self.iterations > MAX_LENGTH:
+                raise SettingsParseError(
+                    f"Comprehensions in settings exceed {MAX_LENGTH} iterations"
+                )
+            scope = {}
+            self._assign(generator.target, item, scope)
+            self.scopes.append(scope)
+            try:
+                if all(self(if_) for if_ in generator.ifs):
+                    if remaining:
+                        yield from self._comprehension(elt, remaining)
+                    else:
+                        yield self(elt)
+            finally:
+                self.scopes.pop()
+
+    def _assign(self, target, item, scope):
+        if isinstance(target, ast.Name):
+            scope[target.id] = item
+        elif isinstance(target, (ast.Tuple, ast.List)):
+            items = tuple(item)
+            if len(items) != len(target.elts):
+                raise SettingsParseError(
+                    f"Can't unpack {item} into {ast.unparse(target)}"
+                )
+            for sub_target, sub_item in zip(target.elts, items):
+                self._assign(sub_target, sub_item, scope)
+        else:
+            raise SettingsParseError(
+                f"Unsupported syntax in settings: {ast.unparse(target)}"
+            )
+
+    @staticmethod
+    def _op(ops, op):
+        try:
+            return ops[type(op)]
+        except KeyError:
+            raise SettingsParseError(  # pylint: disable=raise-missing-from
+                f"Unsupported operator in settings: {op.__class__.__name__}"
+            )
+
+
+def lookup_name(name, names=None):
+    """Looks up a constant name.
+
+    Pitch names may be followed by an octave number.
+
+    >>> lookup_name("C4") == lookup_name("C") * lookup_name("OCTAVE4")
+    True
+    >>> lookup_name("Eb3") == lookup_name("Eb") * lookup_name("OCTAVE3")
+    True
+    >>> lookup_name("H4")  # doctest: +ELLIPSIS
+    Traceback (most recent call last):
+    efficient_rhythms.er_parse.SettingsParseError: Unknown name in settings...
+    """
+    if names is None:
+        names = CONSTANTS
+    try:
+        return names[name]
+    except KeyError:
+        pass
+    match = _PITCH_WITH_OCTAVE_RE.match(name)
+    if match and match.group(1) in names:
+        return names[match.group(1)] * names[f"OCTAVE{match.group(2)}"]
+    raise SettingsParseError(f"Unknown name in settings: {name!r}")
+
+
+def _parse(source):
+    try:
+        return ast.parse(source.strip(), mode="eval")
+    except SyntaxError as exc:
+        raise SettingsParseError(
+            f"Unable to parse settings: {exc}\n{source}"
+        ) from exc
+
+
+# Settings expressions (e.g., pitch strings) are often repeated, so we cache
+# them when parsing them one at a time
+_parse_cached = functools.lru_cache(maxsize=4096)(_parse)
+
+
+def parse_expression(source, names=None):
+    """Evaluates a settings expression without eval().
+
+    Parsed expressions are cached, so evaluating the same expression
+    repeatedly (as happens with pitch strings in settings) is cheap. Since
+    the expression is evaluated anew each time, the result can safely be
+    mutated.
+
+    >>> parse_expression("[i * 2 for i in range(3)]")
+    [0, 2, 4]
+    >>> parse_expression("C * MAJOR_TRIAD")
+    array([1.  , 1.25, 1.5 ])
+    >>> parse_expression("__import__('os')")  # doctest: +ELLIPSIS
+    Traceback (most recent call last):
+    efficient_rhythms.er_parse.SettingsParseError: Unsupported function call...
+    >>> parse_expression("MAJOR_TRIAD.__class__")  # doctest: +ELLIPSIS
+    Traceback (most recent call last):
+    efficient_rhythms.er_parse.SettingsParseError: Unsupported syntax...
+    """
+    return _Evaluator(CONSTANTS if names is None else names)(
+        _parse_cached(source)
+    )
+
+
+def parse_pitch_str(pitch_str):
+    """Evaluates a pitch string from settings.
+
+    "#" is replaced by "_SHARP", since "#" isn't a valid character in Python
+    identifiers.
+
+    >>> parse_pitch_str("D#4") == parse_expression("D_SHARP * OCTAVE4")
+    True
+    """
+    return parse_expression(pitch_str.replace("#", "_SHARP"))
+
+
+def read_settings_file(path):
+    """Reads a settings (or changers) file.
+
+    Files ending in ".json" or ".toml" are read as JSON or TOML respectively.
+    Any other file should contain a Python expression (e.g., a dict literal),
+    which is parsed with parse_expression().
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".json":
+        with open(path, "r", encoding="utf-8") as inf:
+            return json.load(inf)
+    if ext == ".toml":
+        try:
+            import tomllib  # pylint: disable=import-outside-toplevel
+        except ImportError:
+            # Python < 3.11
+            # pylint: disable=import-outside-toplevel
+            try:
+                import tomli as tomllib
+            except ImportError:
+                raise SettingsParseError(  # pylint: disable=raise-missing-from
+                    f"Reading {path} requires the 'tomli' package on "
+                    "Python < 3.11 (pip install tomli)"
+                )
+        with open(path, "rb") as inf:
+            return tomllib.load(inf)
+    with open(path, "r", encoding="utf-8") as inf:
+        # We don't cache whole files
+        return _Evaluator(CONSTANTS)(_parse(inf.read()))
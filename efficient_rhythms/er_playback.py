@@ -1,14 +1,20 @@
+import functools
 import os
 import subprocess
 import sys
 import threading
 
-with open("/dev/null", "w") as sys.stdout:
-    import pygame  # pylint: disable=wrong-import-position
+from . import er_midi
 
-sys.stdout = sys.__stdout__
 
-from . import er_midi  # pylint: disable=wrong-import-position
+@functools.lru_cache(maxsize=None)
+def _pygame():
+    # pygame is slow to import, so we only import it if we use it for playback
+    with open(os.devnull, "w") as sys.stdout:
+        import pygame  # pylint: disable=import-outside-toplevel
+
+    sys.stdout = sys.__stdout__
+    return pygame
 
 
 def init_and_return_midi_player(shell=False):
@@ -31,7 +37,7 @@ def init_and_return_midi_player(shell=False):
                 f"Using `{os.environ['EFFRHY_MIDI_PLAYER']}` for midi playback"
             )
             return "environment"
-        pygame.mixer.init()
+        _pygame().mixer.init()
         print("Using pygame for midi playback")
         return "pygame"
     print("Using python-rtmidi for midi playback")
@@ -46,8 +52,8 @@ def playback_midi(midi_player, breaker, midi_path):
         print(f"\nRunning `{command}`")
         subprocess.run(command, shell=True, check=True)
     if midi_player == "pygame":
-        pygame.mixer.music.load(midi_path)
-        pygame.mixer.music.play()
+        _pygame().mixer.music.load(midi_path)
+        _pygame().mixer.music.play()
     elif midi_player == "self":
         playback_thread = threading.Thread(
             target=er_midi.playback,
@@ -59,7 +65,7 @@ def playback_midi(midi_player, breaker, midi_path):
 
 def stop_playback_midi(midi_player, breaker):
     if midi_player == "pygame":
-        pygame.mixer.music.stop()
+        _pygame().mixer.music.stop()
     elif midi_player == "self":
         breaker.break_ = True
         breaker.reset()
@@ -0,0 +1,349 @@
+"""Opt-in profiling of builds.
+
+Functions are marked as phases of the build with the `phase()` decorator:
+
+    @er_profile.phase("voice leading")
+    def voice_lead_pattern(er, super_pattern, voice_lead_error):
+        ...
+
+The decorator returns the function unchanged, so there is no overhead unless
+profiling is enabled. When profiling is enabled (with `enable()` or
+`profiling()`), each marked function is replaced, in every module of the
+package that refers to it, by a wrapper that records its call count and
+timings. Once profiling is disabled everywhere it was enabled, `disable()`
+restores the original functions.
+
+The active Profiler is held in a context variable, so profiling is enabled
+for the current thread (or asyncio task) only: builds running concurrently in
+other threads aren't recorded, and each thread that enables profiling gets
+its own Profiler. (To profile a build that runs in another thread, run it
+with `contextvars.copy_context().run()`.)
+
+Besides the timings of the phases, we record how often each constraint
+rejects a step of the initial pattern search or of voice-leading, using the
+counts kept by AvailablePitchMaterialsError and VoiceLeadingError.
+
+The results can be exported as JSON (`Profiler.save_json()`) or as a Chrome
+trace-event file (`Profiler.save_chrome_trace()`), which can be opened in
+chrome://tracing or https://ui.perfetto.dev.
+"""
+import contextlib
+import contextvars
+import functools
+import importlib
+import json
+import os
+import sys
+import threading
+import time
+
+# The modules that define phases. They are imported when profiling is enabled
+# so that all phases are registered.
+PHASE_MODULES = (
+    "er_apply_vl",
+    "er_choirs",
+    "er_make",
+    "er_make2",
+    "er_midi",
+    "er_rhythm.make",
+)
+
+# The phases whose calls are the steps that the constraints counted by
+# AvailablePitchMaterialsError and VoiceLeadingError (respectively) can reject
+INITIAL_PATTERN_STEPS = "available pcs"
+VOICE_LEADING_STEPS = "voice-leading step"
+
+# Functions marked with phase(), mapped to (name, trace)
+_PHASES = {}
+
+_PROFILER = contextvars.ContextVar("profiler", default=None)
+
+
+def phase(name, trace=True):
+    """Marks a module-level function as a phase of the build.
+
+    Args:
+        name: the name under which the phase is recorded.
+
+    Keyword args:
+        trace: if True, each call is recorded as an event in the Chrome trace.
+            Should be False for functions that are called very many times per
+            build (e.g., constraints), which are only recorded in aggregate.
+    """
+
+    def decorator(func):
+        _PHASES[func] = (name, trace)
+        return func
+
+    return decorator
+
+
+class PhaseStats:
+    def __init__(self):
+        self.calls = 0
+        self.total_ns = 0
+
+    def to_dict(self):
+        return {
+            "calls": self.calls,
+            "total_s": self.total_ns / 1e9,
+            "mean_us": self.total_ns / self.calls / 1e3 if self.calls else 0,
+        }
+
+
+class Profiler:
+    """Records timings and call counts of phases, and rejection counts.
+
+    Phase timings are inclusive: e.g., the time spent in "initial pattern"
+    includes the time spent in the constraints that it calls.
+    """
+
+    def __init__(self):
+        self.phases = {}
+        self.events = []
+        self._errors = []
+        self._start_ns = time.perf_counter_ns()
+
+    def record(self, name, start_ns, end_ns, trace):
+        try:
+            stats = self.phases[name]
+        except KeyError:
+            stats = self.phases[name] = PhaseStats()
+        stats.calls += 1
+        stats.total_ns += end_ns - start_ns
+        if trace:
+            self.events.append((name, start_ns, end_ns, threading.get_ident()))
+
+    def watch(self, available_pitch_error, voice_lead_error):
+        """Counts the rejections recorded by the error objects of a build."""
+        self._errors.append((available_pitch_error, voice_lead_error))
+
+    def _steps(self, phase_name):
+        try:
+            return self.phases[phase_name].calls
+        except KeyError:
+            return 0
+
+    def rejections(self):
+        """Returns the number of rejections by each constraint, together with
+        the rate at which the constraint rejects steps.
+
+        The rates are relative to the number of steps of the initial pattern
+        search (i.e., calls to `_get_available_pcs()`) and of voice-leading
+        (i.e., calls to `apply_voice_leading()`), respectively.
+        """
+        out = {}
+        for stage, steps_phase, i in (
+            ("initial pattern", INITIAL_PATTERN_STEPS, 0),
+            ("voice leading", VOICE_LEADING_STEPS, 1),
+        ):
+            counts = {}
+            for errors in self._errors:
+                for constraint, count in errors[i].total_counts.items():
+                    counts[constraint] = counts.get(constraint, 0) + count
+            steps = self._steps(steps_phase)
+            out[stage] = {
+                "steps": steps,
+                "constraints": {
+                    constraint: {
+                        "rejections": count,
+                        "rate": count / steps if steps else 0,
+                    }
+                    for constraint, count in counts.items()
+                },
+            }
+        return out
+
+    def to_dict(self):
+        return {
+            "phases": {
+                name: stats.to_dict()
+                for name, stats in sorted(
+                    self.phases.items(), key=lambda item: -item[1].total_ns
+                )
+            },
+            "rejections": self.rejections(),
+        }
+
+    def chrome_trace(self):
+        """Returns the recorded events in Chrome's trace-event format."""
+        pid = os.getpid()
+        events = [
+            {
+                "name": name,
+                "ph": "X",
+                "ts": (start_ns - self._start_ns) / 1e3,
+                "dur": (end_ns - start_ns) / 1e3,
+                "pid": pid,
+                "tid": tid,
+            }
+            for name, start_ns, end_ns, tid in self.events
+        ]
+        # Phases that aren't traced (e.g., constraints) are included in
+        # aggregate as metadata
+        return {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "otherData": self.to_dict(),
+        }
+
+    def save_json(self, path):
+        with open(path, "w", encoding="utf-8") as outf:
+            json.dump(self.to_dict(), outf, indent=2)
+
+    def save_chrome_trace(self, path):
+        with open(path, "w", encoding="utf-8") as outf:
+            json.dump(self.chrome_trace(), outf)
+
+    def print_summary(self):
+        print(
+            f"{'phase':>30} {'calls':>10} {'total (s)':>10} {'mean (us)':>10}"
+        )
+        for name, stats in self.to_dict()["phases"].items():
+            print(
+                f"{name:>30} {stats['calls']:>10} {stats['total_s']:>10.3f} "
+                f"{stats['mean_us']:>10.1f}"
+            )
+        for stage, rejections in self.rejections().items():
+            print(f"\n{stage} rejections ({rejections['steps']} steps):")
+            for constraint, counts in rejections["constraints"].items():
+                print(
+                    f"{constraint:>30} {counts['rejections']:>10} "
+                    f"{counts['rate']:>10.1%}"
+                )
+
+
+def _wrap(func, name, trace):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        profiler = _PROFILER.get()
+        if profiler is None:
+            return func(*args, **kwargs)
+        start_ns = time.perf_counter_ns()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profiler.record(name, start_ns, time.perf_counter_ns(), trace)
+
+    return wrapper
+
+
+# (module, attr, original function) for each function replaced by a wrapper
+_patched = []
+# The number of contexts in which profiling is enabled. The wrappers are
+# installed while this is positive.
+_num_enabled = 0
+_patch_lock = threading.Lock()
+
+
+def _package_modules():
+    package = __name__.rsplit(".", 1)[0]
+    return [
+        module
+        for module_name, module in list(sys.modules.items())
+        if module is not None
+        and (module_name == package or module_name.startswith(package + "."))
+    ]
+
+
+def get_profiler():
+    """Returns the active Profiler, or None if profiling isn't enabled in the
+    current context."""
+    return _PROFILER.get()
+
+
+def enable():
+    """Enables profiling in the current context and returns the Profiler.
+
+    If profiling is already enabled in the current context, returns the
+    active Profiler.
+    """
+    global _num_enabled  # pylint: disable=global-statement
+    profiler = _PROFILER.get()
+    if profiler is not None:
+        return profiler
+    profiler = Profiler()
+    _PROFILER.set(profiler)
+    with _patch_lock:
+        _num_enabled += 1
+        if _num_enabled == 1:
+            _patch()
+    return profiler
+
+
+def _patch():
+    package = __name__.rsplit(".", 1)[0]
+    for module_name in PHASE_MODULES:
+        importlib.import_module(f"{package}.{module_name}")
+    wrappers = {
+        func: _wrap(func, name, trace)
+        for func, (name, trace) in _PHASES.items()
+    }
+    # Functions may have been imported into other modules by name (e.g.,
+    # `from .make import rhythms_handler`), so we replace them wherever they are
+    # found
+    for module in _package_modules():
+        for attr, val in list(vars(module).items()):
+            try:
+                wrapper = wrappers.get(val)
+            except TypeError:
+                # unhashable
+                continue
+            if wrapper is not None:
+                setattr(module, attr, wrapper)
+                _patched.append((module, attr, val))
+
+
+def disable():
+    """Disables profiling in the current context and returns the Profiler
+    that was active (or None).
+
+    Once profiling isn't enabled in any context, the original functions are
+    restored.
+    """
+    global _num_enabled  # pylint: disable=global-statement
+    profiler = _PROFILER.get()
+    if profiler is None:
+        return None
+    _PROFILER.set(None)
+    with _patch_lock:
+        _num_enabled -= 1
+        if not _num_enabled:
+            while _patched:
+                module, attr, func = _patched.pop()
+                setattr(module, attr, func)
+    return profiler
+
+
+@contextlib.contextmanager
+def profiling():
+    """Enables profiling for the duration of the context.
+
+    >>> from efficient_rhythms import er_make, er_settings
+    >>> er = er_settings.get_settings(
+    ...     {"num_voices": 2, "num_harmonies": 2, "seed": 0}, silent=True
+    ... )
+    >>> with profiling() as profiler:
+    ...     super_pattern = er_make.make_super_pattern(er)
+    >>> profiler.phases["make super pattern"].calls
+    1
+    >>> "no_available_pcs" in profiler.rejections()["initial pattern"][
+    ...     "constraints"
+    ... ]
+    True
+    >>> get_profiler() is None
+    True
+    """
+    profiler = enable()
+    try:
+        yield profiler
+    finally:
+        disable()
+
+
+def watch(available_pitch_error, voice_lead_error):
+    """Counts the rejections recorded by the error objects of a build, if
+    profiling is enabled."""
+    profiler = _PROFILER.get()
+    if profiler is not None:
+        profiler.watch(available_pitch_error, voice_lead_error)
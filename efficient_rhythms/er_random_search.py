@@ -0,0 +1,215 @@
+"""Searches for realizable random settings in parallel.
+
+With `--random`, random settings that fail to build are simply re-drawn, one at
+a time. Here we instead build many random candidates concurrently in a process
+pool, stop as soon as `num_results` of them succeed, and feed the outcome of
+every candidate into a RandomizationStats object, so that candidates submitted
+later are less likely to be drawn with values that have repeatedly failed (or
+timed out).
+"""
+import contextlib
+import multiprocessing
+import os
+import queue
+import random
+
+from . import er_exceptions, er_make_handler, er_settings
+from .er_randomize import RandomizationStats
+
+# Time (in seconds) after which a candidate is abandoned, unless `timeout` is
+# given in the settings
+DEFAULT_CANDIDATE_TIMEOUT = 30
+
+# If `max_candidates` isn't given, we give up after this many candidates per
+# result requested
+MAX_CANDIDATES_PER_RESULT = 20
+
+
+class RandomSearchError(er_exceptions.ErMakeError):
+    def __init__(self, num_candidates, stats):
+        super().__init__()
+        self.num_candidates = num_candidates
+        self.stats = stats
+
+    def __str__(self):
+        lines = [
+            f"None of {self.num_candidates} random candidates could be built.",
+            "Failures: "
+            + ", ".join(
+                f"{reason}: {count}"
+                for reason, count in self.stats.failure_reasons.items()
+                if reason is not None
+            ),
+        ]
+        worst = self.stats.worst()
+        if worst:
+            lines.append("Values that failed most often:")
+            lines.extend(
+                f'    "{attr}": {key} ({failures} failures, '
+                f"{successes} successes)"
+                for attr, key, successes, failures in worst
+            )
+        return "\n".join(lines)
+
+
+class Candidate:
+    """The outcome of building one set of random settings.
+
+    If the build succeeded, `settings` and `pattern` hold the results, and
+    `failure_reason` is None. Otherwise, `failure_reason` is the name of the
+    exception that caused the build to fail.
+    """
+
+    def __init__(
+        self, seed, values, failure_reason=None, settings=None, pattern=None
+    ):
+        self.seed = seed
+        self.values = values
+        self.failure_reason = failure_reason
+        self.settings = settings
+        self.pattern = pattern
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}(seed={self.seed}, "
+            f"failure_reason={self.failure_reason})"
+        )
+
+    @property
+    def success(self):
+        return self.failure_reason is None
+
+
+def build_candidate(
+    user_settings,
+    seed,
+    stats=None,
+    timeout=DEFAULT_CANDIDATE_TIMEOUT,
+    output_path=None,
+):
+    """Randomizes the settings with `seed` and tries to build a pattern.
+
+    The candidate is built silently, and any other output is discarded, since
+    the candidates are built concurrently. Returns a Candidate.
+    """
+    with open(os.devnull, "w", encoding="utf-8") as devnull:
+        with contextlib.redirect_stdout(devnull):
+            er = er_settings.get_settings(
+                user_settings,
+                random_settings=True,
+                seed=seed,
+                silent=True,
+                output_path=output_path,
+                randomization_stats=stats,
+            )
+            if er.timeout is None:
+                er.timeout = timeout
+            # There is no one to ask
+            er.ask_for_more_attempts = False
+            try:
+                pattern = er_make_handler.make_super_pattern(er)
+            except (
+                er_exceptions.ErMakeError,
+                er_exceptions.ErTimeoutError,
+            ) as exc:
+                return Candidate(seed, er.randomized_values, type(exc).__name__)
+            except Exception as exc:  # pylint: disable=broad-except
+                # Some random settings trigger bugs in er_make. Rather than
+                # abandoning the whole search, we count these as failures too
+                # (the seed is printed so the bug can be reproduced).
+                return Candidate(seed, er.randomized_values, type(exc).__name__)
+    # Candidates are returned from worker processes, so we remove the
+    # attributes that needn't be pickled
+    er._randomization_stats = None  # pylint: disable=protected-access
+    return Candidate(seed, er.randomized_values, settings=er, pattern=pattern)
+
+
+def random_search(
+    user_settings,
+    num_results=1,
+    jobs=None,
+    stats=None,
+    max_candidates=None,
+    timeout=DEFAULT_CANDIDATE_TIMEOUT,
+    seed=None,
+    output_path=None,
+    print_out=True,
+):
+    """Builds random candidates in parallel until `num_results` succeed.
+
+    Keyword args:
+        jobs: the number of worker processes. Defaults to the number of CPUs.
+        stats: a RandomizationStats object, which is updated with the outcome
+            of each candidate. Each candidate is randomized with the
+            statistics as they stand when it is submitted.
+        max_candidates: the number of candidates after which we give up.
+            Defaults to `MAX_CANDIDATES_PER_RESULT * num_results`.
+        timeout: the time (in seconds) after which a candidate is abandoned,
+            unless `timeout` is given in the settings.
+        seed: seeds the choice of the seeds of the candidates.
+
+    Returns a list of (at most `num_results`) successful Candidates, in the
+    order in which they succeeded. Candidates that are still running when the
+    search finishes are terminated.
+
+    Raises:
+        RandomSearchError if all `max_candidates` candidates fail.
+    """
+    if jobs is None:
+        jobs = os.cpu_count()
+    if stats is None:
+        stats = RandomizationStats()
+    if max_candidates is None:
+        max_candidates = MAX_CANDIDATES_PER_RESULT * num_results
+    seed_rng = random.Random(seed)
+    # The pool calls its callbacks from a separate thread, so we collect the
+    # outcomes in a thread-safe queue
+    outcomes = queue.Queue()
+    successes = []
+    num_submitted = num_finished = 0
+    with multiprocessing.Pool(jobs) as pool:
+
+        def _submit():
+            nonlocal num_submitted
+            pool.apply_async(
+                build_candidate,
+                (
+                    user_settings,
+                    seed_rng.randrange(2**32),
+                    stats,
+                    timeout,
+                    output_path,
+                ),
+                callback=outcomes.put,
+                error_callback=outcomes.put,
+            )
+            num_submitted += 1
+
+        for _ in range(min(jobs, max_candidates)):
+            _submit()
+        while num_finished < num_submitted:
+            candidate = outcomes.get()
+            num_finished += 1
+            if isinstance(candidate, BaseException):
+                # An unexpected error (i.e., a bug) in a worker
+                raise candidate
+            stats.record(candidate.values, candidate.failure_reason)
+            if print_out:
+                print(
+                    f"Candidate {num_finished} (seed {candidate.seed}): "
+                    + (
+                        "succeeded"
+                        if candidate.success
+                        else f"failed ({candidate.failure_reason})"
+                    )
+                )
+            if candidate.success:
+                successes.append(candidate)
+                if len(successes) >= num_results:
+                    break
+            if num_submitted < max_candidates:
+                _submit()
+        # Leaving the `with` block terminates any candidates still running
+    if not successes:
+        raise RandomSearchError(num_finished, stats)
+    return successes
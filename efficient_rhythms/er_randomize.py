@@ -1,4 +1,7 @@
+import itertools
+import json
 import numbers
+import os
 import random
 import typing
 
@@ -7,7 +10,15 @@ from fractions import Fraction
 import numpy as np
 
 from . import er_constants
-from .er_interface import cli
+from .er_interface.terminal import line_width
+
+# When randomizing with RandomizationStats, the maximum number of times a value
+# that has often led to failures is redrawn
+MAX_REDRAWS = 5
+
+# The minimum number of builds with a pair of values before
+# RandomizationStats.weight() takes the pair into account
+MIN_PAIR_BUILDS = 3
 
 # LONGTERM Warnings to address:
 # Notice: 'parallel_voice_leading' is not compatible with checking voice-leadings
@@ -331,59 +342,269 @@ class ERRandomize:
         )
         self.tempo = Randomizer(96, 160)
 
-    @staticmethod
-    def _print_setting(attr, val):
-        # Originally I wrote this function because I wanted to format floats
-        # nicely for printing. But then I got rid of the float formatting
-        # because it caused issues when copying the settings for re-use with
-        # the script. It still makes numpy arrays print like tuples which is
-        # nice though.
-        def _format_item(item):
-            if isinstance(item, bool):
-                if item:
-                    return "True"
-                return "False"
-            if isinstance(item, Fraction):
-                return f"{float(item)}"
-            # Next condition is to ensure that np floats don't print like ints,
-            # because when copying the settings for reuse floats and ints have
-            # different meaning as pitches
-            if isinstance(item, (np.float32, np.float64)) and item % 1 == 0:
-                return f"{item}"
-            if isinstance(item, numbers.Number):
-                return f"{item:g}"
-            if isinstance(item, str):
-                return f'"{item}"'
-            if isinstance(item, (typing.Sequence, np.ndarray)):
-                return _tuplify(item)
-            return f"{item}"
+    def apply(self, er, stats=None, print_out=True):
+        """Randomizes the settings of `er` in place.
 
-        def _tuplify(item):
-            if isinstance(
-                item, (typing.Sequence, np.ndarray)
-            ) and not isinstance(item, str):
-                return (
-                    "("
-                    + ", ".join(_format_item(sub_item) for sub_item in item)
-                    + ")"
-                )
-            return _format_item(item)
-
-        print(f'"{attr}": {_format_item(val)},')
-
-    def apply(self, er):
-        width = cli.line_width()
-        print("#" * width)
-        print("Randomized settings:")
+        If `stats` (a RandomizationStats object) is passed, values that have
+        often led to failed builds, alone or together with the values already
+        drawn, are down-weighted: each value drawn is accepted with
+        probability `stats.weight(attr, val, values)`, and otherwise drawn
+        again (up to MAX_REDRAWS times).
+
+        Returns a dict mapping each randomized attribute to its value.
+        """
+        if print_out:
+            width = line_width()
+            print("#" * width)
+            print("Randomized settings:")
         exclude = (
             ()
             if er.exclude_from_randomization is None
             else er.exclude_from_randomization
         )
+        values = {}
         for attr, randomizer in vars(self).items():
             if attr in exclude:
                 continue
             val = randomizer(er)
+            if stats is not None:
+                for _ in range(MAX_REDRAWS):
+                    if random.random() < stats.weight(attr, val, values):
+                        break
+                    val = randomizer(er)
             setattr(er, attr, val)
-            self._print_setting(attr, val)
-        print("#" * width)
+            values[attr] = val
+            if print_out:
+                print_setting(attr, val)
+        if print_out:
+            print("#" * width)
+        return values
+
+
+class RandomizationStats:
+    """Per-attribute statistics on which randomized values lead to failures.
+
+    For each randomized attribute, we count how many builds with each value
+    succeeded and how many failed (e.g., because they were unable to find a
+    pattern or because they timed out). We count the same for each pair of
+    values of different attributes, since some values only fail in
+    combination (e.g., `cont_rhythms` with certain values of
+    `onset_subdivision`). ERRandomize.apply() uses these counts to
+    down-weight values that repeatedly fail.
+
+    Values are keyed by their printed representation, so the statistics can be
+    saved to and loaded from JSON.
+
+    >>> stats = RandomizationStats()
+    >>> stats.record({"num_voices": 5, "tempo": 120}, "ErTimeoutError")
+    >>> stats.record({"num_voices": 5, "tempo": 96}, "ErTimeoutError")
+    >>> stats.record({"num_voices": 2, "tempo": 120})
+    >>> stats.weight("num_voices", 5), stats.weight("num_voices", 2)
+    (0.3333333333333333, 1.0)
+    >>> stats.pair_counts['num_voices=5']['tempo=120']
+    [0, 1]
+    >>> stats
+    RandomizationStats(successes=1, failures=2)
+    """
+
+    def __init__(self):
+        # counts[attr][value_key] is [successes, failures]
+        self.counts = {}
+        # pair_counts[item1][item2], where item1 < item2 are strings of the
+        #   form "attr=value_key", is [successes, failures]
+        self.pair_counts = {}
+        self.failure_reasons = {}
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}(successes={self.successes}, "
+            f"failures={self.failures})"
+        )
+
+    @property
+    def successes(self):
+        return self.failure_reasons.get(None, 0)
+
+    @property
+    def failures(self):
+        return sum(
+            count
+            for reason, count in self.failure_reasons.items()
+            if reason is not None
+        )
+
+    def record(self, values, failure_reason=None):
+        """Records the outcome of a build with the randomized `values`.
+
+        `failure_reason` should be None if the build succeeded, and otherwise a
+        string (e.g., the name of the exception raised).
+        """
+        self.failure_reasons[failure_reason] = (
+            self.failure_reasons.get(failure_reason, 0) + 1
+        )
+        i = 0 if failure_reason is None else 1
+        items = []
+        for attr, val in values.items():
+            key = format_setting(val)
+            self.counts.setdefault(attr, {}).setdefault(key, [0, 0])[i] += 1
+            items.append(f"{attr}={key}")
+        for item1, item2 in itertools.combinations(sorted(items), 2):
+            item_counts = self.pair_counts.setdefault(item1, {})
+            item_counts.setdefault(item2, [0, 0])[i] += 1
+
+    @staticmethod
+    def _ratio(counts):
+        # computed like RhythmSet.weight
+        if counts is None:
+            return 1.0
+        successes, failures = counts
+        return (1 + successes) / (1 + failures)
+
+    def _get_pair_counts(self, item1, item2):
+        if item2 < item1:
+            item1, item2 = item2, item1
+        return self.pair_counts.get(item1, {}).get(item2)
+
+    def weight(self, attr, val, drawn=None):
+        """The probability of accepting `val` as the value of `attr`.
+
+        The weight is computed like RhythmSet.weight, but capped at 1.
+
+        If `drawn` (a dict mapping other attributes to the values already
+        drawn for them) is passed, the weight is also reduced by the pairs of
+        `val` with each of these values that have failed more often than the
+        two values have failed separately. Pairs are only taken into account
+        after MIN_PAIR_BUILDS builds.
+
+        >>> stats = RandomizationStats()
+        >>> for _ in range(4):
+        ...     stats.record({"a": 1, "b": 1}, "ErTimeoutError")
+        ...     stats.record({"a": 1, "b": 2})
+        ...     stats.record({"a": 2, "b": 1})
+        >>> stats.weight("b", 1), stats.weight("b", 1, {"a": 2})
+        (1.0, 1.0)
+        >>> stats.weight("b", 1, {"a": 1})
+        0.2
+        """
+        key = format_setting(val)
+        ratio = self._ratio(self.counts.get(attr, {}).get(key))
+        out = ratio
+        for other_attr, other_val in (drawn or {}).items():
+            other_key = format_setting(other_val)
+            pair_counts = self._get_pair_counts(
+                f"{attr}={key}", f"{other_attr}={other_key}"
+            )
+            if pair_counts is None or sum(pair_counts) < MIN_PAIR_BUILDS:
+                continue
+            other_ratio = self._ratio(self.counts[other_attr][other_key])
+            # how much worse the pair does than the worse of its two values
+            interaction = self._ratio(pair_counts) / min(ratio, other_ratio)
+            out = min(out, ratio * interaction)
+        return min(out, 1.0)
+
+    def worst(self, n=10, min_failures=2):
+        """Returns the `n` attribute values with the lowest weights.
+
+        Returns a list of (attr, value_key, successes, failures) tuples.
+        """
+        items = [
+            (attr, key, successes, failures)
+            for attr, attr_counts in self.counts.items()
+            for key, (successes, failures) in attr_counts.items()
+            if failures >= min_failures
+        ]
+        items.sort(key=lambda item: (1 + item[2]) / (1 + item[3]))
+        return items[:n]
+
+    def to_dict(self):
+        return {
+            "counts": self.counts,
+            "pair_counts": self.pair_counts,
+            # JSON keys must be strings
+            "failure_reasons": {
+                ("success" if reason is None else reason): count
+                for reason, count in self.failure_reasons.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, dict_):
+        out = cls()
+        out.counts = {
+            attr: {key: list(counts) for key, counts in attr_counts.items()}
+            for attr, attr_counts in dict_["counts"].items()
+        }
+        out.pair_counts = {
+            item1: {
+                item2: list(counts) for item2, counts in item_counts.items()
+            }
+            for item1, item_counts in dict_.get("pair_counts", {}).items()
+        }
+        out.failure_reasons = {
+            (None if reason == "success" else reason): count
+            for reason, count in dict_["failure_reasons"].items()
+        }
+        return out
+
+    def save(self, path):
+        with open(path, "w", encoding="utf-8") as outf:
+            json.dump(self.to_dict(), outf, indent=1)
+
+    @classmethod
+    def load(cls, path):
+        """Loads statistics from `path`, or returns empty statistics if `path`
+        doesn't exist."""
+        if not os.path.exists(path):
+            return cls()
+        with open(path, "r", encoding="utf-8") as inf:
+            return cls.from_dict(json.load(inf))
+
+
+def format_setting(val):
+    """Formats a randomized setting so it can be copied into a settings file.
+
+    >>> format_setting([Fraction(1, 2), 3, "usual", True])
+    '(0.5, 3, "usual", True)'
+    """
+
+    # Originally I wrote this function because I wanted to format floats
+    # nicely for printing. But then I got rid of the float formatting
+    # because it caused issues when copying the settings for re-use with
+    # the script. It still makes numpy arrays print like tuples which is
+    # nice though.
+    def _format_item(item):
+        if isinstance(item, bool):
+            if item:
+                return "True"
+            return "False"
+        if isinstance(item, Fraction):
+            return f"{float(item)}"
+        # Next condition is to ensure that np floats don't print like ints,
+        # because when copying the settings for reuse floats and ints have
+        # different meaning as pitches
+        if isinstance(item, (np.float32, np.float64)) and item % 1 == 0:
+            return f"{item}"
+        if isinstance(item, numbers.Number):
+            return f"{item:g}"
+        if isinstance(item, str):
+            return f'"{item}"'
+        if isinstance(item, (typing.Sequence, np.ndarray)):
+            return _tuplify(item)
+        return f"{item}"
+
+    def _tuplify(item):
+        if isinstance(item, (typing.Sequence, np.ndarray)) and not isinstance(
+            item, str
+        ):
+            return (
+                "("
+                + ", ".join(_format_item(sub_item) for sub_item in item)
+                + ")"
+            )
+        return _format_item(item)
+
+    return _format_item(val)
+
+
+def print_setting(attr, val):
+    print(f'"{attr}": {format_setting(val)},')
@@ -1,3 +1,4 @@
 from .make import get_onset_order, rhythms_handler, init_rhythms
 from .cont_rhythm import ContRhythm
 from .grid import Grid
+from .pool import RhythmPool
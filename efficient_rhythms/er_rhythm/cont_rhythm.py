@@ -3,7 +3,7 @@ import warnings
 
 import numpy as np
 
-from .. import er_globals
+from .. import er_rng
 from . import utils
 from .rhythm import RhythmBase
 
@@ -23,7 +23,7 @@ class ContRhythmBase(RhythmBase):
     def __repr__(self):
         return (
             f"{self.__class__.__name__}(rhythm_len={self.rhythm_len}, "
-            f"contents: {self._data})"
+            f"contents: {dict(self)})"
         )
 
     def __init__(
@@ -67,8 +67,10 @@ class ContRhythmBase(RhythmBase):
             (self.num_vars, self.num_notes), dtype=self.dtype
         )
         self._durs_2d = np.empty_like(self._onsets_2d)
-        self._deltas = self._unspaced = None
+        self._unspaced = None
         self._iois = np.empty_like(self._onsets_2d)
+        # the generator that the rhythm is generated with (see generate())
+        self.rng = None
 
         # cached math results
         self._min_int_dur = np.int64(
@@ -79,19 +81,15 @@ class ContRhythmBase(RhythmBase):
         )
         self._int_increment = INT_MAX / self.rhythm_len * self.increment
 
+    @property
+    def _rng(self):
+        return er_rng.get_rng(self.rng)
+
     def _get_iois(self, i=0):
         self._iois[i] = utils.get_iois(
             self._onsets_2d[i], self.rhythm_len, self.overlap, dtype=self.dtype
         )
 
-    def _update_onset_deltas(self):
-        # maybe try the effect of a normal distribution as well?
-        deltas = (
-            er_globals.RNG.random(size=self.num_notes, dtype=self.dtype) - 1
-        )
-        deltas = deltas / deltas.sum() * self._int_increment
-        self._deltas = deltas.astype(dtype=np.int64)
-
     def _space_ints(self, unspaced):
         return unspaced + np.arange(self.num_notes, dtype=np.int64) * (
             self._min_int_dur - 1
@@ -105,36 +103,90 @@ class ContRhythmBase(RhythmBase):
             dtype=self.dtype,
         )
 
-    def _vary_onsets_unif(self, i):
-        if not self.vary_consistently or i == 1:
-            self._update_onset_deltas()
-        # We assume that we will always vary the rhythm iteratively (so A
-        # becomes B and B becomes C, and so on, and we never go back to A),
-        # so we don't have to keep previous values of unspaced around
-        self._unspaced = self._unspaced + self._deltas
-        # stable sort = timsort
-        self._unspaced.sort(kind="stable")
-        # how do we prevent more than the first item from becoming
-        # negative? (Later: I no longer understand what this comment is
-        # referring to)
-        if self.always_start_at_zero:
-            # I guess doing this biases the output a little. LONGTERM think about
-            # a better way of always starting from zero.
-            self._unspaced[0] = 0
+    def _get_onset_deltas(self, n_rows):
+        # Returns deltas for n_rows variations in a single RNG call. Each row
+        # sums to self._int_increment.
+        if self.vary_consistently:
+            size = (1, self.num_notes)
         else:
+            size = (n_rows, self.num_notes)
+        deltas = self._rng.random(size=size, dtype=self.dtype) - 1
+        deltas = (
+            deltas / deltas.sum(axis=1, keepdims=True) * self._int_increment
+        )
+        return np.broadcast_to(deltas, (n_rows, self.num_notes))
+
+    def _first_irregular_row(self, unspaced, cum_deltas, start):
+        """Returns the index of the first row at or after `start` of
+        `unspaced + cum_deltas` that is out of order (because an onset has
+        overtaken the next one) or whose last onset exceeds
+        self._rand_int_u_bound, or len(cum_deltas) if there is no such row.
+
+        Such rows usually come early, so we look in windows of doubling size
+        rather than computing every remaining row.
+        """
+        n_rows = len(cum_deltas)
+        width = 1
+        while start < n_rows:
+            stop = min(start + width, n_rows)
+            rows = unspaced + cum_deltas[start:stop]
+            irregular = np.flatnonzero(
+                (rows[:, -1] > self._rand_int_u_bound)
+                | np.any(rows[:, 1:] < rows[:, :-1], axis=1)
+            )
+            if len(irregular):
+                return start + irregular[0]
+            start = stop
+            width *= 2
+        return n_rows
+
+    def _vary_onsets_batched(self, n_rows):
+        """Fills rows 1 through n_rows of self._onsets_2d.
+
+        Each row adds a delta to every onset of the previous row, but the
+        deltas are drawn all at once and accumulated with cumsum. We only need
+        to process a row on its own when its onsets have to be sorted (so that
+        each delta is applied to the onset in the same position on the next
+        row) or rescaled; accumulation then resumes from the processed row.
+        (See tests/rhythm/cont_rhythm_reference.py for the row-by-row
+        version.)
+        """
+        if not self.always_start_at_zero:
             raise NotImplementedError(
                 "always_start_at_zero = False is not yet implemented"
             )
-        # The following lines are a bit of a hack. We don't constrain the final
-        # onset from growing larger, so it can get too close to the first onset
-        # (on looping around). To avoid this, when necessary, we divide all
-        # the onsets as follows.
-        if self._unspaced[-1] > self._rand_int_u_bound:
-            self._unspaced = (
-                self._unspaced * (self._rand_int_u_bound / self._unspaced[-1])
-            ).astype(np.int64)
-        spaced = self._space_ints(self._unspaced)
-        self._onsets_2d[i] = self._ints_to_onsets(spaced)
+        # We accumulate in floating point because the cumulative deltas can
+        # easily overflow INT_MAX
+        deltas = self._get_onset_deltas(n_rows)
+        cum_deltas = np.cumsum(deltas, axis=0)
+        # The first onset is reset to zero on every variation, so its delta
+        # never accumulates; but it can still overtake the second onset
+        # before it is reset, so we keep it for _first_irregular_row()
+        cum_deltas[:, 0] = deltas[:, 0]
+        unspaced = self._unspaced.astype(np.float64)
+        out = np.empty((n_rows, self.num_notes))
+        start = 0
+        while start < n_rows:
+            stop = self._first_irregular_row(unspaced, cum_deltas, start)
+            out[start:stop] = unspaced + cum_deltas[start:stop]
+            if stop == n_rows:
+                break
+            # stable sort = timsort
+            row = np.sort(unspaced + cum_deltas[stop], kind="stable")
+            row[0] = 0
+            if row[-1] > self._rand_int_u_bound:
+                row *= self._rand_int_u_bound / row[-1]
+            out[stop] = row
+            # Subtracting cum_deltas[stop] means that adding cum_deltas to
+            # `unspaced` continues from the processed row
+            unspaced = row - cum_deltas[stop]
+            unspaced[0] = 0
+            start = stop + 1
+        out[:, 0] = 0
+        self._unspaced = out[-1].astype(np.int64)
+        self._onsets_2d[1 : n_rows + 1] = self._ints_to_onsets(
+            self._space_ints(out)
+        )
 
     def _init_onsets(self):
         if self.full:
@@ -153,7 +205,7 @@ class ContRhythmBase(RhythmBase):
 
         # We use signed ints because it's at least possible that we may want the
         # option of moving the first onsets before 0 on repeats of the rhythm
-        self._unspaced = er_globals.RNG.integers(
+        self._unspaced = self._rng.integers(
             low=1,
             high=self._rand_int_u_bound,
             size=self.num_notes,
@@ -177,19 +229,35 @@ class ContRhythmBase(RhythmBase):
         return
 
     @abc.abstractmethod
-    def _fill_contents(self, i):
+    def _fill_contents_batched(self, n_rows):
         return
 
-    def generate(self):
-        # _init_contents() and _fill_contents() are to be provided by child
-        # classes
+    def _num_rows_to_fill(self):
+        # Any rows after these are filled by _fill_palindrome()
+        if self.var_palindrome:
+            return min(self.num_vars // 2, self.num_vars - 1)
+        return self.num_vars - 1
+
+    def generate(self, rng=None):
+        """Generates the rhythm.
+
+        Keyword args:
+            rng: the NumPy Generator to generate the rhythm with. If None, the
+                global generator is used.
+        """
+        self.rng = rng
+        # _init_contents() and _fill_contents_batched() are to be provided by
+        # child classes
         self._init_contents()
-        for i in range(1, self.num_vars):
-            if self.var_palindrome and i > self.num_vars / 2:
-                j = self._get_palindromic_index(i)
-                self._fill_palindrome(j, i)
-            else:
-                self._fill_contents(i)
+        n_rows = self._num_rows_to_fill()
+        if n_rows:
+            self._fill_contents_batched(n_rows)
+        for i in range(n_rows + 1, self.num_vars):
+            j = self._get_palindromic_index(i)
+            self._fill_palindrome(j, i)
+        self._set_contents_from_2d()
+
+    def _set_contents_from_2d(self):
         # Every row of _onsets_2d is generated to start at 0. Here, we
         # add offsets so that every row starts at row_i * rhythm_len.
         # Ultimately it would be more parsimonious to do this when generating
@@ -261,69 +329,68 @@ class ContRhythm(ContRhythmBase):
         self._get_iois()
         self._init_durs()
 
-    def _fill_contents(self, i):
-        self._vary_onsets_unif(i)
-        self._get_iois(i)
-        self._fill_durs(i)
+    def _fill_contents_batched(self, n_rows):
+        self._vary_onsets_batched(n_rows)
+        self._get_iois(slice(1, n_rows + 1))
+        self._fill_durs_batched(n_rows)
 
     def _fill_palindrome(self, src_i, dst_i):
         self._onsets_2d[dst_i] = self._onsets_2d[src_i]
         self._durs_2d[dst_i] = self._durs_2d[src_i]
         self._iois[dst_i] = self._iois[src_i]
 
-    def _fill_durs(self, i):
-        prev_durs = self._durs_2d[i - 1]
-        self._durs_2d[i] = prev_durs.copy()
-        current_durs = self._durs_2d[i]
-        onsets = self._onsets_2d[i]
+    def _fill_durs_batched(self, n_rows):
+        """Fills rows 1 through n_rows of self._durs_2d.
+
+        The recurrence is expressed in terms of "rois" (release-to-onset
+        intervals): when an ioi shrinks, the duration shrinks with it, so the
+        roi is unchanged; when an ioi grows, the roi grows with it. The
+        missing duration is then taken back out of the rois at random so that
+        the overall duration density stays constant. (See
+        tests/rhythm/cont_rhythm_reference.py for the version that adjusts
+        the durations directly.)
+
+        Each row depends on the random result of the previous one, so the
+        rows are computed in turn, but the random values for all the rows are
+        drawn at once.
+        """
         if self._free_dur_density <= 0:
-            # In this case there is nothing to do, because the onsets cannot be
-            # moved closer than min_dur in any case.
+            self._durs_2d[1 : n_rows + 1] = self._durs_2d[0]
             return
-
+        iois = self._iois[: n_rows + 1]
         if self.dur_density == 1:
-            self._durs_2d[i] = self._iois[i]
+            self._durs_2d[1 : n_rows + 1] = iois[1:]
             return
-        assert (
-            self._iois[i].sum()
-            + (0 if self.overlap else onsets[0])
-            - self.rhythm_len
-            < 1e-10
-        )
-        ioi_deltas = self._iois[i] - self._iois[i - 1]
-        neg_deltas = np.where(ioi_deltas < 0, ioi_deltas, 0)
-        # Can this be made more efficient?
-        current_durs += neg_deltas
-        too_short = current_durs < self.min_dur
-        add_back = self.min_dur - current_durs[too_short]
-        neg_deltas[too_short] += add_back
-        current_durs[too_short] = self.min_dur
-
-        # The first onset is presently fixed at zero, so this works.
-        #   Otherwise, we would need to get the first onset of the next
-        #   repetition already.
-
-        wraparound = current_durs[-1] + onsets[-1] - self.rhythm_len
-        if wraparound > 0:
-            current_durs[-1] -= wraparound
-            neg_deltas[-1] -= wraparound
-        assert (
-            abs(current_durs.sum() - neg_deltas.sum()) - prev_durs.sum()
-            <= 1e-10
-        )
-        releases = onsets + current_durs
-        rois = utils.get_rois(onsets, releases, self.rhythm_len, self.overlap)
-        assert (
-            current_durs.sum()
-            + rois.sum()
-            + (0 if self.overlap else onsets[0])
-            - self.rhythm_len
-            < 1e-10
-        )
-        assert np.all(np.abs(current_durs + rois - self._iois[i]) < 1e-10)
-        missing_density = (-neg_deltas.sum()) / rois.sum()
-        current_durs += self._fill_durs_from_iois(rois, missing_density)
-        assert np.all(current_durs - self._iois[i] < 1e-10)
+        growth = np.maximum(np.diff(iois, axis=0), 0)
+        max_rois = iois[1:] - self.min_dur
+        normals = self._rng.standard_normal((n_rows, self.num_notes))
+        rois = iois[0] - self._durs_2d[0]
+        out = np.empty((n_rows, self.num_notes))
+        for row_i in range(n_rows):
+            grown = np.minimum(rois + growth[row_i], max_rois[row_i])
+            missing = grown.sum() - rois.sum()
+            if missing > 0:
+                shares = self._random_shares(grown, normals[row_i])
+                grown -= np.minimum(missing * shares, grown)
+            out[row_i] = rois = grown
+        self._durs_2d[1 : n_rows + 1] = iois[1:] - out
+
+    @staticmethod
+    def _random_shares(rois, normals):
+        """Returns random shares of a whole, one for each roi.
+
+        _fill_durs_from_iois() divides the rois into tranches and fills each
+        tranche by a random amount, so the amount taken from each roi is
+        approximately gamma-distributed with a shape of the number of
+        tranches it contains. Normalized, these amounts follow a Dirichlet
+        distribution, which we sample here from `normals` with the
+        Wilson-Hilferty approximation to the gamma distribution.
+        """
+        shapes = np.rint(rois / rois.max() * (INT_MAX / DUR_TRANCHE_SIZE))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            roots = 1 - 1 / (9 * shapes) + normals / (3 * np.sqrt(shapes))
+            gammas = np.where(shapes > 0, shapes * np.maximum(roots, 0) ** 3, 0)
+        return gammas / gammas.sum()
 
     def _init_durs(self):
         if self.dur_density == 1:
@@ -357,7 +424,7 @@ class ContRhythm(ContRhythmBase):
         #  equal size
         tranche_counts = np.rint(int_iois / DUR_TRANCHE_SIZE)
         n_tranches = int(tranche_counts.sum())
-        x = er_globals.RNG.random(n_tranches)
+        x = self._rng.random(n_tranches)
         # the next line is an attempt to enforce a maximum distance ( we
         #   can't take more than 1 * each tranche) on
         #   the output. It works (I think), but I'm not certain that it's
@@ -388,7 +455,7 @@ class ContRhythm(ContRhythmBase):
         y[1:] = np.diff(x)
         # the mean of y asymptotically approaches 0.5 rather than ever actually
         # getting there; maybe there is a better solution
-        er_globals.RNG.shuffle(y)
+        self._rng.shuffle(y)
 
         # Previously, I was taking the size of tranche_starts
         # from self.rhythm_len as follows:
@@ -413,10 +480,10 @@ class ContRhythm(ContRhythmBase):
             while tranche_starts[j - 1] >= len(y):
                 j -= 1
             int_durs = np.empty(len(int_iois))
-            int_durs[:-j] = (
-                np.add.reduceat(y, tranche_starts[:-j]) * DUR_TRANCHE_SIZE
+            int_durs[:j] = (
+                np.add.reduceat(y, tranche_starts[:j]) * DUR_TRANCHE_SIZE
             )
-            int_durs[-j:] = 0
+            int_durs[j:] = 0
         else:
             int_durs = np.add.reduceat(y, tranche_starts) * DUR_TRANCHE_SIZE
         float_durs = int_durs / (INT_MAX / available_iois.max())
@@ -477,6 +544,9 @@ class ContRhythm(ContRhythmBase):
             )
         er.rhythm_len = er.pattern_len
 
+        # `er` may be a BuildContext, in which case we mustn't modify the
+        #   list in the settings
+        er.min_dur = list(er.min_dur)
         for i in range(er.num_voices):
             density = er.onset_density[i]
             min_dur = er.min_dur[i]
@@ -1,8 +1,8 @@
-import random
 import warnings
 
 import numpy as np
 
+from .. import er_rng
 from . import utils
 from .cont_rhythm import ContRhythm
 
@@ -103,7 +103,7 @@ class Grid(ContRhythm):
             max_releases[-1] = self.rhythm_len
         return max_releases
 
-    def _durs_handler(self, er, voice_i, onsets, onset_indices, durs):
+    def _durs_handler(self, er, voice_i, onsets, onset_indices, durs, rng):
         releases = utils.LoopSeq(self.releases, self.total_dur, decimals=8)
         max_releases = self._get_max_releases(onset_indices)
         total_remaining = (
@@ -118,7 +118,7 @@ class Grid(ContRhythm):
             if releases[k] == max_releases[i]:
                 available_indices.remove(i)
         while total_remaining > 0 and available_indices:
-            i = random.choice(available_indices)
+            i = er_rng.choice(rng, available_indices)
             k = release_indices[i] = release_indices[i] + 1
             release = releases[k]
             increment = release - releases[k - 1]
@@ -135,13 +135,16 @@ class Grid(ContRhythm):
         voice_i,
         onsets,
         prev_rhythms,  # pylint: disable=unused-argument
+        rng=None,
     ):
         # TODO handle prev_rhythms
         onset_indices = self.onset_indices(onsets)
         # durs are initialized as the interval to the next release
         durs = self._releases[onset_indices] - onsets
         # then we possibly fill durs further
-        durs = self._durs_handler(er, voice_i, onsets, onset_indices, durs)
+        durs = self._durs_handler(
+            er, voice_i, onsets, onset_indices, durs, er_rng.get_rng(rng)
+        )
 
         return durs
 
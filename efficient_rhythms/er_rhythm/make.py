@@ -1,14 +1,15 @@
 """Rhythm functions for efficient_rhythms2.py.
 """
+import collections.abc
 import fractions
-import random
 import warnings
 
 
 import numpy as np
 
-from .. import er_globals
 from .. import er_midi
+from .. import er_profile
+from .. import er_rng
 
 from .utils import get_iois
 from .rhythm import Rhythm
@@ -154,9 +155,10 @@ def _quasi_unison_indices(
     return out, {}
 
 
-def _add_comma(er, voice_i, onset_positions, comma):
+def _add_comma(er, voice_i, onset_positions, comma, rng=None):
     if not comma or er.cont_rhythms != "none":
         return
+    rng = er_rng.get_rng(rng)
     comma_position = er.comma_position[voice_i]
     if comma_position == "end":
         return
@@ -171,19 +173,19 @@ def _add_comma(er, voice_i, onset_positions, comma):
                 "than number of onset positions in rhythm. Choosing a "
                 "random comma position."
             )
-            comma_i = random.randrange(len(onset_positions))
+            comma_i = er_rng.randrange(rng, len(onset_positions))
     else:
         if comma_position == "beginning":
             comma_i = 0
         elif comma_position == "middle":
-            comma_i = random.randrange(1, len(onset_positions))
+            comma_i = er_rng.randrange(rng, 1, len(onset_positions))
         else:
-            comma_i = random.randrange(len(onset_positions) + 1)
+            comma_i = er_rng.randrange(rng, len(onset_positions) + 1)
 
     onset_positions[comma_i:] += comma
 
 
-def _onset_positions(er, voice_i):
+def _onset_positions(er, voice_i, rng=None):
     """Returns an np array of possible onset times."""
 
     if er.cont_rhythms == "grid":
@@ -200,7 +202,7 @@ def _onset_positions(er, voice_i):
         normalized_proportions = proportions * onset_subdivision
         onset_positions = np.repeat(onset_positions, len(proportions))
         onset_positions += np.tile(normalized_proportions, n_onsets)
-    _add_comma(er, voice_i, onset_positions, comma)
+    _add_comma(er, voice_i, onset_positions, comma, rng)
     return onset_positions
 
 
@@ -260,9 +262,10 @@ def _indices_handler(er, voice_i, prev_rhythms, onset_positions):
     ]
 
 
-def get_onsets(er, voice_i, prev_rhythms):
+def get_onsets(er, voice_i, prev_rhythms, rng=None):
     # TODO: don't use fractions, convert to fractions later
-    onset_positions = _onset_positions(er, voice_i)
+    rng = er_rng.get_rng(rng)
+    onset_positions = _onset_positions(er, voice_i, rng)
     indices, i_bounds = _indices_handler(
         er, voice_i, prev_rhythms, onset_positions
     )
@@ -279,7 +282,7 @@ def get_onsets(er, voice_i, prev_rhythms):
             # we don't need to shuffle portions of the array that we will
             #   not use
             break
-        er_globals.RNG.shuffle(indices[start_i:end_i])
+        rng.shuffle(indices[start_i:end_i])
         num_remaining -= end_i - start_i
 
     if num_notes > len(onset_positions) / 2:
@@ -299,21 +302,16 @@ def get_iois_from_er(er, voice_i, onsets):
 
 
 def _yield_onset_and_consecutive_release(rhythm):
+    onsets, durs = rhythm.onsets, rhythm.durs
     i = 0
-    try:
-        while True:
-            onset, dur = rhythm._data.peekitem(i)
-            first_onset = onset
-            while (
-                i + 1 < len(rhythm.onsets)
-                and onset + dur == rhythm.onsets[i + 1]
-            ):
-                i += 1
-                onset, dur = rhythm._data.peekitem(i)
-            yield first_onset, onset + dur
+    while i < len(onsets):
+        onset, dur = onsets[i], durs[i]
+        first_onset = onset
+        while i + 1 < len(onsets) and onset + dur == onsets[i + 1]:
             i += 1
-    except IndexError:
-        pass
+            onset, dur = onsets[i], durs[i]
+        yield first_onset, onset + dur
+        i += 1
 
 
 def _within_leader_durs(er, voice_i, iois, onsets, leader_rhythm):
@@ -336,47 +334,89 @@ def _within_leader_durs(er, voice_i, iois, onsets, leader_rhythm):
     return out
 
 
-def _durs_handler(er, voice_i, durs, within):
+def _occurrence_ranks(indices):
+    """Returns, for each item in `indices`, the number of times the same value
+    occurred earlier in `indices`.
+
+    >>> _occurrence_ranks(np.array([2, 0, 2, 2, 0, 1]))
+    array([0, 0, 1, 2, 1, 0])
+    """
+    order = np.argsort(indices, kind="stable")
+    sorted_indices = indices[order]
+    group_starts = np.searchsorted(sorted_indices, sorted_indices, side="left")
+    ranks = np.empty_like(order)
+    ranks[order] = np.arange(len(indices)) - group_starts
+    return ranks
+
+
+def _durs_handler(er, voice_i, durs, within, rng=None):
+    """Adds to `durs` (in place) until the dur_density of the voice is reached.
+
+    Durations are incremented one dur_subdivision at a time, each increment
+    going to a randomly chosen note whose duration is still less than
+    `within`. Rather than making the increments one at a time, we draw a batch
+    of notes uniformly at random and discard the draws of notes that have
+    already been filled up. This has the same distribution as choosing
+    uniformly among the notes that have not yet been filled up.
+
+    Returns True if the dur_density was reached, otherwise False.
+    """
 
+    rng = er_rng.get_rng(rng)
     dur_subdivision = er.dur_subdivision[voice_i]
+    target = er.dur_density[voice_i] * er.rhythm_len[voice_i]
 
     remaining = within - durs
-    total_remaining = (
-        er.dur_density[voice_i] * er.rhythm_len[voice_i] - durs.sum()
-    )
-    available_durs = {i: r for (i, r) in enumerate(remaining) if within[i] != r}
-    available_indices = list(available_durs)
+    available_indices = np.flatnonzero(within != remaining)
+    remaining = remaining[available_indices]
+    # Durations are often Fractions, which are slow, so we choose the
+    #   increments using floats and only add them to `durs` at the end.
+    float_remaining = np.array(remaining, dtype=np.float64)
+    float_subdivision = float(dur_subdivision)
+    # number of increments that each available note can receive; all but the
+    #   last of these are of size dur_subdivision
+    capacities = np.ceil(
+        np.round(float_remaining / float_subdivision, 8)
+    ).astype(int)
+    last_increments = float_remaining - (capacities - 1) * float_subdivision
     n_indices = len(available_indices)
+    counts = np.zeros(n_indices, dtype=int)
+    total_remaining = float(target - durs.sum())
 
     # Our stopping point is rounded to the nearest dur_subdivision
-    stopping_threshold = dur_subdivision / 2
+    stopping_threshold = float_subdivision / 2
     # In the case where er.overlap is False and the rhythm begins with a rest,
     #   we may not be able to reach the stopping threshold, so we also need to
     #   check whether there are any available durations to fill
-    while total_remaining > stopping_threshold and n_indices:
-        # to my surprise, random.choice(dict) returns values, not keys,
-        #   which is why we need another solution here
-        j = random.randrange(n_indices)
-        i = available_indices[j]
-        r = available_durs[i]
-        if r <= dur_subdivision:
-            increment = r
-            n_indices -= 1
-            if j != n_indices:
-                available_indices[j], available_indices[n_indices] = (
-                    available_indices[n_indices],
-                    available_indices[j],
-                )
-        else:
-            increment = dur_subdivision
-            available_durs[i] -= increment
-        durs[i] += increment
-        total_remaining -= increment
+    while total_remaining > stopping_threshold and np.any(counts < capacities):
+        n_draws = 2 * int(np.ceil(total_remaining / float_subdivision))
+        draws = rng.integers(n_indices, size=n_draws + n_indices)
+        ranks = counts[draws] + _occurrence_ranks(draws) + 1
+        increments = np.where(
+            ranks == capacities[draws],
+            last_increments[draws],
+            float_subdivision,
+        )
+        increments[ranks > capacities[draws]] = 0
+        cum_increments = np.cumsum(increments)
+        reached = np.flatnonzero(
+            total_remaining - cum_increments <= stopping_threshold
+        )
+        if len(reached):
+            draws = draws[: reached[0] + 1]
+        counts = np.minimum(
+            counts + np.bincount(draws, minlength=n_indices), capacities
+        )
+        total_remaining -= cum_increments[len(draws) - 1]
 
-    return total_remaining <= stopping_threshold
+    filled = counts == capacities
+    durs[available_indices[filled]] += remaining[filled]
+    durs[available_indices[~filled]] += counts[~filled] * dur_subdivision
+    total_remaining = target - durs.sum()
+    return total_remaining <= dur_subdivision / 2
 
 
-def get_durs(er, voice_i, iois, onsets, prev_rhythms):
+def get_durs(er, voice_i, iois, onsets, prev_rhythms, rng=None):
     # MAYBE if onset_density > .5, *remove* duration?
     durs = np.minimum(iois, er.min_dur[voice_i])
     if (
@@ -388,38 +428,44 @@ def get_durs(er, voice_i, iois, onsets, prev_rhythms):
         within_leader_durs = _within_leader_durs(
             er, voice_i, iois, onsets, leader
         )
-        done = _durs_handler(er, voice_i, durs, within_leader_durs)
+        done = _durs_handler(er, voice_i, durs, within_leader_durs, rng=rng)
         if done:
             return durs
-    _durs_handler(er, voice_i, durs, iois)
+    _durs_handler(er, voice_i, durs, iois, rng=rng)
     return durs
 
 
-def generate_rhythm(er, voice_i, prev_rhythms=()):
+@er_profile.phase("generate rhythm", trace=False)
+def generate_rhythm(er, voice_i, prev_rhythms=(), rng=None, rhythms=None):
+    """Generates the rhythm of voice `voice_i` in `rhythms[voice_i]` (by
+    default, `er.rhythms[voice_i]`).
+    """
     if voice_i in er.rhythmic_unison_followers:
         return
+    if rhythms is None:
+        rhythms = er.rhythms
 
     if er.cont_rhythms == "all":
         # methods from the previous version that I have not yet implemented (and
         # I'm not sure that I need to implement):
         #    rhythm.truncate_or_extend()
         #    rhythm.round()
-        er.rhythms[voice_i].generate()
+        rhythms[voice_i].generate(rng=rng)
         return
 
-    onsets = get_onsets(er, voice_i, prev_rhythms)
+    onsets = get_onsets(er, voice_i, prev_rhythms, rng=rng)
     er.check_time()
     iois = get_iois_from_er(er, voice_i, onsets)
     er.check_time()
     if er.cont_rhythms == "grid":
-        durs = er.grid.get_durs(er, voice_i, onsets, prev_rhythms)
+        durs = er.grid.get_durs(er, voice_i, onsets, prev_rhythms, rng=rng)
     else:
-        durs = get_durs(er, voice_i, iois, onsets, prev_rhythms)
+        durs = get_durs(er, voice_i, iois, onsets, prev_rhythms, rng=rng)
     er.check_time()
     if er.cont_rhythms == "grid":
         onsets, durs = er.grid.vary(onsets, durs)
     # rhythm = Rhythm.from_er_settings(er, voice_i)
-    er.rhythms[voice_i].set_onsets_and_durs(onsets, durs)
+    rhythms[voice_i].set_onsets_and_durs(onsets, durs)
 
 
 def update_pattern_vl_order(er):
@@ -433,16 +479,36 @@ def update_pattern_vl_order(er):
         start_indices[voice_i] = end_i
 
 
-def rhythms_handler(er):
-    """According to the parameters in er, return rhythms."""
+@er_profile.phase("rhythms")
+def rhythms_handler(er, rng_streams=None, rhythms=None):
+    """According to the parameters in er, generate rhythms.
+
+    Keyword args:
+        rng_streams: an er_rng.RNGStreams. The rhythm of each voice is
+            generated with `rng_streams.generator(voice_i)`. If None, all
+            rhythms are generated with the global generator.
+        rhythms: the (empty) rhythm objects in which to generate the rhythms
+            (see new_rhythms()). If None, the rhythms are generated in
+            `er.rhythms`, and `er.pattern_vl_order` is updated to match them.
+            Otherwise, `er` is left unchanged.
+    """
 
     if er.rhythms_specified_in_midi:
         return
 
+    update_er = rhythms is None
+    if update_er:
+        rhythms = er.rhythms
     for voice_i in range(er.num_voices):
-        generate_rhythm(er, voice_i, prev_rhythms=er.rhythms[:voice_i])
+        generate_rhythm(
+            er,
+            voice_i,
+            prev_rhythms=rhythms[:voice_i],
+            rng=None if rng_streams is None else rng_streams.generator(voice_i),
+            rhythms=rhythms,
+        )
 
-    if not any(er.rhythms):
+    if not any(rhythms):
 
         class EmptyRhythmsError(Exception):
             pass
@@ -451,67 +517,85 @@ def rhythms_handler(er):
             "No notes in any rhythms! This is a bug in the script."
         )
 
-    update_pattern_vl_order(er)
+    if update_er:
+        update_pattern_vl_order(er)
 
 
-def init_rhythms(er):
+@er_profile.phase("rhythms")
+def init_rhythms(er, rng=None):
     if er.rhythms_specified_in_midi:
         er.rhythms = er_midi.get_rhythms_from_midi(er)
         return
     if er.cont_rhythms == "grid":
         er.grid = Grid.from_er_settings(er)
-        er.grid.generate()
+        er.grid.generate(rng=rng)
+    er.rhythms = new_rhythms(er)
+
 
+def new_rhythms(er):
+    """Returns a list of new (empty) rhythm objects, one for each voice.
+
+    Rhythmic unison followers share the rhythm object of their leader.
+    """
     if er.cont_rhythms == "all":
         r_class = ContRhythm
     else:
         r_class = Rhythm
-    er.rhythms = []
+    rhythms = []
     for voice_i in range(er.num_voices):
         if voice_i in er.rhythmic_unison_followers:
             leader_i = er.rhythmic_unison_followers[voice_i]
-            er.rhythms.append(er.rhythms[leader_i])
+            rhythms.append(rhythms[leader_i])
         else:
-            er.rhythms.append(r_class.from_er_settings(er, voice_i))
+            rhythms.append(r_class.from_er_settings(er, voice_i))
+    return rhythms
 
 
-def get_onset_order(er):
-    # TODO revise this function?
+class OnsetOrder(collections.abc.Sequence):
+    """The order in which notes in the initial pattern are to be constructed.
 
-    end_time = max(er.pattern_len)
+    Items are (voice_i, onset) tuples. Onsets are only cast to Fraction when
+    they are accessed, since attempts at constructing the initial pattern
+    often fail long before reaching the last onset.
+    """
 
-    class NoMoreAttacksError(Exception):
-        pass
+    def __init__(self, voice_is, onsets):
+        self._voice_is = voice_is
+        self._onsets = onsets
+
+    def __len__(self):
+        return len(self._onsets)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        # TODO remove this cast?
+        return int(self._voice_is[i]), fractions.Fraction(self._onsets[i])
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({list(self)})"
 
-    def _get_next_onset():
-        next_onset = end_time ** 2
-        increment_i = -1
-        for i in er.voice_order:
-            try:
-                next_onset_in_voice = onsets[i][voice_is[i]]
-            except IndexError:
-                continue
-            if next_onset_in_voice < next_onset:
-                next_onset = next_onset_in_voice
-                increment_i = i
-        if next_onset == end_time ** 2:
-            raise NoMoreAttacksError()
-        voice_is[increment_i] += 1
-        return next_onset, increment_i
 
+def get_onset_order(er, rhythms=None):
+    """Returns all onsets in the initial pattern of `rhythms` (by default,
+    `er.rhythms`), sorted by time.
+
+    Simultaneous onsets are sorted according to er.voice_order.
+    """
+    if rhythms is None:
+        rhythms = er.rhythms
+    end_time = max(er.pattern_len)
     onsets = [
-        rhythm.onsets_between(0, pattern_len)
-        for (rhythm, pattern_len) in zip(er.rhythms, er.pattern_len)
+        rhythms[voice_i].onsets_between(0, er.pattern_len[voice_i])
+        for voice_i in er.voice_order
     ]
-    voice_is = [0 for i in range(er.num_voices)]
-    ordered_onsets = []
-    while True:
-        try:
-            next_onset, voice_i = _get_next_onset()
-        except NoMoreAttacksError:
-            break
-        if next_onset >= end_time:
-            break
-        # TODO remove this cast?
-        ordered_onsets.append((voice_i, fractions.Fraction(next_onset)))
-    return ordered_onsets
+    voice_is = np.repeat(er.voice_order, [len(a) for a in onsets])
+    onsets = np.concatenate(onsets)
+    # Onsets are often Fractions, which are slow to compare, so we sort by
+    # their float values. Because we concatenated the onsets in voice order, a
+    # stable sort leaves simultaneous onsets in voice order.
+    float_onsets = onsets.astype(np.float64)
+    order = np.argsort(float_onsets, kind="stable")
+    n_onsets = np.searchsorted(float_onsets[order], end_time, side="left")
+    order = order[:n_onsets]
+    return OnsetOrder(voice_is[order], onsets[order])
@@ -0,0 +1,145 @@
+"""A pool of rhythm sets that is reused across initial pattern attempts.
+"""
+import numpy as np
+
+from .. import er_rng
+
+from .make import (
+    get_onset_order,
+    init_rhythms,
+    new_rhythms,
+    rhythms_handler,
+    update_pattern_vl_order,
+)
+
+
+class RhythmSet:
+    """The rhythms of all voices, together with their onset order."""
+
+    def __init__(self, rhythms, onset_order):
+        self.rhythms = rhythms
+        self.onset_order = onset_order
+        self.successes = 0
+        self.failures = 0
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}(successes={self.successes}, "
+            f"failures={self.failures})"
+        )
+
+    @property
+    def weight(self):
+        return (1 + self.successes) / (1 + self.failures)
+
+
+class RhythmPool:
+    """Generates rhythm sets up front so they can be reused across attempts.
+
+    Most initial pattern attempts fail because of the pitch search rather than
+    because of the rhythms, so rather than generating new rhythms for every
+    attempt, we draw them from a pool of `er.rhythm_pool_size` rhythm sets.
+    Rhythm sets that have led to successful attempts are drawn more often,
+    those that have led to failed attempts less often. So that the pool
+    doesn't stay stuck with rhythm sets that keep failing, a rhythm set is
+    replaced with a newly generated one once its failures (plus one) reach
+    `max_failures` times its successes (plus one).
+
+    If `er.rhythm_pool_size` is 0, new rhythms are generated for every
+    attempt.
+
+    Each rhythm set is generated with its own random streams (derived from
+    `rng_streams`, or from `er.seed` if `rng_streams` is None), so that the
+    n-th rhythm set doesn't depend on how many rhythm sets were generated
+    before it, or on anything else that was drawn at random.
+
+    >>> from efficient_rhythms import er_settings
+    >>> er = er_settings.get_settings(
+    ...     {"num_voices": 2, "rhythm_pool_size": 3}, silent=True
+    ... )
+    >>> pool = RhythmPool(er)
+    >>> len(pool)
+    3
+    >>> rhythm_set = pool.draw()
+    >>> er.rhythms is rhythm_set.rhythms
+    True
+    >>> pool.record(success=False)
+    >>> rhythm_set.failures
+    1
+    """
+
+    def __init__(self, er, rng_streams=None, max_failures=10):
+        self._er = er
+        self._max_failures = max_failures
+        self._sets = []
+        self._current = None
+        if rng_streams is None:
+            rng_streams = er_rng.RNGStreams(er.seed)
+        self._rng_streams = rng_streams
+        self._num_generated = 0
+        self._rng = rng_streams.generator("draw")
+        init_rhythms(er, rng=rng_streams.generator("grid"))
+        if er.rhythms_specified_in_midi:
+            # There is only one possible rhythm set
+            self._sets.append(RhythmSet(er.rhythms, get_onset_order(er)))
+        else:
+            self.fill(er.rhythm_pool_size)
+
+    def __len__(self):
+        return len(self._sets)
+
+    def _generate(self):
+        """Generates a new rhythm set, without changing the rhythms of
+        `self._er` (that is left to draw()).
+        """
+        er = self._er
+        rhythms = new_rhythms(er)
+        rhythms_handler(
+            er,
+            rng_streams=self._rng_streams.child("set", self._num_generated),
+            rhythms=rhythms,
+        )
+        self._num_generated += 1
+        return RhythmSet(rhythms, get_onset_order(er, rhythms))
+
+    def fill(self, n):
+        """Generates n new rhythm sets and adds them to the pool."""
+        # Since each rhythm set has its own random streams, the sets could be
+        # generated in parallel without changing the pool. But generating
+        # rhythms is mostly pure Python, so threads wouldn't speed it up, and
+        # sending the settings to worker processes would cost more than
+        # generating a pool of typical size.
+        for _ in range(n):
+            self._sets.append(self._generate())
+
+    def draw(self):
+        """Draws a rhythm set from the pool and makes it the current rhythms.
+
+        Returns the rhythm set.
+        """
+        er = self._er
+        if not self._sets:
+            self._current = self._generate()
+        else:
+            weights = np.array([item.weight for item in self._sets])
+            set_i = self._rng.choice(len(self._sets), p=weights / weights.sum())
+            self._current = self._sets[set_i]
+        er.rhythms = self._current.rhythms
+        if not er.rhythms_specified_in_midi:
+            update_pattern_vl_order(er)
+        er.initial_pattern_order = self._current.onset_order
+        return self._current
+
+    def record(self, success):
+        """Records the outcome of an attempt using the current rhythm set."""
+        current = self._current
+        if success:
+            current.successes += 1
+            return
+        current.failures += 1
+        if (
+            current.failures + 1 >= self._max_failures * (current.successes + 1)
+            and current in self._sets
+            and not self._er.rhythms_specified_in_midi
+        ):
+            self._sets[self._sets.index(current)] = self._generate()
@@ -1,11 +1,12 @@
 import numpy as np
 
-import sortedcontainers
+# onsets within this distance of a key are considered equal to it in
+#   RhythmBase.__getitem__()
+ONSET_TOLERANCE = 1e-8
 
 
 class RhythmBase:
     def __init__(self):
-        self._data = None
         self._onsets = None
         self._durs = None
         self.rhythm_len = None
@@ -20,39 +21,41 @@ class RhythmBase:
         return self._durs
 
     def set_onsets_and_durs(self, onsets, durs):
-        if onsets is not None and durs is not None:
-            dict_ = dict(zip(onsets, durs))
-        else:
-            dict_ = {}
-        self._data = sortedcontainers.SortedDict(dict_)
+        # onsets are expected to be sorted and unique. We look them up with
+        #   np.searchsorted(), so we don't need to build any other data
+        #   structure.
+        if onsets is None or durs is None:
+            onsets = durs = np.array([])
         self._onsets = onsets
         self._durs = durs
 
     def __iter__(self):
-        return self._data.items().__iter__()
+        return zip(self._onsets, self._durs)
 
     def __len__(self):
-        return self._data.__len__()
+        return 0 if self._onsets is None else len(self._onsets)
 
     def __getitem__(self, key):
-        try:
-            return self._data.__getitem__(key % self.rhythm_len)
-        except KeyError:
-            # The above sometimes fails due to rounding error
-            # Longterm I should figure out a more robust solution
-            i_at_or_after = self.get_i_at_or_after(key)
-            onset, dur = self._data.peekitem(i_at_or_after)
-            if onset - key < 1e-8:
-                return dur
-            onset, dur = self._data.peekitem(i_at_or_after - 1)
-            if key - onset < 1e-8:
-                return dur
-            raise
+        # Exact lookups sometimes fail due to rounding error, so we look for
+        #   the first onset no more than ONSET_TOLERANCE before key and then
+        #   check that it is no more than ONSET_TOLERANCE after it.
+        # Longterm I should figure out a more robust solution
+        remaining = key % self.total_dur
+        if self.total_dur - remaining < ONSET_TOLERANCE:
+            # key is (approximately) a multiple of total_dur
+            remaining -= self.total_dur
+        rem_i = np.searchsorted(self._onsets, remaining - ONSET_TOLERANCE)
+        if (
+            rem_i < len(self._onsets)
+            and self._onsets[rem_i] - remaining < ONSET_TOLERANCE
+        ):
+            return self._durs[rem_i]
+        raise KeyError(key)
 
     def __repr__(self):
         return (
             f"{self.__class__.__name__}(total_dur={self.total_dur}, "
-            f"contents: {self._data})"
+            f"contents: {dict(self)})"
         )
 
     def onsets_between(self, start, end):
@@ -71,55 +74,50 @@ class RhythmBase:
 
     def get_i_at_or_after(self, time):
         prev_reps, remaining = divmod(time, self.total_dur)
-        return int(prev_reps) * len(self._data) + self._data.bisect_left(
-            remaining
+        return int(prev_reps) * len(self) + int(
+            np.searchsorted(self._onsets, remaining, side="left")
         )
 
     def get_i_at_or_before(self, time):
         prev_reps, remaining = divmod(time, self.total_dur)
         return (
-            int(prev_reps) * len(self._data)
-            + self._data.bisect_right(remaining)
+            int(prev_reps) * len(self)
+            + int(np.searchsorted(self._onsets, remaining, side="right"))
             - 1
         )
 
     def get_i_before(self, time):
         prev_reps, remaining = divmod(time, self.total_dur)
-        rem_i = self._data.bisect_right(remaining) - 1
+        rem_i = int(np.searchsorted(self._onsets, remaining, side="right")) - 1
 
-        if remaining == self._data.peekitem(rem_i)[0]:
+        if remaining == self._onsets[rem_i]:
             rem_i -= 1
 
-        return int(prev_reps) * len(self._data) + rem_i
+        return int(prev_reps) * len(self) + rem_i
 
     def get_i_after(self, time):
         prev_reps, remaining = divmod(time, self.total_dur)
-        rem_i = self._data.bisect_left(remaining)
-        if (
-            rem_i < len(self._data)
-            and remaining == self._data.peekitem(rem_i)[0]
-        ):
+        rem_i = int(np.searchsorted(self._onsets, remaining, side="left"))
+        if rem_i < len(self) and remaining == self._onsets[rem_i]:
             rem_i += 1
-        return int(prev_reps) * len(self._data) + rem_i
+        return int(prev_reps) * len(self) + rem_i
 
     def get_onset_and_dur(self, rhythm_i):
-        n_reps, rem_i = divmod(rhythm_i, len(self._data))
+        n_reps, rem_i = divmod(rhythm_i, len(self))
         reps_time = n_reps * self.total_dur
-        onset, dur = self._data.peekitem(rem_i)
-        return onset + reps_time, dur
+        return self._onsets[rem_i] + reps_time, self._durs[rem_i]
 
     def at_or_after(self, time):
         # TODO fix cast
         prev_reps, remaining = divmod(time, float(self.total_dur))
 
-        rem_i = self._data.bisect_left(remaining)
-        if rem_i >= len(self._data):
+        rem_i = int(np.searchsorted(self._onsets, remaining, side="left"))
+        if rem_i >= len(self):
             rem_i = 0
             prev_reps += 1
             # raise ValueError(f"No onset at or after {time}")
-        onset, dur = self._data.peekitem(rem_i)
         reps_time = prev_reps * self.total_dur
-        return onset + reps_time, dur
+        return self._onsets[rem_i] + reps_time, self._durs[rem_i]
 
     def rest_before_onset(self, onset, min_rest_len):
         # TODO test
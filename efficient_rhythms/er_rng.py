@@ -0,0 +1,117 @@
+"""Deterministic random streams for the components of a build.
+
+Rather than drawing from a single global generator (in which case the values
+that each component draws depend on how many values every other component
+has drawn before it), each component of a build (e.g., the rhythm of each
+voice, each initial pattern attempt, each changer) draws from its own NumPy
+Generator. The generators are derived from the seed of the build with
+SeedSequence, keyed by the name of the component and any indices (e.g.,
+`streams.generator("rhythm", set_i, voice_i)`), so the values that a
+component draws depend only on the seed and on the key, and not on the order
+in which the components run. Builds that run in parallel (e.g., in different
+processes) thus produce the same output as serial builds with the same seed.
+
+Keys are appended to the `spawn_key` of the root SeedSequence in the same way
+as by `SeedSequence.spawn()`, except that the child for a given key doesn't
+depend on how many children have been spawned before it.
+
+Components called outside of a build (e.g., in tests) can be called without
+a generator, in which case they fall back to the global generator
+`er_globals.RNG`.
+"""
+import zlib
+
+import numpy as np
+
+from . import er_globals
+
+
+def _key_ints(key):
+    # Names are mapped to ints with crc32 rather than hash() because hash()
+    #   of strings varies between processes
+    return tuple(
+        zlib.crc32(item.encode("utf-8")) if isinstance(item, str) else item
+        for item in key
+    )
+
+
+class RNGStreams:
+    """Derives independent NumPy Generators from a single seed.
+
+    >>> streams = RNGStreams(42)
+    >>> a = streams.generator("rhythm", 0, 1).random()
+    >>> b = streams.generator("rhythm", 0, 2).random()
+    >>> a != b
+    True
+    >>> RNGStreams(42).generator("rhythm", 0, 1).random() == a
+    True
+
+    Streams can also be derived from other streams, e.g., to hand a component
+    its own streams:
+    >>> child = streams.child("changers")
+    >>> child.generator(0).random() == streams.generator("changers", 0).random()
+    True
+    """
+
+    def __init__(self, seed=None, _seed_seq=None):
+        if _seed_seq is None:
+            _seed_seq = np.random.SeedSequence(seed)
+        self._seed_seq = _seed_seq
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}(entropy={self._seed_seq.entropy}, "
+            f"spawn_key={self._seed_seq.spawn_key})"
+        )
+
+    def seed_sequence(self, *key):
+        return np.random.SeedSequence(
+            self._seed_seq.entropy,
+            spawn_key=self._seed_seq.spawn_key + _key_ints(key),
+            pool_size=self._seed_seq.pool_size,
+        )
+
+    def child(self, *key):
+        """Returns the RNGStreams for the component identified by `key`."""
+        return RNGStreams(_seed_seq=self.seed_sequence(*key))
+
+    def generator(self, *key):
+        """Returns the Generator for the component identified by `key`."""
+        return np.random.Generator(np.random.PCG64(self.seed_sequence(*key)))
+
+
+def get_rng(rng):
+    """Returns `rng`, or the global generator if `rng` is None."""
+    return er_globals.RNG if rng is None else rng
+
+
+# Generator.integers() and Generator.choice() have a lot of overhead when
+#   drawing a single value, so, when drawing single values, we use the
+#   following functions instead, which only call Generator.random().
+
+
+def choice(rng, seq):
+    """Returns a random item of a non-empty sequence, like random.choice().
+
+    >>> rng = RNGStreams(0).generator()
+    >>> choice(rng, [1, 2, 3]) in (1, 2, 3)
+    True
+    """
+    return seq[int(rng.random() * len(seq))]
+
+
+def randrange(rng, start, stop=None):
+    """Returns a random int in range(start, stop), like random.randrange().
+
+    >>> rng = RNGStreams(0).generator()
+    >>> randrange(rng, 3) in (0, 1, 2)
+    True
+    >>> randrange(rng, 3, 3)
+    Traceback (most recent call last):
+    ValueError: empty range for randrange() (3, 3)
+    """
+    if stop is None:
+        start, stop = 0, start
+    if stop <= start:
+        raise ValueError(f"empty range for randrange() ({start}, {stop})")
+    return start + int(rng.random() * (stop - start))
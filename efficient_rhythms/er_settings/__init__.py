@@ -2,3 +2,4 @@ from .defaults import *
 from .settings import CATEGORIES
 from .settings_handler import get_settings, merge_settings, read_in_settings
 from .settings_postprocess import SettingsPostprocessor as ERSettings
+from .snapshot import clear_settings_cache, get_cached_settings
@@ -1369,6 +1369,14 @@ class SettingsDataclass(SettingsBase):
             constructing initial pattern before giving up or asking whether
             to make more attempts.
             Default: 50
+        rhythm_pool_size: integer. Number of sets of rhythms to generate
+            before making any attempts at constructing the initial pattern.
+            Each attempt draws one of these sets, favoring sets that have
+            been used in successful attempts over sets that have been used in
+            unsuccessful ones. Sets that keep failing are replaced with newly
+            generated ones. If 0, new rhythms are generated for every
+            attempt.
+            Default: 10
         exclude_from_randomization: optional sequence of strings. A list of
             attribute names of this class. Only has an effect when the script is
             invoked with "-r" or "--random", in which case any attribute names
@@ -1671,6 +1679,7 @@ class SettingsDataclass(SettingsBase):
             "priority": 1,
             "expected_constants": ("pitch_class",),
             "if_falsy": random_foot_pcs,
+            "random_fill": True,
             "postprocess": (generate_interval_cycle, set_to_num_harmonies),
         },
     )
@@ -2770,6 +2779,15 @@ class SettingsDataclass(SettingsBase):
             "priority": 0,
         },
     )
+    rhythm_pool_size: int = fld(
+        default=10,
+        metadata={
+            "mutable_attrs": {},
+            "category": "global",
+            "shell_only": True,
+            "priority": 0,
+        },
+    )
     voice_leading_attempts: int = fld(
         default=50,
         metadata={
@@ -2824,6 +2842,7 @@ class SettingsDataclass(SettingsBase):
     # Private settings
 
     _randomized: bool = False
+    _randomization_stats: Optional[object] = None
     _silent: bool = False
     _user_settings: Optional[List[str]] = None
 
@@ -1,25 +1,24 @@
+import time
 import typing
 
 import numpy as np
 
 from .. import (
-    er_constants,
     er_exceptions,
     er_misc_funcs,
+    er_parse,
     er_randomize,
     er_tuning,
     er_types,
 )
 
-
-def _process_str(pitch_str):
-    pitch_str = pitch_str.replace("#", "_SHARP")
-    return eval(pitch_str, vars(er_constants))  # pylint: disable=eval-used
+# er.check_time() only reads the clock once every this many calls
+TIME_CHECK_INTERVAL = 64
 
 
 def replace_pitch_constants(pitch_material):
     if isinstance(pitch_material, str):
-        return _process_str(pitch_material)
+        return er_parse.parse_pitch_str(pitch_material)
     if isinstance(pitch_material, typing.Sequence):
         return tuple(replace_pitch_constants(item) for item in pitch_material)
     return pitch_material
@@ -47,7 +46,11 @@ def get_base_type(field_type):
 
 
 class SettingsBase:
-    _silent = _randomized = None
+    _silent = _randomized = _randomization_stats = None
+    randomized_values = None
+    # The names of the fields that were drawn at random because they weren't
+    # specified (see _fill_none_or_falsy())
+    _random_fields = ()
     # when creating a dataclass that derives from another class, we still need
     # to apply the @dataclass decorator. For that reason there doesn't seem to
     # be any purpose in applying it to SettingsBase.
@@ -57,7 +60,7 @@ class SettingsBase:
         if self.randomized:
             self.randomize()
         self._process_fields()
-        self._timeout_event = None
+        self.set_deadline(None)
 
     def _set_seed(self):
         self.seed = er_misc_funcs.set_seed(
@@ -65,17 +68,35 @@ class SettingsBase:
         )
 
     def check_time(self):
-        if self._timeout_event is None:
+        """Raises ErTimeoutError if the deadline has passed.
+
+        This is called very often during the build, so the clock is only read
+        once every TIME_CHECK_INTERVAL calls.
+        """
+        if self._deadline is None:
+            return
+        self._time_check_countdown -= 1
+        if self._time_check_countdown > 0:
             return
-        if self._timeout_event.is_set():
+        self._time_check_countdown = TIME_CHECK_INTERVAL
+        if time.monotonic() >= self._deadline:
             raise er_exceptions.ErTimeoutError
 
-    def add_timeout_event(self, timeout_event):
-        self._timeout_event = timeout_event
+    def set_deadline(self, timeout):
+        """Sets the deadline to `timeout` seconds from now.
+
+        If `timeout` is None, removes the deadline.
+        """
+        self._deadline = None if timeout is None else time.monotonic() + timeout
+        self._time_check_countdown = TIME_CHECK_INTERVAL
 
     def randomize(self):
         randomizer = er_randomize.ERRandomize(self)
-        randomizer.apply(self)
+        self.randomized_values = randomizer.apply(
+            self,
+            stats=self._randomization_stats,
+            print_out=not self._silent,
+        )
         # we re-set the seed in the hopes that the music will be reproducible
         er_misc_funcs.set_seed(self.seed, print_out=False)
 
@@ -154,12 +175,16 @@ class SettingsBase:
         ):
             new_val = metadata["if_falsy"](self)
             setattr(self, field_name, new_val)
+            if metadata.get("random_fill", False):
+                self._random_fields += (field_name,)
             return
         if raw_val is not None:
             return
         if "if_none" in metadata:
             new_val = metadata["if_none"](self)
             setattr(self, field_name, new_val)
+            if metadata.get("random_fill", False):
+                self._random_fields += (field_name,)
         elif "from_if_none" in metadata:
             new_val = getattr(self, metadata["from_if_none"])
             setattr(self, field_name, new_val)
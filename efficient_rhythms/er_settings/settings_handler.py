@@ -1,4 +1,4 @@
-from .. import er_constants
+from .. import er_parse
 from .settings_postprocess import SettingsPostprocessor as ERSettings
 
 
@@ -18,10 +18,7 @@ def merge_settings(settings_paths, silent=True):
     for user_settings_path in settings_paths:
         if not silent:
             print(f"Reading settings from {user_settings_path}")
-        with open(user_settings_path, "r", encoding="utf-8") as inf:
-            user_settings = eval(  # pylint: disable=eval-used
-                inf.read(), vars(er_constants)
-            )
+        user_settings = er_parse.read_settings_file(user_settings_path)
         _merge(merged_dict, user_settings)
     return merged_dict
 
@@ -33,6 +30,7 @@ def read_in_settings(
     output_path=None,
     randomize=False,
     seed=None,
+    randomization_stats=None,
 ):
     if settings_input is None:
         settings_input = {}
@@ -47,6 +45,7 @@ def read_in_settings(
     if randomize:
         settings_dict["_randomized"] = True
         settings_dict["_user_settings"] = settings_input
+        settings_dict["_randomization_stats"] = randomization_stats
     settings_dict["_silent"] = silent
     return settings_class(**settings_dict)
 
@@ -57,6 +56,7 @@ def get_settings(
     seed=None,
     silent=False,
     output_path=None,
+    randomization_stats=None,
 ):
     # TODO set seed here
     er = read_in_settings(
@@ -66,5 +66,6 @@ def get_settings(
         output_path=output_path,
         randomize=random_settings,
         seed=seed,
+        randomization_stats=randomization_stats,
     )
     return er
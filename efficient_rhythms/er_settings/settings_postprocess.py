@@ -8,7 +8,7 @@ import numpy as np
 
 from .. import er_choirs
 from .. import er_constants
-from ..er_interface import BuildStatusPrinter
+from ..er_interface import BuildStatusPrinter, NullStatusPrinter
 from .. import er_midi
 from .. import er_misc_funcs
 from .. import er_tuning
@@ -17,6 +17,7 @@ from .. import er_voice_leadings
 
 
 from .settings import SettingsDataclass
+from .views import build_views
 from .warnings_ import notify_user_of_unusual_settings
 
 
@@ -34,6 +35,9 @@ class SettingsPostprocessor(SettingsDataclass):
         self._chord_tone_and_foot_toggle()
         er_validate.validate_settings(self)
         notify_user_of_unusual_settings(self, silent=self._silent)
+        # The views must be built after any of the above that may change
+        # settings
+        self.voice, self.harmony = build_views(self)
         self._set_seed()
 
     def _get_scales_and_chords_from_midi(self):
@@ -90,7 +94,7 @@ class SettingsPostprocessor(SettingsDataclass):
     @cached_property
     def build_status_printer(self):
         if self._silent:
-            return None
+            return NullStatusPrinter()
         return BuildStatusPrinter(self)
 
     @cached_property
@@ -155,18 +159,6 @@ class SettingsPostprocessor(SettingsDataclass):
         out.reverse()
         return out
 
-    @cached_property
-    @staticmethod
-    def already_warned():
-        """Certain warnings should only occur once, even though the situation
-        that provokes them may occur many times. This dictionary helps keep
-        track of that.
-        """
-        return {
-            "force_foot": set(),
-            "hard_bounds": set(),
-        }
-
     @cached_property
     def sub_subdiv_props(self):
         out = []
@@ -478,6 +470,13 @@ class SettingsPostprocessor(SettingsDataclass):
             )
         return out
 
+    @cached_property
+    def gamut_scale_indices(self):
+        return [
+            er_misc_funcs.ScaleIndex(gamut_scale)
+            for gamut_scale in self.gamut_scales
+        ]
+
     def nonchord_pcs_at_harmony_i(self, i):
         if i not in self._nonchord_pcs:
             self._get_chord_and_nonchord_pcs(i)
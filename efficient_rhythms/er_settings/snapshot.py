@@ -0,0 +1,277 @@
+"""Compiled snapshots of processed settings.
+
+Building an ERSettings object (replacing pitch constants, tempering, padding
+per-voice sequences, validation, etc.) is relatively slow. When many builds are
+made from the same settings (e.g., with thousands of seeds), we can instead
+compile the processed settings into a snapshot once and load the snapshot for
+each build, skipping parsing and validation.
+
+Snapshots are keyed by a hash of the settings files (or the settings dict), the
+snapshot format version, and a hash of the package source, so they are
+automatically invalidated when any of these change.
+
+Settings whose processing depends on the seed (i.e., when a field that isn't
+specified is drawn at random, like `foot_pcs`, or when settings are randomized)
+can't be snapshotted, and are processed as usual.
+"""
+import functools
+import glob
+import hashlib
+import os
+import pickle
+import shutil
+import tempfile
+import warnings
+
+from .. import PACKAGE_DIR
+from .. import er_misc_funcs
+from .postprocess_helpers import get_output_path
+from .settings_handler import merge_settings, read_in_settings
+from .settings_postprocess import SettingsPostprocessor as ERSettings
+
+# Increment whenever the format of snapshots changes
+SNAPSHOT_VERSION = 1
+
+SETTINGS_CACHE_DIR = os.path.join(er_misc_funcs.user_cache_dir(), "settings")
+
+# The number of snapshots that are kept in the settings cache; the least
+#   recently used are removed first
+SETTINGS_CACHE_SIZE = 64
+
+# Attributes that depend on the individual build rather than on the settings,
+# and so are not stored in snapshots
+_PER_BUILD_ATTRS = (
+    "_silent",
+    "_deadline",
+    "_time_check_countdown",
+    "build_status_printer",
+)
+
+
+@functools.lru_cache(maxsize=None)
+def _package_fingerprint():
+    hasher = hashlib.sha256()
+    for path in sorted(
+        glob.glob(
+            os.path.join(PACKAGE_DIR, "efficient_rhythms", "**", "*.py"),
+            recursive=True,
+        )
+    ):
+        hasher.update(f"{os.path.relpath(path, PACKAGE_DIR)}\n".encode())
+        with open(path, "rb") as inf:
+            hasher.update(hashlib.sha256(inf.read()).digest())
+    return hasher.hexdigest()
+
+
+def snapshot_key(user_settings):
+    """Returns the key of the snapshot of the given settings.
+
+    The key changes if the contents of any of the settings files change.
+
+    >>> key = snapshot_key({"num_voices": 2})
+    >>> key == snapshot_key({"num_voices": 2})
+    True
+    >>> key == snapshot_key({"num_voices": 3})
+    False
+    """
+    hasher = hashlib.sha256()
+    hasher.update(f"{SNAPSHOT_VERSION}:{_package_fingerprint()}\n".encode())
+    if user_settings is None or isinstance(user_settings, dict):
+        hasher.update(repr(user_settings).encode())
+    else:
+        for path in user_settings:
+            with open(path, "rb") as inf:
+                hasher.update(hashlib.sha256(inf.read()).digest())
+    return hasher.hexdigest()
+
+
+def _snapshot_path(cache_dir, key):
+    return os.path.join(cache_dir, f"{key}.pickle")
+
+
+def _read_snapshot(cache_dir, key):
+    try:
+        with open(_snapshot_path(cache_dir, key), "rb") as inf:
+            snapshot = pickle.load(inf)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        return None
+    if snapshot.get("version") != SNAPSHOT_VERSION:
+        return None
+    try:
+        # mark the snapshot as recently used (see _evict_snapshots())
+        os.utime(_snapshot_path(cache_dir, key))
+    except OSError:
+        pass
+    return snapshot
+
+
+def _write_snapshot(cache_dir, key, snapshot):
+    """Writes the snapshot to the cache. If the cache can't be written to,
+    warns and returns False.
+    """
+    snapshot["version"] = SNAPSHOT_VERSION
+    temp_path = None
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        # We write to a temporary file and then move it into place so that
+        # other processes building from the same settings never read a
+        # partial snapshot
+        with tempfile.NamedTemporaryFile(
+            "wb", dir=cache_dir, suffix=".tmp", delete=False
+        ) as outf:
+            temp_path = outf.name
+            pickle.dump(snapshot, outf, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, _snapshot_path(cache_dir, key))
+    except OSError as exc:
+        if temp_path is not None and os.path.exists(temp_path):
+            os.remove(temp_path)
+        warnings.warn(
+            f"Unable to write settings snapshot to {cache_dir}: {exc}"
+        )
+        return False
+    _evict_snapshots(cache_dir)
+    return True
+
+
+def _evict_snapshots(cache_dir):
+    """Removes all but the SETTINGS_CACHE_SIZE most recently used snapshots."""
+    entries = []
+    for entry in os.scandir(cache_dir):
+        if entry.name.endswith(".pickle"):
+            try:
+                entries.append((entry.stat().st_mtime_ns, entry.path))
+            except FileNotFoundError:  # removed by another process
+                pass
+    for _, path in sorted(entries, reverse=True)[SETTINGS_CACHE_SIZE:]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def _get_state(er):
+    return {
+        attr: val
+        for attr, val in er.__dict__.items()
+        if attr not in _PER_BUILD_ATTRS
+    }
+
+
+def _get_raw_settings(user_settings):
+    # We store the output path and seed from the settings before they are
+    # processed, since get_output_path() depends on which files already exist,
+    # and the seed is set anew for each build
+    if user_settings is None:
+        settings_dict = {}
+    elif isinstance(user_settings, dict):
+        settings_dict = user_settings
+    else:
+        settings_dict = merge_settings(user_settings)
+    return {
+        "output_path": settings_dict.get(
+            "output_path",
+            ERSettings.__dataclass_fields__[  # pylint: disable=no-member
+                "output_path"
+            ].default,
+        ),
+        "seed": settings_dict.get("seed", None),
+    }
+
+
+def _read_in_settings(user_settings, **kwargs):
+    # read_in_settings() adds items to settings dicts, which would change
+    # their snapshot key, so we pass it a copy
+    if isinstance(user_settings, dict):
+        user_settings = user_settings.copy()
+    return read_in_settings(user_settings, ERSettings, **kwargs)
+
+
+def _load(snapshot, seed, silent, output_path):
+    er = ERSettings.__new__(ERSettings)
+    er.__dict__.update(pickle.loads(snapshot["state"]))
+    er._silent = silent  # pylint: disable=protected-access
+    er.set_deadline(None)
+    raw_settings = snapshot["raw_settings"]
+    er.output_path = (
+        raw_settings["output_path"] if output_path is None else output_path
+    )
+    er.output_path = get_output_path(er, "output_path")
+    # Since the snapshot doesn't depend on the seed, `seed` can be anything
+    er.seed = raw_settings["seed"] if seed is None else seed
+    er._set_seed()  # pylint: disable=protected-access
+    return er
+
+
+def get_cached_settings(
+    user_settings,
+    random_settings=False,
+    seed=None,
+    silent=False,
+    output_path=None,
+    cache_dir=None,
+):
+    """Like get_settings(), but loads the settings from a snapshot if possible.
+
+    If there is no up-to-date snapshot of the settings, the settings are
+    processed and a snapshot is saved in `cache_dir` (by default
+    SETTINGS_CACHE_DIR). Only the SETTINGS_CACHE_SIZE most recently used
+    snapshots are kept. If the snapshot can't be saved, a warning is issued and
+    the processed settings are returned anyway.
+
+    Since loading a snapshot skips validation, warnings about unusual settings
+    are only printed when the snapshot is compiled.
+
+    If processing the settings depends on the seed (i.e., if any fields that
+    aren't specified are drawn at random, like `foot_pcs`), or if
+    `random_settings` is True, the settings are processed as usual.
+    """
+    if random_settings:
+        return _read_in_settings(
+            user_settings,
+            silent=silent,
+            output_path=output_path,
+            randomize=True,
+            seed=seed,
+        )
+    if cache_dir is None:
+        cache_dir = SETTINGS_CACHE_DIR
+    key = snapshot_key(user_settings)
+    snapshot = _read_snapshot(cache_dir, key)
+    if snapshot is None:
+        if not silent:
+            print("Compiling settings snapshot")
+        er = _read_in_settings(
+            user_settings, silent=silent, output_path=output_path, seed=seed
+        )
+        # pylint: disable=protected-access
+        seed_dependent = bool(er._random_fields)
+        snapshot = {
+            "seed_dependent": seed_dependent,
+            # There is no point storing the state if it depends on the seed
+            "state": None if seed_dependent else pickle.dumps(_get_state(er)),
+            "raw_settings": _get_raw_settings(user_settings),
+        }
+        _write_snapshot(cache_dir, key, snapshot)
+        if seed_dependent and not silent:
+            print(
+                "Notice: processing these settings depends on the seed "
+                f"(because {', '.join(er._random_fields)} are drawn at "
+                "random), so they can't be loaded from a snapshot"
+            )
+        return er
+    if snapshot["seed_dependent"]:
+        return _read_in_settings(
+            user_settings,
+            silent=silent,
+            output_path=output_path,
+            seed=seed,
+        )
+    return _load(snapshot, seed, silent, output_path)
+
+
+def clear_settings_cache(cache_dir=None):
+    """Removes all snapshots in `cache_dir` (by default SETTINGS_CACHE_DIR)."""
+    if cache_dir is None:
+        cache_dir = SETTINGS_CACHE_DIR
+    if os.path.exists(cache_dir):
+        shutil.rmtree(cache_dir)
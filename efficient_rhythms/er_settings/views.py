@@ -0,0 +1,114 @@
+"""Per-voice and per-harmony views of settings.
+
+ERSettings.get() looks up an attribute, checks whether it is a sequence, and
+takes the index modulo its length every time it is called. Since the settings
+don't change during a build, the generation code instead uses views in which
+these lookups have been resolved once, e.g., `er.voice[i].max_alternations`
+rather than `er.get(i, "max_alternations")`, or `er.harmony[h].pc_chord`
+rather than `er.get(h, "pc_chords")`.
+"""
+
+import math
+
+# Settings that are resolved per voice. Settings that are mutated during the
+# build (e.g., `pitch_loop_complete`) mustn't be included here.
+VOICE_VIEW_ATTRS = (
+    "allow_voice_crossings",
+    "chord_tone_before_rests",
+    "chord_tones_no_diss_treatment",
+    "consonance_modulo",
+    "forbidden_interval_modulo",
+    "hard_bounds",
+    "hard_pitch_loop",
+    "max_alternations",
+    "max_interval",
+    "max_interval_for_non_chord_tones",
+    "min_dur_for_cons_treatment",
+    "min_interval",
+    "min_interval_for_non_chord_tones",
+    "pitch_loop",
+    "voice_ranges",
+)
+
+# Settings that are resolved per harmony, mapped to the attribute names in the
+# views
+HARMONY_VIEW_ATTRS = {
+    "foot_pcs": "foot_pc",
+    "gamut_scales": "gamut_scale",
+    "gamut_scale_indices": "gamut_scale_index",
+    "pc_chords": "pc_chord",
+    "pc_scales": "pc_scale",
+}
+
+
+class SettingsView:
+    """Read-only settings resolved for a single voice or harmony.
+
+    >>> from efficient_rhythms import er_settings
+    >>> er = er_settings.get_settings(
+    ...     {"num_voices": 3, "max_alternations": [2, 3], "foot_pcs": [0, 7]},
+    ...     silent=True,
+    ... )
+    >>> er.voice[2].max_alternations == er.get(2, "max_alternations") == 2
+    True
+    >>> er.harmony[3].foot_pc == er.get(3, "foot_pcs") == 7
+    True
+    >>> er.voice[0].max_alternations = 4
+    Traceback (most recent call last):
+    AttributeError: SettingsView attributes are read-only
+    """
+
+    def __init__(self, er, i, attrs):
+        for attr, view_attr in attrs:
+            try:
+                val = er.get(i, attr)
+            except ZeroDivisionError:
+                # An empty sequence, which can't be indexed into
+                val = getattr(er, attr)
+            object.__setattr__(self, view_attr, val)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(
+            f"{self.__class__.__name__} attributes are read-only"
+        )
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({vars(self)})"
+
+
+class SettingsViews:
+    """A sequence of SettingsView objects, indexed cyclically like er.get().
+
+    The number of views is the least common multiple of the lengths of the
+    settings, so that `views[i]` resolves the settings exactly as er.get(i)
+    would, even when the settings have different lengths.
+    """
+
+    def __init__(self, er, attrs):
+        attrs = tuple(attrs)
+        self._n = math.lcm(*(_len(getattr(er, attr)) for attr, _ in attrs))
+        self._views = tuple(SettingsView(er, i, attrs) for i in range(self._n))
+
+    def __getitem__(self, i):
+        return self._views[i % self._n]
+
+    def __len__(self):
+        return self._n
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({list(self._views)})"
+
+
+def _len(val):
+    try:
+        return max(len(val), 1)
+    except TypeError:
+        # Not a sequence: the same value is returned for every index
+        return 1
+
+
+def build_views(er):
+    """Returns per-voice and per-harmony views of `er`."""
+    voice_views = SettingsViews(er, ((attr, attr) for attr in VOICE_VIEW_ATTRS))
+    harmony_views = SettingsViews(er, HARMONY_VIEW_ATTRS.items())
+    return voice_views, harmony_views
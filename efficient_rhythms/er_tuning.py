@@ -1,5 +1,9 @@
 """Provides tuning and spelling functions for efficient_rhythms2.py."""
 
+import functools
+
+import numpy as np
+
 ALPHABET = "fcgdaeb"
 
 # for EastWest, SIZE_OF_SEMITONE should be 4096
@@ -83,52 +87,70 @@ def return_pitch_bend_tuple_dict(
     return pitch_bend_tuple_dict
 
 
+@functools.lru_cache(maxsize=None)
+def _step_intervals(tet):
+    """Returns an array of the intervals (as ratios) of the steps of an
+    octave of the given equal temperament, from the unison to the octave.
+    """
+    return 2 ** (np.arange(tet + 1) / tet)
+
+
+@functools.lru_cache(maxsize=None)
+def _12_tet_pc_steps(tet):
+    """Returns an array of the approximations of the 12-tet pitch-classes in
+    the given equal temperament."""
+    return np.round(np.arange(12) / 12 * tet).astype(int)
+
+
+def approximate_just_intervals(rationals, tet):
+    """Approximates the given rationals in given equal temperament.
+
+    Returns an array of ints. Each rational is approximated by the nearest
+    step of the temperament (or the lower of two equally near steps).
+
+    >>> approximate_just_intervals([3 / 2, 5 / 4, -2, 1 / 3], 12)
+    array([  7,   4, -12, -19])
+    """
+    rationals = np.asarray(rationals, dtype=float)
+    if not np.all(rationals):
+        raise ValueError("Can't approximate an interval of 0")
+    signs = np.where(rationals < 0, -1, 1)
+    rationals = np.abs(rationals)
+    octaves = np.floor(np.log2(rationals))
+    # the steps immediately below the rationals, found in a table of the
+    #   steps within an octave
+    lower_steps = octaves * tet + np.clip(
+        np.searchsorted(
+            _step_intervals(tet), rationals / 2**octaves, side="right"
+        )
+        - 1,
+        0,
+        tet - 1,
+    )
+    upper_intervals = 2 ** ((lower_steps + 1) / tet)
+    comma = 2 ** (1 / (tet * 2))
+    use_upper = (
+        np.maximum(rationals, upper_intervals)
+        / np.minimum(rationals, upper_intervals)
+    ) < comma
+    return (signs * (lower_steps + use_upper)).astype(int)
+
+
 def approximate_just_interval(rational, tet):
     """Approximates given rational in given equal temperament."""
+    return approximate_just_intervals([rational], tet).item()
 
-    if rational < 0:
-        sign = -1
-        rational = -rational
-    else:
-        sign = 1
-    if rational < 1:
-        lower_power_of_two = 0
-        while 2 ** lower_power_of_two > rational:
-            lower_power_of_two -= 1
-        upper_power_of_two = lower_power_of_two + 1
-
-    else:
-        upper_power_of_two = 0
-        while 2 ** upper_power_of_two < rational:
-            upper_power_of_two += 1
-        lower_power_of_two = upper_power_of_two - 1
-
-    lower_power = lower_power_of_two * tet
-    upper_power = upper_power_of_two * tet
 
-    comma = 2 ** (1 / (tet * 2))
+def approximate_12_tet_pitches(pitches, tet):
+    """Approximates 12-tet pitches in the specified temperament.
 
-    while True:
-
-        if upper_power - lower_power == 1:
-            upper_interval = 2 ** (upper_power / tet)
-            if (
-                max(rational, upper_interval) / min(rational, upper_interval)
-            ) < comma:
-                return sign * upper_power
-            return sign * lower_power
-
-        middle = (upper_power + lower_power) // 2
-        middle_interval = 2 ** (middle / tet)
-        if (
-            max(rational, middle_interval) / min(rational, middle_interval)
-        ) < comma:
-            return sign * middle
-
-        if rational > middle_interval:
-            lower_power = middle
-        else:
-            upper_power = middle
+    Returns an array of ints.
+
+    >>> approximate_12_tet_pitches([60, 61, 67], 31)
+    array([155, 158, 173])
+    """
+    octaves, pcs = np.divmod(np.asarray(pitches, dtype=int), 12)
+    return octaves * tet + _12_tet_pc_steps(tet)[pcs]
 
 
 def approximate_12_tet_pitch(pitch, tet):
@@ -139,62 +161,99 @@ def approximate_12_tet_pitch(pitch, tet):
     return new_p
 
 
-def temper_pitch_materials(item, tet, integers_in_12_tet=False):
-    # None values are passed through as is
-    if item is None:
-        return None
+def _is_iterable(item):
     try:
         iter(item)
-        iterable = True
     except TypeError:
-        iterable = False
-    if iterable:
-        out = []
-        for sub_item in item:
-            sub_item = temper_pitch_materials(
-                sub_item, tet, integers_in_12_tet=integers_in_12_tet
-            )
-            out.append(sub_item)
-        return out
+        return False
+    return True
 
-    if isinstance(item, int):
-        if integers_in_12_tet:
-            pitch = approximate_12_tet_pitch(item, tet)
-        else:
-            pitch = item
-        return pitch
 
-    new_pitch = approximate_just_interval(item, tet=tet)
-    return new_pitch
+def _copy_nested(item, slots):
+    """Returns a copy of the nested pitch materials `item` in which the
+    iterables are lists.
 
+    Appends a (list, index) pair to `slots` for each item of the copy that
+    isn't an iterable or None.
+    """
+    out = []
+    for i, sub_item in enumerate(item):
+        if sub_item is not None:
+            try:
+                iter(sub_item)
+            except TypeError:
+                slots.append((out, i))
+            else:
+                sub_item = _copy_nested(sub_item, slots)
+        out.append(sub_item)
+    return out
 
-def temper_pitch_materials_in_place(item, tet, integers_in_12_tet=False):
-    try:
-        iter(item)
-        iterable = True
-    except TypeError:
-        iterable = False
-    if iterable:
-        if not isinstance(item, list):
-            raise TypeError(
-                "All iterables passed to "
-                "temper_pitch_materials_in_place must be lists."
+
+def temper_pitch_materials(item, tet, integers_in_12_tet=False):
+    """Tempers nested pitch materials.
+
+    Integers are pitches, which are approximated in the temperament if
+    `integers_in_12_tet` is True and otherwise passed through as is; other
+    numbers are just intervals (see approximate_just_interval()). None values
+    are passed through as is. Iterables are returned as lists.
+
+    The pitches and intervals are tempered all together, as arrays.
+
+    >>> temper_pitch_materials([(60, 3 / 2), [None, 5 / 4]], 31, True)
+    [[155, 18], [None, 10]]
+    """
+    if item is None:
+        return None
+    if not _is_iterable(item):
+        return temper_pitch_materials(
+            [item], tet, integers_in_12_tet=integers_in_12_tet
+        )[0]
+    slots = []
+    out = _copy_nested(item, slots)
+    pitch_slots = []
+    interval_slots = []
+    for slot in slots:
+        sub_list, i = slot
+        if isinstance(sub_list[i], int):
+            pitch_slots.append(slot)
+        else:
+            interval_slots.append(slot)
+    tempered = []
+    if integers_in_12_tet and pitch_slots:
+        tempered.append(
+            (
+                pitch_slots,
+                approximate_12_tet_pitches(
+                    [sub_list[i] for sub_list, i in pitch_slots], tet
+                ),
             )
-        copy_of_item = item.copy()
-        item.clear()
-        for sub_item in copy_of_item:
-            sub_item = temper_pitch_materials(
-                sub_item, tet, integers_in_12_tet=integers_in_12_tet
+        )
+    if interval_slots:
+        tempered.append(
+            (
+                interval_slots,
+                approximate_just_intervals(
+                    [sub_list[i] for sub_list, i in interval_slots], tet
+                ),
             )
-            item.append(sub_item)
-        return None
+        )
+    for kind_slots, vals in tempered:
+        for (sub_list, i), val in zip(kind_slots, vals.tolist()):
+            sub_list[i] = val
+    return out
 
-    if isinstance(item, int):
-        if integers_in_12_tet:
-            pitch = approximate_12_tet_pitch(item, tet)
-        else:
-            pitch = item
-        return pitch
 
-    new_pitch = approximate_just_interval(item, tet=tet)
-    return new_pitch
+def temper_pitch_materials_in_place(item, tet, integers_in_12_tet=False):
+    if not _is_iterable(item):
+        return temper_pitch_materials(
+            item, tet, integers_in_12_tet=integers_in_12_tet
+        )
+    if not isinstance(item, list):
+        raise TypeError(
+            "All iterables passed to "
+            "temper_pitch_materials_in_place must be lists."
+        )
+    item[:] = temper_pitch_materials(
+        item, tet, integers_in_12_tet=integers_in_12_tet
+    )
+    return None
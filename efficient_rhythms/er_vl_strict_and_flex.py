@@ -8,7 +8,7 @@ def _get_htimes_end_i(rhythm, htimes, vl_item_end_i):
     return vl_item_end_i
 
 
-def flex_vl_loop(er, score, voice_lead_error, voice, vl_item):
+def flex_vl_loop(er, score, voice_lead_error, voice, vl_item, rng=None):
     er.check_time()
     rhythm = er.rhythms[vl_item.voice_i]
     new_notes = er_classes.Voice()
@@ -47,7 +47,7 @@ def flex_vl_loop(er, score, voice_lead_error, voice, vl_item):
                 er, prev_htimes.i, new_htimes.i
             )
             voice_leading = voice_leader()
-            prev_pc_scale = er.get(prev_htimes.i, "pc_scales")
+            prev_pc_scale = er.harmony[prev_htimes.i].pc_scale
             update_voice_leadings = False
 
         while True:
@@ -65,6 +65,7 @@ def flex_vl_loop(er, score, voice_lead_error, voice, vl_item):
                 voice_leading,
                 new_notes,
                 voice_lead_error,
+                rng=rng,
             )
             if new_note:
                 new_notes.add_note(new_note)
@@ -83,12 +84,14 @@ def flex_vl_loop(er, score, voice_lead_error, voice, vl_item):
     return new_notes
 
 
-def voice_lead_pattern_flexibly(er, score, vl_error, pattern_vl_i=0):
+def voice_lead_pattern_flexibly(er, score, vl_error, pattern_vl_i=0, rng=None):
     """This voice-leading algorithm will change voice-leading in
     the middle of a pattern if it runs into a problem.
-    """
 
-    vl_error.status()
+    Keyword args:
+        rng: the NumPy Generator used to break ties when measuring melodic
+            intervals. If None, the global generator is used.
+    """
 
     try:
         vl_item = er.pattern_vl_order[pattern_vl_i]
@@ -98,16 +101,18 @@ def voice_lead_pattern_flexibly(er, score, vl_error, pattern_vl_i=0):
         return True
 
     voice = score.voices[vl_item.voice_i]
-    new_notes = flex_vl_loop(er, score, vl_error, voice, vl_item)
+    new_notes = flex_vl_loop(er, score, vl_error, voice, vl_item, rng=rng)
     if new_notes is None:
         return False
 
     if er.allow_strict_voice_leading and voice_lead_pattern_strictly(
-        er, score, vl_error, pattern_vl_i=pattern_vl_i + 1
+        er, score, vl_error, pattern_vl_i=pattern_vl_i + 1, rng=rng
     ):
         return True
 
-    if voice_lead_pattern_flexibly(er, score, vl_error, pattern_vl_i=pattern_vl_i + 1):
+    if voice_lead_pattern_flexibly(
+        er, score, vl_error, pattern_vl_i=pattern_vl_i + 1, rng=rng
+    ):
         return True
 
     for note in new_notes:
@@ -116,7 +121,9 @@ def voice_lead_pattern_flexibly(er, score, vl_error, pattern_vl_i=0):
     return False
 
 
-def strict_voice_leading_loop(er, score, voice_lead_error, voice, vl_item):
+def strict_voice_leading_loop(
+    er, score, voice_lead_error, voice, vl_item, rng=None
+):
     er.check_time()
     rhythm = er.rhythms[vl_item.voice_i]
     new_notes = er_classes.Voice()
@@ -133,7 +140,7 @@ def strict_voice_leading_loop(er, score, voice_lead_error, voice, vl_item):
 
     voice_leader = er_voice_leadings.VoiceLeader(er, prev_htimes.i, new_htimes.i)
     voice_leading = voice_leader()
-    prev_pc_scale = er.get(prev_htimes.i, "pc_scales")
+    prev_pc_scale = er.harmony[prev_htimes.i].pc_scale
 
     while True:
         # This loop attempts to apply each voice leading in turn on the
@@ -170,6 +177,7 @@ def strict_voice_leading_loop(er, score, voice_lead_error, voice, vl_item):
                 voice_leading,
                 new_sub_notes,
                 voice_lead_error,
+                rng=rng,
             )
             if new_note:
                 new_sub_notes.add_note(new_note)
@@ -214,15 +222,13 @@ def strict_voice_leading_loop(er, score, voice_lead_error, voice, vl_item):
                 er, prev_htimes.i, new_htimes.i
             )
             voice_leading = voice_leader()
-            prev_pc_scale = er.get(prev_htimes.i, "pc_scales")
+            prev_pc_scale = er.harmony[prev_htimes.i].pc_scale
 
     voice.append(new_notes)
     return new_notes
 
 
-def voice_lead_pattern_strictly(er, score, vl_error, pattern_vl_i=0):
-    vl_error.status()
-
+def voice_lead_pattern_strictly(er, score, vl_error, pattern_vl_i=0, rng=None):
     try:
         vl_item = er.pattern_vl_order[pattern_vl_i]
     except IndexError:
@@ -240,15 +246,19 @@ def voice_lead_pattern_strictly(er, score, vl_error, pattern_vl_i=0):
     # because we reuse them on re-generating the rhythm, after which the vl_item
     # may no longer be empty.)
     if voice and vl_item:
-        new_notes = strict_voice_leading_loop(er, score, vl_error, voice, vl_item)
+        new_notes = strict_voice_leading_loop(
+            er, score, vl_error, voice, vl_item, rng=rng
+        )
         if new_notes is None:
             return False
 
-    if voice_lead_pattern_strictly(er, score, vl_error, pattern_vl_i=pattern_vl_i + 1):
+    if voice_lead_pattern_strictly(
+        er, score, vl_error, pattern_vl_i=pattern_vl_i + 1, rng=rng
+    ):
         return True
 
     if er.allow_flexible_voice_leading and voice_lead_pattern_flexibly(
-        er, score, vl_error, pattern_vl_i=pattern_vl_i + 1
+        er, score, vl_error, pattern_vl_i=pattern_vl_i + 1, rng=rng
     ):
         return True
 
@@ -235,16 +235,13 @@ class VoiceLeader:
         self.src_harmony_i = src_harmony_i
         self.dest_harmony_i = dest_harmony_i
 
-        self.src_pc_scale, self.src_pc_chord = er.get(
-            src_harmony_i, "pc_scales", "pc_chords"
-        )
-        self.dest_pc_scale, self.dest_pc_chord = er.get(
-            dest_harmony_i, "pc_scales", "pc_chords"
-        )
-        self.scale_foots = (
-            er.get(src_harmony_i, "foot_pcs"),
-            er.get(dest_harmony_i, "foot_pcs"),
-        )
+        src_harmony = er.harmony[src_harmony_i]
+        dest_harmony = er.harmony[dest_harmony_i]
+        self.src_pc_scale = src_harmony.pc_scale
+        self.src_pc_chord = src_harmony.pc_chord
+        self.dest_pc_scale = dest_harmony.pc_scale
+        self.dest_pc_chord = dest_harmony.pc_chord
+        self.scale_foots = (src_harmony.foot_pc, dest_harmony.foot_pc)
         self.parallel_voice_leading = er.parallel_voice_leading
         if self.parallel_voice_leading:
             self.parallel_str = er.parallel_direction
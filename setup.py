@@ -3,5 +3,5 @@ from setuptools import find_packages, setup
 setup(
     name="efficient_rhythms",
     version="0.0.0",
-    packages=find_packages(),
+    packages=find_packages(exclude=["benchmarks", "benchmarks.*"]),
 )
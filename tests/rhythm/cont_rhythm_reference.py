@@ -0,0 +1,110 @@
+"""A reference implementation of ContRhythmBase.generate() for tests and
+benchmarks.
+"""
+# pylint: disable=protected-access
+
+import numpy as np
+
+from efficient_rhythms.er_rhythm import utils
+
+
+def generate_iteratively(cr, rng=None):
+    """Generates the variations of `cr` (a ContRhythm) one row at a time.
+
+    This was the implementation of ContRhythmBase.generate() before it was
+    batched.
+    """
+    cr.rng = rng
+    cr._init_contents()
+    deltas = None
+    for i in range(1, cr.num_vars):
+        if cr.var_palindrome and i > cr.num_vars / 2:
+            j = cr._get_palindromic_index(i)
+            cr._fill_palindrome(j, i)
+        else:
+            if not cr.vary_consistently or i == 1:
+                deltas = get_onset_deltas(cr)
+            vary_onsets(cr, i, deltas)
+            cr._get_iois(i)
+            fill_durs(cr, i)
+    cr._set_contents_from_2d()
+
+
+def get_onset_deltas(cr):
+    # maybe try the effect of a normal distribution as well?
+    deltas = cr._rng.random(size=cr.num_notes, dtype=cr.dtype) - 1
+    deltas = deltas / deltas.sum() * cr._int_increment
+    return deltas.astype(dtype=np.int64)
+
+
+def vary_onsets(cr, i, deltas):
+    # We assume that we will always vary the rhythm iteratively (so A
+    # becomes B and B becomes C, and so on, and we never go back to A),
+    # so we don't have to keep previous values of unspaced around
+    cr._unspaced = cr._unspaced + deltas
+    # stable sort = timsort
+    cr._unspaced.sort(kind="stable")
+    # I guess doing this biases the output a little. LONGTERM think about
+    # a better way of always starting from zero.
+    cr._unspaced[0] = 0
+    # The following lines are a bit of a hack. We don't constrain the final
+    # onset from growing larger, so it can get too close to the first onset
+    # (on looping around). To avoid this, when necessary, we divide all
+    # the onsets as follows.
+    if cr._unspaced[-1] > cr._rand_int_u_bound:
+        cr._unspaced = (
+            cr._unspaced * (cr._rand_int_u_bound / cr._unspaced[-1])
+        ).astype(np.int64)
+    spaced = cr._space_ints(cr._unspaced)
+    cr._onsets_2d[i] = cr._ints_to_onsets(spaced)
+
+
+def fill_durs(cr, i):
+    prev_durs = cr._durs_2d[i - 1]
+    cr._durs_2d[i] = prev_durs.copy()
+    current_durs = cr._durs_2d[i]
+    onsets = cr._onsets_2d[i]
+    if cr._free_dur_density <= 0:
+        # In this case there is nothing to do, because the onsets cannot be
+        # moved closer than min_dur in any case.
+        return
+
+    if cr.dur_density == 1:
+        cr._durs_2d[i] = cr._iois[i]
+        return
+    assert (
+        cr._iois[i].sum() + (0 if cr.overlap else onsets[0]) - cr.rhythm_len
+        < 1e-10
+    )
+    ioi_deltas = cr._iois[i] - cr._iois[i - 1]
+    neg_deltas = np.where(ioi_deltas < 0, ioi_deltas, 0)
+    current_durs += neg_deltas
+    too_short = current_durs < cr.min_dur
+    add_back = cr.min_dur - current_durs[too_short]
+    neg_deltas[too_short] += add_back
+    current_durs[too_short] = cr.min_dur
+
+    # The first onset is presently fixed at zero, so this works.
+    #   Otherwise, we would need to get the first onset of the next
+    #   repetition already.
+
+    wraparound = current_durs[-1] + onsets[-1] - cr.rhythm_len
+    if wraparound > 0:
+        current_durs[-1] -= wraparound
+        neg_deltas[-1] -= wraparound
+    assert (
+        abs(current_durs.sum() - neg_deltas.sum()) - prev_durs.sum() <= 1e-10
+    )
+    releases = onsets + current_durs
+    rois = utils.get_rois(onsets, releases, cr.rhythm_len, cr.overlap)
+    assert (
+        current_durs.sum()
+        + rois.sum()
+        + (0 if cr.overlap else onsets[0])
+        - cr.rhythm_len
+        < 1e-10
+    )
+    assert np.all(np.abs(current_durs + rois - cr._iois[i]) < 1e-10)
+    missing_density = (-neg_deltas.sum()) / rois.sum()
+    current_durs += cr._fill_durs_from_iois(rois, missing_density)
+    assert np.all(current_durs - cr._iois[i] < 1e-10)
@@ -6,6 +6,7 @@ from efficient_rhythms import er_settings
 from efficient_rhythms import er_rhythm
 
 from tests.fixtures import set_seed  # pylint: disable=unused-import
+from tests.rhythm.cont_rhythm_reference import generate_iteratively
 
 
 def _get_cont_base(
@@ -132,11 +133,11 @@ def test_get_continuous_onsets(
             onsets = cr._onsets_2d[0]
             _verify_onsets(onsets, cr.num_notes, cr.rhythm_len, cr.min_dur)
 
-            # test _vary_onsets_unif()
-            if cr.full:
+            # test _vary_onsets_batched()
+            if cr.full or cr.num_vars == 1:
                 continue
+            cr._vary_onsets_batched(cr.num_vars - 1)
             for i in range(1, cr.num_vars):
-                cr._vary_onsets_unif(i)
                 new_onsets = cr._onsets_2d[i]
                 _verify_onsets(
                     new_onsets, cr.num_notes, cr.rhythm_len, cr.min_dur
@@ -234,6 +235,115 @@ def test_palindrome(
             assert np.all(cr._durs_2d[i] == cr._durs_2d[j])
 
 
+def test_batched_generate(
+    set_seed,
+):  # pylint: disable=unused-argument, redefined-outer-name
+    # generate() computes the variations in batches; we check that its output
+    # has the same properties as generate_iteratively(), the reference
+    # implementation that computes them one at a time.
+    def _mean_change(cr):
+        return np.abs(np.diff(cr._onsets_2d, axis=0)).mean() - cr.rhythm_len
+
+    densities = [0.2, 0.5, 0.8, 1.0]
+    non_defaults = (
+        ("increment", 0.5),
+        ("increment", 2.0),
+        ("overlap", False),
+        ("vary_consistently", False),
+        ("var_palindrome", False),
+    )
+    for kw, val in non_defaults:
+        for density in densities:
+            kwargs = {kw: val, "dur_density": density, "num_vars": 64}
+            batched = _get_cont_rhythm(**kwargs)
+            batched.generate()
+            iterative = _get_cont_rhythm(**kwargs)
+            generate_iteratively(iterative)
+            for i in range(batched.num_vars):
+                _verify_onsets(
+                    batched._onsets_2d[i],
+                    batched.num_notes,
+                    batched.rhythm_len,
+                    batched.min_dur,
+                    start_offset=i * batched.rhythm_len,
+                )
+                _verify_durs(
+                    batched._onsets_2d[i],
+                    batched._durs_2d[i],
+                    batched.dur_density,
+                    batched.min_dur,
+                    batched.rhythm_len,
+                    1,
+                    batched.overlap,
+                    error_tolerance=0.01,
+                )
+            if not batched.var_palindrome:
+                assert (
+                    abs(_mean_change(batched) - _mean_change(iterative))
+                    < batched.increment / batched.num_notes
+                )
+
+
+def test_batched_onsets():
+    # When the rhythm varies consistently, generate() and
+    # generate_iteratively() draw the same random values for the onsets, so
+    # the onsets should be the same, even when onsets overtake one another
+    # and have to be re-sorted, or have to be rescaled.
+    for increment in (0.1, 0.5, 2.0, 8.0):
+        for seed in range(20):
+            kwargs = {
+                "increment": increment,
+                "num_vars": 64,
+                "var_palindrome": False,
+            }
+            batched = _get_cont_rhythm(**kwargs)
+            batched.generate(np.random.default_rng(seed))
+            iterative = _get_cont_rhythm(**kwargs)
+            generate_iteratively(iterative, np.random.default_rng(seed))
+            assert np.allclose(batched._onsets_2d, iterative._onsets_2d)
+
+
+def test_batched_durs_distribution():
+    # generate() and generate_iteratively() redistribute the missing duration
+    # on each row with different random draws, so we compare the
+    # distributions of their durations over many seeds.
+    def _stats(generate, **kwargs):
+        durs = []
+        residuals = []
+        for seed in range(100):
+            cr = _get_cont_rhythm(num_vars=16, var_palindrome=False, **kwargs)
+            generate(cr, np.random.default_rng(seed))
+            durs.append(cr._durs_2d.ravel())
+            # How much each roi departs from the share of the missing
+            # duration that is proportional to its size
+            rois = cr._iois - cr._durs_2d
+            growth = np.maximum(np.diff(cr._iois, axis=0), 0)
+            grown = np.minimum(rois[:-1] + growth, cr._iois[1:] - cr.min_dur)
+            totals = rois[1:].sum(axis=1, keepdims=True)
+            expected = grown * totals / grown.sum(axis=1, keepdims=True)
+            residuals.append(((rois[1:] - expected) / totals).ravel())
+        quantiles = np.quantile(
+            np.concatenate(durs), [0.1, 0.25, 0.5, 0.75, 0.9]
+        )
+        return quantiles, np.concatenate(residuals).std()
+
+    non_defaults = (
+        {},
+        {"increment": 0.5},
+        {"increment": 2.0, "dur_density": 0.8},
+        {"increment": 1.0, "dur_density": 0.3, "vary_consistently": False},
+    )
+    for kwargs in non_defaults:
+        batched_quantiles, batched_std = _stats(
+            er_rhythm.cont_rhythm.ContRhythm.generate, **kwargs
+        )
+        iterative_quantiles, iterative_std = _stats(
+            generate_iteratively, **kwargs
+        )
+        assert np.allclose(batched_quantiles, iterative_quantiles, atol=0.02)
+        assert 0.67 < batched_std / iterative_std < 1.5
+
+
 def test_grid(
     set_seed,
 ):  # pylint: disable=unused-argument, redefined-outer-name
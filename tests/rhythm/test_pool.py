@@ -0,0 +1,78 @@
+from efficient_rhythms import er_misc_funcs
+from efficient_rhythms import er_settings
+from efficient_rhythms import er_rhythm
+
+from tests.fixtures import set_seed  # pylint: disable=unused-import
+
+
+def test_rhythm_pool(
+    set_seed,
+):  # pylint: disable=unused-argument, redefined-outer-name
+    settingsdict = {
+        "num_voices": 3,
+        "rhythm_pool_size": 4,
+        "pattern_len": [2, 3, 4],
+    }
+    er = er_settings.get_settings(settingsdict, silent=True)
+    pool = er_rhythm.RhythmPool(er)
+    assert len(pool) == 4
+    drawn = set()
+    for _ in range(20):
+        rhythm_set = pool.draw()
+        drawn.add(id(rhythm_set))
+        assert er.rhythms is rhythm_set.rhythms  # pylint: disable=no-member
+        assert (
+            er.initial_pattern_order  # pylint: disable=no-member
+            is rhythm_set.onset_order
+        )
+        for item in er.pattern_vl_order:
+            rhythm = er.rhythms[item.voice_i]  # pylint: disable=no-member
+            assert item.start_time <= rhythm.at_or_after(item.start_i)[0]
+        # Only the first rhythm set ever succeeds, so it should come to
+        # dominate the draws
+        pool.record(success=rhythm_set is pool._sets[0])
+    assert len(drawn) > 1
+    counts = {id(rhythm_set): 0 for rhythm_set in pool._sets}
+    for _ in range(100):
+        counts[id(pool.draw())] += 1
+    assert counts[id(pool._sets[0])] > 50
+
+    settingsdict["rhythm_pool_size"] = 0
+    er = er_settings.get_settings(settingsdict, silent=True)
+    pool = er_rhythm.RhythmPool(er)
+    assert len(pool) == 0
+    assert pool.draw() is not pool.draw()
+
+
+def test_rhythm_pool_replaces_failing_sets(
+    set_seed,
+):  # pylint: disable=unused-argument, redefined-outer-name
+    settingsdict = {"num_voices": 2, "rhythm_pool_size": 3}
+    er = er_settings.get_settings(settingsdict, silent=True)
+    pool = er_rhythm.RhythmPool(er, max_failures=3)
+    initial_sets = list(pool._sets)
+    succeeding_set = initial_sets[0]
+    for _ in range(50):
+        rhythm_set = pool.draw()
+        pool.record(success=rhythm_set is succeeding_set)
+    assert len(pool) == 3
+    assert succeeding_set in pool._sets
+    # The other initial sets only ever failed, so they should have been
+    # replaced
+    assert not any(rhythm_set in pool._sets for rhythm_set in initial_sets[1:])
+    for rhythm_set in pool._sets:
+        assert rhythm_set.failures + 1 < 3 * (rhythm_set.successes + 1)
+    # Replacing a rhythm set doesn't change the current rhythms
+    rhythm_set = pool.draw()
+    while rhythm_set in pool._sets:
+        pool.record(success=False)
+    assert er.rhythms is rhythm_set.rhythms  # pylint: disable=no-member
+    rhythm_set = pool.draw()
+    assert er.rhythms is rhythm_set.rhythms  # pylint: disable=no-member
+
+
+if __name__ == "__main__":
+    er_misc_funcs.set_seed(0, print_out=False)
+    test_rhythm_pool(None)
+    er_misc_funcs.set_seed(0, print_out=False)
+    test_rhythm_pool_replaces_failing_sets(None)
@@ -1,11 +1,15 @@
 from fractions import Fraction
+import random
 import warnings
 
 import numpy as np
 
+from efficient_rhythms import er_misc_funcs
 from efficient_rhythms import er_settings
 from efficient_rhythms import er_rhythm
 
+from tests.fixtures import set_seed  # pylint: disable=unused-import
+
 
 def test_pad_truncations():
     # data = {
@@ -30,8 +34,8 @@ def test_pad_truncations():
         rhythm = er_rhythm.rhythm.Rhythm.from_er_settings(
             er, k, initial_onsets, initial_durs
         )
-        assert len(onsets) == len(rhythm._data)
-        for i, j in zip(onsets, rhythm._data):
+        assert len(onsets) == len(rhythm)
+        for i, j in zip(onsets, rhythm.onsets):
             assert i == j
 
     # data = {
@@ -102,8 +106,8 @@ def test_pad_truncations():
         rhythm = er_rhythm.rhythm.Rhythm.from_er_settings(
             er, k, initial_onsets, initial_durs
         )
-        assert len(onsets) == len(rhythm._data)
-        for i, j in zip(onsets, rhythm._data):
+        assert len(onsets) == len(rhythm)
+        for i, j in zip(onsets, rhythm.onsets):
             assert i == j
 
 
@@ -158,6 +162,35 @@ def test_update_pattern_vl_order():
                 voice_is[voice_i] = item.end_i
 
 
+def test_get_onset_order():
+    settingsdict = {
+        "num_voices": 4,
+        "pattern_len": [2, 3, 4, 4],
+        "rhythm_len": [1, 1.5, 2, 4],
+        "voice_order_str": "reverse",
+        "onset_density": 0.75,
+    }
+    er = er_settings.get_settings(settingsdict, silent=True)
+    er_rhythm.init_rhythms(er)
+    er_rhythm.rhythms_handler(er)
+    onset_order = er_rhythm.get_onset_order(er)
+    voice_ranks = {voice_i: i for i, voice_i in enumerate(er.voice_order)}
+    expected = sorted(
+        (
+            (onset, voice_ranks[voice_i], voice_i)
+            for voice_i, rhythm in enumerate(er.rhythms)
+            for onset in rhythm.onsets_between(0, er.pattern_len[voice_i])
+        ),
+    )
+    assert len(onset_order) == len(expected)
+    for (voice_i, onset), (expected_onset, _, expected_voice_i) in zip(
+        onset_order, expected
+    ):
+        assert isinstance(onset, Fraction)
+        assert voice_i == expected_voice_i
+        assert onset == expected_onset
+
+
 def test_get_i():
     # settingsdict = {
     #     "num_voices": 2,
@@ -237,6 +270,20 @@ def test_get_i():
         assert at_or_before in (before, at_or_after)
         assert at_or_after in (after, at_or_before)
         assert rhythm.get_onset_and_dur(at_or_after) == rhythm.at_or_after(time)
+    for onset, dur in rhythm:
+        for time in (
+            onset,
+            onset + rhythm.total_dur,
+            float(onset) + 1e-10,
+            float(onset) - 1e-10 + 2 * rhythm.total_dur,
+        ):
+            assert rhythm[time] == dur
+        try:
+            rhythm[onset + Fraction(1, 16)]
+        except KeyError:
+            pass
+        else:
+            assert False
 
 
 def test_onset_positions():
@@ -441,6 +488,82 @@ def test_new_durs():
         )
 
 
+def _loop_durs_handler(er, voice_i, durs, within):
+    # The previous implementation of er_rhythm.make._durs_handler(), which
+    # made increments one at a time; kept as a reference
+    dur_subdivision = er.dur_subdivision[voice_i]
+    remaining = within - durs
+    total_remaining = (
+        er.dur_density[voice_i] * er.rhythm_len[voice_i] - durs.sum()
+    )
+    available_durs = {i: r for (i, r) in enumerate(remaining) if within[i] != r}
+    available_indices = list(available_durs)
+    n_indices = len(available_indices)
+    stopping_threshold = dur_subdivision / 2
+    while total_remaining > stopping_threshold and n_indices:
+        j = random.randrange(n_indices)
+        i = available_indices[j]
+        r = available_durs[i]
+        if r <= dur_subdivision:
+            increment = r
+            n_indices -= 1
+            if j != n_indices:
+                available_indices[j], available_indices[n_indices] = (
+                    available_indices[n_indices],
+                    available_indices[j],
+                )
+        else:
+            increment = dur_subdivision
+            available_durs[i] -= increment
+        durs[i] += increment
+        total_remaining -= increment
+    return total_remaining <= stopping_threshold
+
+
+def test_durs_handler(
+    set_seed,
+):  # pylint: disable=unused-argument, redefined-outer-name
+    n_trials = 2000
+    basesettings = {
+        "num_voices": 1,
+        "pattern_len": 4,
+        "min_dur": 0.25,
+        "dur_subdivision": 0.25,
+    }
+    # the last ioi is not a multiple of dur_subdivision, so it can receive a
+    # smaller increment
+    iois = np.array((0.25, 0.5, 1.0, 0.75, 1.1, 0.4))
+
+    def _trials(er, durs_handler):
+        all_durs = np.empty((n_trials, len(iois)))
+        done = np.empty(n_trials, dtype=bool)
+        for trial_i in range(n_trials):
+            durs = np.minimum(iois, er.min_dur[0])
+            done[trial_i] = durs_handler(er, 0, durs, iois)
+            all_durs[trial_i] = durs
+        assert np.all(all_durs <= iois + 1e-10)
+        return all_durs, done
+
+    for density in (0.3, 0.6, 0.9, 1.0):
+        basesettings["dur_density"] = density
+        er = er_settings.get_settings(basesettings, silent=True)
+        new_durs, new_done = _trials(er, er_rhythm.make._durs_handler)
+        old_durs, old_done = _trials(er, _loop_durs_handler)
+        assert np.all(new_done == old_done)
+        new_totals, old_totals = new_durs.sum(axis=1), old_durs.sum(axis=1)
+        assert abs(new_totals.mean() - old_totals.mean()) < 0.02
+        for stat in (np.mean, np.std):
+            assert np.all(
+                np.abs(stat(new_durs, axis=0) - stat(old_durs, axis=0)) < 0.03
+            )
+        # compare the distribution of the number of increments each note
+        #   receives
+        for note_i in range(len(iois)):
+            new_hist = np.histogram(new_durs[:, note_i], bins=8, range=(0, 1.2))
+            old_hist = np.histogram(old_durs[:, note_i], bins=8, range=(0, 1.2))
+            assert np.all(np.abs(new_hist[0] - old_hist[0]) < n_trials * 0.05)
+
+
 def test_hocketing_indices():
     basesettings = {
         "num_voices": 3,
@@ -743,10 +866,13 @@ if __name__ == "__main__":
     test_update_pattern_vl_order()
     # test_fill_onset_durs()
     # test_get_onset_and_dur()
+    test_get_onset_order()
     test_new_onsets()
     test_new_comma()
     test_new_iois()
     test_new_durs()
+    er_misc_funcs.set_seed(0, print_out=False)
+    test_durs_handler(None)
     # test_new_fit_rhythm_to_pattern()
     test_hocketing_indices()
     test_quasi_unison_constrained_indices()
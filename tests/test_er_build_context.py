@@ -0,0 +1,87 @@
+import concurrent.futures
+import os
+
+from efficient_rhythms import (
+    er_build_context,
+    er_exceptions,
+    er_make_handler,
+    er_midi,
+    er_settings,
+)
+
+PER_BUILD_ATTRS = (
+    "rhythms",
+    "grid",
+    "initial_pattern_order",
+    "bass_foot_times",
+    "track_dict",
+    "note_counter",
+    "pattern_vl_order",
+)
+
+
+def _notes(super_pattern):
+    return [
+        (note.voice, note.pitch, note.onset, note.dur)
+        for voice in super_pattern
+        for note in voice
+    ]
+
+
+def test_concurrent_builds(tmp_path):
+    for settings in (
+        {"num_voices": 3, "seed": 3},
+        {"num_voices": 4, "seed": 5, "cont_rhythms": "grid"},
+        {"num_voices": 3, "seed": 5, "cont_rhythms": "all"},
+    ):
+        er = er_settings.get_settings(settings, silent=True)
+        serial = _notes(er_make_handler.make_super_pattern(er, debug=False))
+
+        def _build_and_write(i, er=er):
+            super_pattern = er_make_handler.make_super_pattern(er, debug=False)
+            path = os.path.join(tmp_path, f"{i}.mid")
+            er_midi.write_er_midi(er, super_pattern, path)
+            with open(path, "rb") as inf:
+                return _notes(super_pattern), inf.read()
+
+        with concurrent.futures.ThreadPoolExecutor(4) as executor:
+            results = list(executor.map(_build_and_write, range(8)))
+        for notes, midi_bytes in results:
+            assert notes == serial
+            assert midi_bytes == results[0][1]
+        for attr in PER_BUILD_ATTRS:
+            assert attr not in vars(er)
+
+
+def test_build_context():
+    er = er_settings.get_settings({"num_voices": 2, "seed": 0}, silent=True)
+    context = er_build_context.BuildContext(er)
+    assert context.num_voices == er.num_voices
+    assert er_build_context.build_context(context) is context
+    context.pattern_len = [1, 1]
+    assert context.get(0, "pattern_len") == 1
+    assert er.pattern_len != context.pattern_len
+    # a deadline on one context doesn't affect other builds
+    context.set_deadline(0)
+    other = er_build_context.BuildContext(er)
+    for _ in range(er_settings.settings_base.TIME_CHECK_INTERVAL):
+        other.check_time()
+    try:
+        for _ in range(er_settings.settings_base.TIME_CHECK_INTERVAL):
+            context.check_time()
+    except er_exceptions.ErTimeoutError:
+        pass
+    else:
+        raise AssertionError("There should have been a timeout")
+    # staticmethods of the settings aren't bound to the context
+    # pylint: disable=protected-access
+    get_followers = context._get_rhythmic_unison_followers
+    assert get_followers([(0, 1)]) == {1: 0}
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        test_concurrent_builds(tmp_dir)
+    test_build_context()
@@ -0,0 +1,184 @@
+from efficient_rhythms import er_changers, er_make, er_rng, er_settings
+
+SETTINGS = {
+    "num_voices": 3,
+    "num_harmonies": 4,
+    "harmony_len": 2,
+    "pattern_len": 4,
+    "seed": 7,
+}
+
+
+def _notes(score):
+    return [
+        [(note.pitch, note.onset, note.dur, note.velocity) for note in voice]
+        for voice in score
+    ]
+
+
+def test_changer_cache():
+    er = er_settings.get_settings(SETTINGS, silent=True)
+    score = er_make.make_super_pattern(er)
+    changers = {
+        0: er_changers.VelocityTransformer(score, humanize=20),
+        1: er_changers.RandomOctaveTransformer(score),
+        2: er_changers.ChangeDurationsTransformer(score),
+    }
+    cache = er_changers.ChangerCache()
+    changed = er_changers.apply(score, changers, seed=er.seed, cache=cache)
+    assert _notes(changed) == _notes(
+        er_changers.apply(score, changers, seed=er.seed)
+    )
+
+    applied = []
+
+    def _record_applied(changer):
+        prepare = changer.prepare
+
+        def _prepare(score, rng=None):
+            applied.append(changer)
+            prepare(score, rng=rng)
+
+        changer.prepare = _prepare
+
+    for changer in changers.values():
+        _record_applied(changer)
+    # Nothing has changed
+    assert _notes(
+        er_changers.apply(score, changers, seed=er.seed, cache=cache)
+    ) == _notes(changed)
+    assert not applied
+
+    # Only the changers from the adjusted one onward are applied again
+    changers[2].scale_by = [2.0]
+    changed = er_changers.apply(score, changers, seed=er.seed, cache=cache)
+    assert applied == [changers[2]]
+    applied.clear()
+    assert _notes(changed) == _notes(
+        er_changers.apply(score, changers, seed=er.seed)
+    )
+    assert applied == list(changers.values())
+
+    # The first two changers are fused, so there is no cached output of the
+    #   first changer alone
+    applied.clear()
+    changers[1].prob_curve.prob = [1.0]  # pylint: disable=no-member
+    changed = er_changers.apply(score, changers, seed=er.seed, cache=cache)
+    assert applied == list(changers.values())
+    assert _notes(changed) == _notes(
+        er_changers.apply(score, changers, seed=er.seed)
+    )
+
+    # Cached stages aren't used with other seeds
+    applied.clear()
+    er_changers.apply(score, changers, seed=er.seed + 1, cache=cache)
+    assert applied == list(changers.values())
+
+
+def test_fused_changers():
+    er = er_settings.get_settings(SETTINGS, silent=True)
+    score = er_make.make_super_pattern(er)
+
+    def _changers():
+        # Changers that depend on each other (through marked_by and the
+        #   changes to the pitches that InvertTransformer inverts)
+        changers = {
+            0: er_changers.VelocityTransformer(score, prob_curve="AlwaysOn"),
+            1: er_changers.TransposeTransformer(
+                score,
+                transpose=2,
+                start_time=2,
+                end_time=6,
+                voices=[0, 2],
+            ),
+            2: er_changers.ChannelTransformer(
+                score, prob_curve="AlwaysOn", dest_channels=[[3]]
+            ),
+            3: er_changers.InvertTransformer(score, prob_curve="AlwaysOn"),
+            4: er_changers.TransposeTransformer(
+                score, prob_curve="AlwaysOn", transpose=1, voices=[1]
+            ),
+            5: er_changers.RandomOctaveTransformer(
+                score, prob_curve="AlwaysOn", ranges=[(60, 71)]
+            ),
+        }
+        changers[0].scale_by = [0.5]
+        changers[0].humanize = [0]
+        changers[1].marked_by = "Velocity transformer"
+        changers[4].trans_type = "Cumulative"
+        return changers
+
+    fused = er_changers.apply(score, _changers(), seed=er.seed)
+    unfused = er_changers.apply(score, _changers(), seed=er.seed, fuse=False)
+    assert _notes(fused) == _notes(unfused) != _notes(score)
+    assert [[note.choir for note in voice] for voice in fused] == [
+        [3] * len(voice) for voice in score
+    ]
+
+    # Changers that draw random numbers give the same seeded results whether
+    #   they are fused or not
+    changers = {
+        0: er_changers.VelocityTransformer(score, humanize=20),
+        1: er_changers.RandomOctaveTransformer(score),
+        2: er_changers.ForcePitchTransformer(score, force_pitches=[60, 64]),
+    }
+    changers[2].voices = [2, 0]
+    fused = er_changers.apply(score, changers, seed=er.seed)
+    unfused = er_changers.apply(score, changers, seed=er.seed, fuse=False)
+    assert _notes(fused) == _notes(unfused) != _notes(score)
+    assert _notes(fused) != _notes(
+        er_changers.apply(score, changers, seed=er.seed + 1)
+    )
+
+
+def test_batched_draws():
+    er = er_settings.get_settings(SETTINGS, silent=True)
+    score = er_make.make_super_pattern(er)
+
+    def _changers():
+        changers = [
+            er_changers.VelocityTransformer(score),
+            er_changers.VelocityTransformer(score),
+            er_changers.RandomOctaveTransformer(score, avoid_orig_oct=True),
+            er_changers.TransposeTransformer(score, transpose=5),
+            er_changers.TransposeTransformer(score, transpose=7),
+        ]
+        changers[0].humanize = [20]
+        changers[1].func_str = "cosine"
+        changers[3].trans_type = "Cumulative"
+        changers[3].bound = [4]
+        changers[4].trans_type = "Random"
+        changers[4].preserve = [True]
+        return changers
+
+    for changer, other in zip(_changers(), _changers()):
+        changed = score.copy()
+        per_note = score.copy()
+        changer.prepare(changed, rng=er_rng.RNGStreams(er.seed).generator())
+        other.prepare(per_note, rng=er_rng.RNGStreams(er.seed).generator())
+        for voice, other_voice in zip(changed, per_note):
+            changer.change_func(voice, list(voice))
+            if isinstance(other, er_changers.TransposeTransformer):
+                other.change_func(other_voice, list(other_voice))
+            else:
+                # The values drawn in a batch are the same as those drawn
+                #   note by note
+                for note in list(other_voice):
+                    other.change_note(other_voice, note)
+        assert _notes(changed) == _notes(per_note) != _notes(score)
+
+    # Seeded results are reproducible
+    changers = dict(enumerate(_changers()))
+    changed = er_changers.apply(score, changers, seed=er.seed, fuse=False)
+    assert _notes(changed) == _notes(
+        er_changers.apply(score, changers, seed=er.seed, fuse=False)
+    )
+    assert _notes(changed) != _notes(
+        er_changers.apply(score, changers, seed=er.seed + 1, fuse=False)
+    )
+
+
+if __name__ == "__main__":
+    test_changer_cache()
+    test_fused_changers()
+    test_batched_draws()
@@ -0,0 +1,49 @@
+from efficient_rhythms import er_choirs, er_classes, er_settings
+
+
+def _score(er):
+    score = er_classes.Score(num_voices=er.num_voices, tet=er.tet)
+    for voice_i in range(er.num_voices):
+        for onset in range(8):
+            score.add_note(voice_i, 60, onset / 2, 1 / 2)
+            score.add_note(voice_i, 64, onset / 2, 1 / 2)
+    return score
+
+
+def test_assign_choirs():
+    settings = {
+        "num_voices": 2,
+        "seed": 1,
+        "randomly_distribute_between_choirs": True,
+        "choirs": [0, 1, 2],
+        "length_choir_segments": 1,
+    }
+    er = er_settings.get_settings(settings, silent=True)
+    score = _score(er)
+    er_choirs.assign_choirs(er, score)
+    for voice_i, voice in enumerate(score.voices):
+        choir_order = er.choir_order[voice_i]
+        for note in voice:
+            assert note.choir == choir_order[int(note.onset) % len(choir_order)]
+
+    settings["choir_segments_dovetail"] = True
+    er = er_settings.get_settings(settings, silent=True)
+    score = _score(er)
+    er_choirs.assign_choirs(er, score)
+    for voice_i, voice in enumerate(score.voices):
+        choir_order = er.choir_order[voice_i]
+        for onset in range(4):
+            choirs = [note.choir for note in voice[onset]]
+            choir = choir_order[onset % len(choir_order)]
+            prev_choir = choir_order[(onset - 1) % len(choir_order)]
+            if onset == 0 or choir == prev_choir:
+                assert choirs == [choir] * 2
+            else:
+                # the first notes of each segment are doubled in the choir of
+                #   the previous segment
+                assert sorted(choirs) == sorted([choir, prev_choir] * 2)
+            assert [note.choir for note in voice[onset + 0.5]] == [choir] * 2
+
+
+if __name__ == "__main__":
+    test_assign_choirs()
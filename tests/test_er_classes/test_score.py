@@ -1,3 +1,5 @@
+import mido
+
 from efficient_rhythms import er_classes
 from efficient_rhythms import er_settings
 
@@ -237,9 +239,60 @@ def test_between():
     assert not more_onsets
 
 
+def test_copy():
+    existing_score = er_classes.Score(num_voices=1)
+    existing_score.add_note(0, 48, 0, 4)
+    score = er_classes.Score(
+        num_voices=2,
+        harmony_len=[2],
+        total_len=4,
+        existing_score=existing_score,
+    )
+    # voice, pitch, onset, dur
+    notes = [(0, 60, 0, 1), (0, 64, 0, 2), (1, 67, 1, 0.5), (1, 69, 1.5, 0.5)]
+    for (v, p, a, d) in notes:  # pylint: disable=invalid-name
+        score.add_note(v, p, a, d)
+    score.voices[1][1][0].transformations_ = ["Transposer"]
+    score.add_meta_message(mido.MetaMessage("set_tempo", tempo=500000, time=0))
+    copied = score.copy()
+
+    def _notes(score):
+        return [
+            (note.voice, note.pitch, note.onset, note.dur, note.velocity)
+            for voice in score.voices + score.existing_voices
+            for note in voice
+        ]
+
+    assert _notes(copied) == _notes(score)
+    assert copied.voices[1][1][0].transformations_ == ["Transposer"]
+    assert copied.get_harmony_i(3) == 1
+    # existing voices are accessed through both attributes
+    assert copied.voices[3] is copied.existing_voices[0]
+    assert copied.voices[3] is not score.voices[3]
+    # notes are stored in _releases as well as _data
+    assert copied.voices[0].last_release_and_notes[1][0] is copied.voices[0][0][1]
+
+    # modifying the copy doesn't affect the original
+    copied.voices[1][1][0].transformations_.append("Transposer")
+    copied.transpose(2)
+    copied.displace_passage(1)
+    copied.add_note(0, 72, 4, 1)
+    copied.existing_voices[0][0][0].pitch = 36
+    assert _notes(score) == [
+        (0, 60, 0, 1, 96),
+        (0, 64, 0, 2, 96),
+        (1, 67, 1, 0.5, 96),
+        (1, 69, 1.5, 0.5, 96),
+        (0, 48, 0, 4, 96),
+    ]
+    assert score.voices[1][1][0].transformations_ == ["Transposer"]
+    assert score.meta_messages[0].time == 0
+
+
 if __name__ == "__main__":
     test_get_prev_and_last_notes()
     test_get_sounding_pitches()
     test_get_harmony_i()
     test_score_misc_attrs()
     test_generic_transpose()
+    test_copy()
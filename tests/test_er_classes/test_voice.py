@@ -1,4 +1,5 @@
 import copy
+import random
 
 from efficient_rhythms import er_classes
 
@@ -202,7 +203,69 @@ def test_voice():
     assert voice[3.0][0].pitch is None, "voice[3.0][0].pitch is not None"
 
 
+def _note_tuples(voice):
+    return [(note.pitch, note.onset, note.dur) for note in voice]
+
+
+def _release_tuples(voice):
+    releases = voice._releases  # pylint: disable=protected-access
+    return [
+        (release, [(note.pitch, note.onset, note.dur) for note in notes])
+        for release, notes in releases.items()
+    ]
+
+
+def test_bulk_edits():
+    # The bulk edits should give the same results as removing and adding
+    #   notes one at a time
+    rng = random.Random(0)
+    voice = er_classes.Voice()
+    for _ in range(200):
+        voice.add_note(
+            rng.randrange(48, 72),
+            rng.randrange(64) / 4,
+            rng.randrange(1, 8) / 4,
+        )
+    reference = voice.copy()
+
+    def _reference_displace(displacement, start_time, end_time):
+        for note in list(reference.between(start_time, end_time)):
+            reference.remove_note(note)
+            if note.onset + displacement >= 0:
+                note.onset += displacement
+                reference.add_note(note)
+
+    def _reference_repeat(start_time, end_time, repeat_start_time):
+        for note in list(reference.between(start_time, end_time)):
+            repeat_note = note.copy()
+            repeat_note.onset += repeat_start_time - start_time
+            reference.add_note(repeat_note)
+
+    voice.displace_passage(3, 4, 8)
+    _reference_displace(3, 4, 8)
+    voice.repeat_passage(2, 10, 20.5)
+    _reference_repeat(2, 10, 20.5)
+    voice.displace_passage(-2.25, 1)
+    _reference_displace(-2.25, 1, None)
+    passage = voice.remove_passage(5, 12)
+    removed = list(reference.between(5, 12))
+    for note in removed:
+        reference.remove_note(note)
+    voice.transpose(2, start_time=3, end_time=9)
+    for note in reference.between(3, 9):
+        note.pitch += 2
+    assert _note_tuples(voice) == _note_tuples(reference)
+    assert _release_tuples(voice) == _release_tuples(reference)
+    assert [
+        (note.pitch, note.onset, note.dur) for note in removed
+    ] == _note_tuples(passage)
+    assert passage.last_release_and_notes[0] == max(
+        note.onset + note.dur for note in removed
+    )
+
+
 if __name__ == "__main__":
     test_dumb_sorted_list()
     test_get_index()
     test_voice()
+    test_bulk_edits()
@@ -27,5 +27,31 @@ def test_timeout():
     er_make_handler.make_super_pattern(er, debug=False)
 
 
+def test_silent_build(capsys):
+    settingsdict = {"num_voices": 2, "num_harmonies": 2, "seed": 0}
+    er = er_settings.get_settings(settingsdict, silent=True)
+    capsys.readouterr()
+    er_make_handler.make_super_pattern(er, debug=False)
+    assert capsys.readouterr().out == ""
+
+
+def test_check_time():
+    er = er_settings.get_settings({}, silent=True)
+    # Without a deadline, check_time() never raises
+    for _ in range(2 * er_settings.settings_base.TIME_CHECK_INTERVAL):
+        er.check_time()
+    er.set_deadline(0)
+    # The clock is only read once every TIME_CHECK_INTERVAL calls
+    for _ in range(er_settings.settings_base.TIME_CHECK_INTERVAL - 1):
+        er.check_time()
+    try:
+        er.check_time()
+    except er_exceptions.ErTimeoutError:
+        pass
+    else:
+        raise AssertionError("There should have been a timeout")
+
+
 if __name__ == "__main__":
     test_timeout()
+    test_check_time()
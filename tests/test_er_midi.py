@@ -1,4 +1,5 @@
 import itertools
+import os
 
 from efficient_rhythms import er_choirs
 from efficient_rhythms import er_make
@@ -81,6 +82,48 @@ def test_er_midi():
         er_midi.write_er_midi(er, super_pattern, er.output_path, return_mf=True)
 
 
+def test_midi_cache(tmp_path):
+    er = er_settings.get_settings(
+        {"num_voices": 3, "seed": 2, "humanize": True}, silent=True
+    )
+    super_pattern = er_make.make_super_pattern(er)
+    cache = er_midi.MidiCache()
+    path = os.path.join(tmp_path, "cache.mid")
+
+    def _write(cache=None):
+        er_midi.write_er_midi(er, super_pattern, path, cache=cache)
+        with open(path, "rb") as inf:
+            return inf.read()
+
+    added = []
+    add_er_voice = er_midi.add_er_voice
+
+    def _add_er_voice(er, voice_i, *args, **kwargs):
+        added.append(voice_i)
+        return add_er_voice(er, voice_i, *args, **kwargs)
+
+    er_midi.add_er_voice = _add_er_voice
+    try:
+        uncached = _write()
+        assert _write(cache) == uncached
+        added.clear()
+        assert _write(cache) == uncached
+        assert not added
+        # Only the changed voice is converted again (the voices are written
+        #   in reverse order, so voice 0 is the last voice)
+        super_pattern.voices[-1].transpose(12)
+        added.clear()
+        changed = _write(cache)
+        assert added == [0]
+        assert changed == _write()
+    finally:
+        er_midi.add_er_voice = add_er_voice
+
+
 if __name__ == "__main__":
+    import tempfile
+
     test_voices_to_tracks()
     test_er_midi()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        test_midi_cache(tmp_dir)
@@ -462,6 +462,55 @@ def test_get_lowest_of_each_pc_in_set():
     assert lowests[7 % 5] == 2
 
 
+@st.composite
+def scale_and_pitch(draw):
+    scale = sorted(
+        draw(st.sets(st.integers(min_value=0, max_value=100), min_size=1))
+    )
+    pitch = draw(st.integers(min_value=-10, max_value=110))
+    return scale, pitch
+
+
+@hypothesis.given(
+    scale_and_pitch(),  # pylint: disable=no-value-for-parameter
+)
+def test_scale_index(tup):
+    scale, pitch = tup
+    scale_index = er_misc_funcs.ScaleIndex(scale)
+    assert (pitch in scale_index) == (pitch in scale)
+    if pitch in scale:
+        assert scale_index.index(pitch) == scale.index(pitch)
+        assert scale_index.transpose([pitch], 0) == [pitch]
+        # transposing out of the scale raises an IndexError at either end
+        for generic_interval in (
+            -scale.index(pitch) - 1,
+            len(scale) - scale.index(pitch),
+        ):
+            try:
+                scale_index.transpose([pitch], generic_interval)
+            except IndexError:
+                pass
+            else:
+                raise AssertionError
+        assert scale_index.nearest_index(
+            pitch, return_adjustment_sign=True
+        ) == (
+            scale.index(pitch),
+            0,
+        )
+        return
+    for up_or_down in (-1, 1):
+        assert scale_index.nearest_index(
+            pitch, up_or_down=up_or_down, return_adjustment_sign=True
+        ) == er_misc_funcs.get_scale_index(
+            scale, pitch, up_or_down=up_or_down, return_adjustment_sign=True
+        )
+    assert scale_index.nearest_index(pitch) in (
+        er_misc_funcs.get_scale_index(scale, pitch, up_or_down=-1),
+        er_misc_funcs.get_scale_index(scale, pitch, up_or_down=1),
+    )
+
+
 if __name__ == "__main__":
     test_check_modulo()
     test_check_interval_class()
@@ -471,4 +520,5 @@ if __name__ == "__main__":
     test_binary_search()  # pylint: disable=no-value-for-parameter
     test_binary_search_not_found()  # pylint: disable=no-value-for-parameter
     test_get_lowest_of_each_pc_in_set()
+    test_scale_index()  # pylint: disable=no-value-for-parameter
     test_flatten()
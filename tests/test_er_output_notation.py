@@ -9,10 +9,7 @@ from efficient_rhythms import er_misc_funcs
 from efficient_rhythms import er_classes
 
 
-def test_get_kern():
-    if not shutil.which("verovio"):
-        warnings.warn("verovio not found in path, skipping this test")
-        return
+def _score():
     # A case that was failing:
     notes = (
         ((60, 0, 1.75), (61, 1.75, 1.5), (62, 3.25, 0.75), (63, 4, 1)),
@@ -28,7 +25,14 @@ def test_get_kern():
     for voice_i, voice in enumerate(notes):
         for pitch, onset, dur in voice:
             score.add_note(voice_i, pitch, onset, dur)
-    kern = er_output_notation.get_kern(score)
+    return score
+
+
+def test_get_kern():
+    if not shutil.which("verovio"):
+        warnings.warn("verovio not found in path, skipping this test")
+        return
+    kern = er_output_notation.get_kern(_score())
     _, temp_path = tempfile.mkstemp()
     # If the input is incorrect, verovio should fail
     try:
@@ -41,6 +45,182 @@ def test_get_kern():
     os.remove(temp_path)
 
 
+def test_get_kern_output():
+    kern = er_output_notation.get_kern(_score())
+    assert kern.split("\n") == [
+        "**kern\t**kern",
+        "*M2/4\t*M2/4",
+        "*clefG2\t*clefF4",
+        "=1\t=1",
+        "[4c\t4C",
+        "8.c]\t4D-",
+        "[16d-\t.",
+        "=2\t=2",
+        "4d-\t4D",
+        "16d-]\t4E-",
+        "8.d\t.",
+        "=3\t=3",
+        "4e-\t4E",
+        "=3\t=3",
+        "*-\t*-",
+        "!!!filter: autobeam",
+    ]
+
+
+def test_split_kern():
+    kern = er_output_notation.get_kern(_score())
+    assert er_output_notation.split_kern(kern, chunk_measures=3) == [kern]
+    # The tie across the second bar line means the first chunk has to
+    #   include the second measure
+    chunks = er_output_notation.split_kern(kern, chunk_measures=1)
+    assert [chunk.split("\n")[3:-2] for chunk in chunks] == [
+        ["=1\t=1", "[4c\t4C", "8.c]\t4D-", "[16d-\t."]
+        + ["=2\t=2", "4d-\t4D", "16d-]\t4E-", "8.d\t.", "=3\t=3"],
+        ["=3\t=3", "4e-\t4E", "=3\t=3"],
+    ]
+    for chunk in chunks:
+        assert chunk.split("\n")[:3] == kern.split("\n")[:3]
+        assert chunk.split("\n")[-2:] == kern.split("\n")[-2:]
+
+
+STUBS = {
+    # writes one page per chunk, containing the kern input
+    "verovio": """
+        echo "verovio $1" >> "$STUB_LOG"
+        svg="${3%.svg}_001.svg"
+        cp "$1" "$svg"
+        echo "Output written to $svg"
+    """,
+    "convert": """
+        echo "convert $1" >> "$STUB_LOG"
+        cp "$1" "$2"
+    """,
+    "img2pdf": """
+        echo "img2pdf" >> "$STUB_LOG"
+        eval "pdf=\\${$#}"
+        while [ "$1" != "-o" ]; do cat "$1"; shift; done > "$pdf"
+    """,
+}
+
+
+def _install_stubs(tmp_path, monkeypatch, stubs):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    for name, script in stubs.items():
+        stub = bin_dir / name
+        stub.write_text("#!/bin/sh\n" + script)
+        stub.chmod(0o755)
+    log_path = tmp_path / "log"
+    log_path.touch()
+    monkeypatch.setenv("STUB_LOG", str(log_path))
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    return log_path
+
+
+def test_write_notation(tmp_path, monkeypatch):
+    log_path = _install_stubs(tmp_path, monkeypatch, STUBS)
+    temp_dir = tmp_path / "temp"
+    monkeypatch.setattr(er_output_notation, "TEMP_NOTATION_DIR", str(temp_dir))
+    monkeypatch.setattr(er_output_notation, "CHUNK_MEASURES", 1)
+    out_dir = tmp_path / "out"
+    out_dir.mkdir()
+    kern = er_output_notation.get_kern(_score())
+    chunks = er_output_notation.split_kern(kern)
+    assert len(chunks) == 2
+
+    kern_path = temp_dir / "score.krn"
+
+    def _write_notation(filetype, verovio_arguments=None):
+        er_output_notation.init_temp_notation_dir()
+        kern_path.write_text(kern)
+        er_output_notation.write_notation(
+            str(kern_path),
+            str(out_dir),
+            filetype=filetype,
+            verovio_arguments=verovio_arguments,
+            max_workers=2,
+            cache_dir=str(tmp_path / "cache"),
+        )
+        assert not temp_dir.exists()
+
+    _write_notation(".pdf")
+    log = log_path.read_text().split("\n")
+    assert len(log) == 6 and log[-2:] == ["img2pdf", ""]
+    assert (out_dir / "score.pdf").read_text() == "".join(chunks)
+    _write_notation(".png")
+    assert [path.read_text() for path in sorted(out_dir.glob("*.png"))] == [
+        chunks[0],
+        chunks[1],
+    ]
+    assert sorted(path.name for path in out_dir.glob("*.png")) == [
+        "score_001.png",
+        "score_002.png",
+    ]
+    # Unchanged scores are copied from the cache
+    log = log_path.read_text()
+    (out_dir / "score.pdf").unlink()
+    _write_notation(".pdf")
+    assert (out_dir / "score.pdf").read_text() == "".join(chunks)
+    assert log_path.read_text() == log
+
+    # Unless all pages are rendered, the score is rendered in one piece
+    monkeypatch.setattr(er_output_notation, "NOTATION_CACHE_SIZE", 2)
+    log_path.write_text("")
+    _write_notation(".svg", verovio_arguments="--page 2")
+    assert log_path.read_text() == f"verovio {kern_path}\n"
+    assert (out_dir / "score_001.svg").read_text() == kern
+    # Only the most recently used scores are kept in the cache (here, the pdf
+    #   and the svg)
+    assert len(os.listdir(tmp_path / "cache")) == 2
+    log = log_path.read_text()
+    _write_notation(".pdf")
+    assert log_path.read_text() == log
+    _write_notation(".png")
+    assert log_path.read_text() != log
+
+    # Cache hits restore the names of the pages that verovio wrote, also when
+    #   the score is rendered in one piece
+    monkeypatch.setattr(er_output_notation, "CHUNK_MEASURES", 3)
+    for filetype in (".svg", ".png"):
+        for path in out_dir.glob("*" + filetype):
+            path.unlink()
+        _write_notation(filetype)
+        log = log_path.read_text()
+        _write_notation(filetype)
+        assert log_path.read_text() == log
+        assert [path.name for path in out_dir.glob("*" + filetype)] == [
+            "score_001" + filetype
+        ]
+        assert (out_dir / ("score_001" + filetype)).read_text() == kern
+
+
+def test_write_notation_failure(tmp_path, monkeypatch):
+    # verovio exits successfully without writing anything
+    _install_stubs(
+        tmp_path, monkeypatch, dict(STUBS, verovio='echo "verovio $1"')
+    )
+    temp_dir = tmp_path / "temp"
+    monkeypatch.setattr(er_output_notation, "TEMP_NOTATION_DIR", str(temp_dir))
+    kern = er_output_notation.get_kern(_score())
+    kern_path = temp_dir / "score.krn"
+    cache_dir = tmp_path / "cache"
+    for chunk_measures in (3, 1):
+        monkeypatch.setattr(
+            er_output_notation, "CHUNK_MEASURES", chunk_measures
+        )
+        er_output_notation.init_temp_notation_dir()
+        kern_path.write_text(kern)
+        assert not er_output_notation.write_notation(
+            str(kern_path),
+            str(tmp_path),
+            filetype=".svg",
+            cache_dir=str(cache_dir),
+        )
+        assert not temp_dir.exists()
+        # Failed renders aren't cached
+        assert not cache_dir.exists() or not os.listdir(cache_dir)
+
+
 def test_dur_to_kern():
     # LONGTERM write more tests
     time_sig_dur = 2
@@ -64,4 +244,6 @@ def test_dur_to_kern():
 
 if __name__ == "__main__":
     test_get_kern()
+    test_get_kern_output()
+    test_split_kern()
     test_dur_to_kern()
@@ -0,0 +1,120 @@
+import glob
+import os
+
+import numpy as np
+import pytest
+
+from efficient_rhythms import PACKAGE_DIR
+from efficient_rhythms import er_constants
+from efficient_rhythms import er_parse
+
+
+def test_settings_files():
+    # All settings and changer files in the repository should be read
+    #   exactly as eval() would read them
+    paths = []
+    for pattern in (
+        "docs/examples/*.py",
+        "favorites/*.py",
+        "tests/test_settings/*.py",
+    ):
+        paths.extend(glob.glob(os.path.join(PACKAGE_DIR, pattern)))
+    assert paths
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as inf:
+            expected = eval(  # pylint: disable=eval-used
+                inf.read(), vars(er_constants)
+            )
+        assert repr(er_parse.read_settings_file(path)) == repr(expected)
+
+
+def test_parse_expression():
+    tests = [
+        ("(1, 2.5, 'a', None, True)", (1, 2.5, "a", None, True)),
+        ("{'a': [1, 2], **{'b': 3}}", {"a": [1, 2], "b": 3}),
+        ("-OCTAVE", -1 * er_constants.OCTAVE),
+        ("1 / 4 + 3 // 2 - 2 ** 3 % 5", 1 / 4 + 3 // 2 - 2**3 % 5),
+        ("CONTIGUOUS_OCTAVES * C * OCTAVE2", None),
+        ("[i for i in range(12) if i % 2]", [1, 3, 5, 7, 9, 11]),
+        ("{i: j for i, j in [(1, 2), (3, 4)]}", {1: 2, 3: 4}),
+        ("tuple(x * 2 for x in (1, 2))", (2, 4)),
+        ("MAJOR_SCALE[1:3]", er_constants.MAJOR_SCALE[1:3]),
+        ("max(1, 2) if 1 < 2 <= 2 else 0", 2),
+        ("C4", er_constants.C * er_constants.OCTAVE4),
+    ]
+    for expr, expected in tests:
+        if expected is None:
+            # eval is deliberately the reference implementation here:
+            # parse_expression() should agree with it on these safe
+            # expressions
+            expected = eval(  # pylint: disable=eval-used
+                expr, vars(er_constants)
+            )
+        assert np.array_equal(er_parse.parse_expression(expr), expected)
+    for pitch_str, expected in (
+        ("D#4", er_constants.D_SHARP * er_constants.OCTAVE4),
+        ("Bb2", er_constants.Bb * er_constants.OCTAVE2),
+        ("F## * OCTAVE3", er_constants.F_SHARP_SHARP * er_constants.OCTAVE3),
+    ):
+        assert er_parse.parse_pitch_str(pitch_str) == expected
+    for unsafe in (
+        "__import__('os').system('ls')",
+        "MAJOR_TRIAD.__class__",
+        "open('/etc/passwd')",
+        "np.array([1])",
+        "lambda: 1",
+        "(x := 1)",
+    ):
+        with pytest.raises(er_parse.SettingsParseError):
+            er_parse.parse_expression(unsafe)
+    # Cached expressions are evaluated anew, so the results can be mutated
+    first = er_parse.parse_pitch_str("C * MAJOR_TRIAD")
+    first[0] = 0
+    assert er_parse.parse_pitch_str("C * MAJOR_TRIAD")[0] == 1.0
+
+
+def test_json_and_toml(tmp_path):
+    expected = {
+        "num_voices": 3,
+        "chords": ["MAJOR_TRIAD", "C * MINOR_TRIAD"],
+        "foot_pcs": ["C", "D#"],
+    }
+    json_path = tmp_path / "settings.json"
+    json_path.write_text(
+        '{"num_voices": 3, "chords": ["MAJOR_TRIAD", "C * MINOR_TRIAD"], '
+        '"foot_pcs": ["C", "D#"]}'
+    )
+    assert er_parse.read_settings_file(str(json_path)) == expected
+    toml_path = tmp_path / "settings.toml"
+    toml_path.write_text(
+        'num_voices = 3\nchords = ["MAJOR_TRIAD", "C * MINOR_TRIAD"]\n'
+        'foot_pcs = ["C", "D#"]\n'
+    )
+    assert er_parse.read_settings_file(str(toml_path)) == expected
+
+
+def test_size_limits():
+    for too_large in (
+        "9 ** 9 ** 9",
+        "2 ** 100000",
+        "(10 ** 300) ** 300",
+        "[0 for i in range(10 ** 12)]",
+        "list(range(10 ** 12))",
+        "[0] * 10 ** 12",
+        "[(i, j) for i in range(1000) for j in range(1000)]",
+        "[[0 for j in range(1000)] for i in range(1000)]",
+    ):
+        with pytest.raises(er_parse.SettingsParseError):
+            er_parse.parse_expression(too_large)
+    # Expressions within the limits are unaffected
+    assert er_parse.parse_expression("2 ** 1024") == 2**1024
+    assert er_parse.parse_expression("2 ** (1 / 12)") == 2 ** (1 / 12)
+    assert len(er_parse.parse_expression("[0] * 1000")) == 1000
+    n = er_parse.MAX_LENGTH
+    assert er_parse.parse_expression(f"len([i for i in range({n})])") == n
+
+
+if __name__ == "__main__":
+    test_settings_files()
+    test_parse_expression()
+    test_size_limits()
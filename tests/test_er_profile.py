@@ -0,0 +1,94 @@
+import concurrent.futures
+import json
+import os
+import threading
+
+from efficient_rhythms import (
+    er_make,
+    er_make2,
+    er_make_handler,
+    er_profile,
+    er_rhythm,
+    er_settings,
+)
+
+
+def test_profiling(tmp_path):
+    originals = (
+        er_make._get_available_pcs,  # pylint: disable=protected-access
+        er_make2.check_consonance,
+        er_rhythm.pool.rhythms_handler,
+    )
+    er = er_settings.get_settings(
+        {"num_voices": 3, "num_harmonies": 2, "seed": 0}, silent=True
+    )
+    with er_profile.profiling() as profiler:
+        # Functions imported by name into other modules are wrapped too
+        assert er_rhythm.pool.rhythms_handler is not originals[2]
+        er_make_handler.make_super_pattern(er, debug=False)
+    assert (
+        er_make._get_available_pcs,  # pylint: disable=protected-access
+        er_make2.check_consonance,
+        er_rhythm.pool.rhythms_handler,
+    ) == originals
+    for phase in ("make super pattern", "initial pattern", "voice leading"):
+        assert profiler.phases[phase].calls == 1
+    # The "rhythms" phase includes the generation of the rhythms
+    assert (
+        profiler.phases["rhythms"].total_ns
+        >= profiler.phases["generate rhythm"].total_ns
+        > 0
+    )
+    assert profiler.phases["generate rhythm"].calls >= er.num_voices
+    rejections = profiler.rejections()
+    assert rejections["initial pattern"]["steps"] > 0
+    assert rejections["voice leading"]["steps"] > 0
+
+    json_path = os.path.join(tmp_path, "profile.json")
+    profiler.save_json(json_path)
+    with open(json_path, encoding="utf-8") as inf:
+        assert json.load(inf)["phases"]["choirs"]["calls"] == 1
+
+    trace_path = os.path.join(tmp_path, "trace.json")
+    profiler.save_chrome_trace(trace_path)
+    with open(trace_path, encoding="utf-8") as inf:
+        events = json.load(inf)["traceEvents"]
+    names = {event["name"] for event in events}
+    assert "initial pattern" in names
+    # Constraints are only recorded in aggregate
+    assert "available pcs" not in names
+
+
+def test_concurrent_profiling():
+    er = er_settings.get_settings(
+        {"num_voices": 2, "num_harmonies": 2, "seed": 0}, silent=True
+    )
+    barrier = threading.Barrier(2)
+
+    def _profile_builds(num_builds):
+        with er_profile.profiling() as profiler:
+            # Both threads are profiling while either builds
+            barrier.wait()
+            for _ in range(num_builds):
+                er_make_handler.make_super_pattern(er, debug=False)
+            barrier.wait()
+        return profiler
+
+    with concurrent.futures.ThreadPoolExecutor(2) as executor:
+        profilers = list(executor.map(_profile_builds, (1, 2)))
+    assert [
+        profiler.phases["make super pattern"].calls for profiler in profilers
+    ] == [1, 2]
+    # Builds in threads where profiling isn't enabled aren't recorded
+    with er_profile.profiling() as profiler:
+        with concurrent.futures.ThreadPoolExecutor(1) as executor:
+            executor.submit(
+                er_make_handler.make_super_pattern, er, debug=False
+            ).result()
+    assert not profiler.phases
+    assert er_profile.get_profiler() is None
+
+
+if __name__ == "__main__":
+    test_profiling("/tmp")
+    test_concurrent_profiling()
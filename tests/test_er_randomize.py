@@ -1,8 +1,17 @@
 import os
 import sys
 import traceback
+from fractions import Fraction
 
-from efficient_rhythms import er_choirs, er_exceptions, er_make, er_settings
+from efficient_rhythms import (
+    er_choirs,
+    er_exceptions,
+    er_make,
+    er_make_handler,
+    er_random_search,
+    er_randomize,
+    er_settings,
+)
 
 
 def test_many_seeds():
@@ -17,10 +26,15 @@ def test_many_seeds():
             "initial_pattern_attempts": 1,
             "voice_leading_attempts": 1,
             "max_available_pitch_materials_deadends": 50,
+            # The voice-leading search is exponential in the worst case, and
+            #   on some settings (e.g., seed 42) it runs practically forever,
+            #   so we build with a timeout. Timeouts are reported with the
+            #   other bad seeds.
+            "timeout": 10,
         }
         try:
             er = er_settings.get_settings(user_settings, random_settings=True)
-            super_pattern = er_make.make_super_pattern(er)
+            super_pattern = er_make_handler.make_super_pattern(er, debug=False)
             er_make.complete_pattern(er, super_pattern)
             er_choirs.assign_choirs(er, super_pattern)
         except er_exceptions.VoiceLeadingError:
@@ -39,5 +53,100 @@ def test_many_seeds():
         traceback.print_exception(exc_type, exc_value, exc_traceback, file=sys.stdout)
 
 
+def test_randomization_stats(tmp_path):
+    stats = er_randomize.RandomizationStats()
+    for num_voices in (2, 3, 4, 5):
+        for _ in range(20):
+            stats.record(
+                {"num_voices": num_voices},
+                failure_reason=None if num_voices == 3 else "ErTimeoutError",
+            )
+    path = os.path.join(tmp_path, "stats.json")
+    stats.save(path)
+    stats = er_randomize.RandomizationStats.load(path)
+    assert stats.failure_reasons == {None: 20, "ErTimeoutError": 60}
+    counts = {}
+    for seed in range(20):
+        er = er_settings.get_settings(
+            {"seed": seed},
+            random_settings=True,
+            silent=True,
+            randomization_stats=stats,
+        )
+        counts[er.num_voices] = counts.get(er.num_voices, 0) + 1
+    # Each other value is redrawn up to er_randomize.MAX_REDRAWS times, so
+    # num_voices should almost always be 3
+    assert counts.get(3, 0) >= 15
+
+
+def test_randomization_stats_pairs():
+    # cont_rhythms = "all" and onset_subdivision = 1/3 each succeed on their
+    #   own but fail together
+    stats = er_randomize.RandomizationStats()
+    for _ in range(10):
+        stats.record(
+            {"cont_rhythms": "all", "onset_subdivision": Fraction(1, 3)},
+            failure_reason="ErTimeoutError",
+        )
+        stats.record(
+            {"cont_rhythms": "all", "onset_subdivision": Fraction(1, 4)}
+        )
+        stats.record(
+            {"cont_rhythms": "none", "onset_subdivision": Fraction(1, 3)}
+        )
+    stats = er_randomize.RandomizationStats.from_dict(stats.to_dict())
+    for val in ("all", "none"):
+        assert stats.weight("cont_rhythms", val) == 1.0
+    assert stats.weight("onset_subdivision", Fraction(1, 3)) == 1.0
+    assert (
+        stats.weight(
+            "onset_subdivision",
+            Fraction(1, 3),
+            {"cont_rhythms": "none", "tempo": 120},
+        )
+        == 1.0
+    )
+    assert (
+        stats.weight(
+            "onset_subdivision", Fraction(1, 3), {"cont_rhythms": "all"}
+        )
+        < 0.1
+    )
+    assert (
+        stats.weight(
+            "onset_subdivision", Fraction(1, 4), {"cont_rhythms": "all"}
+        )
+        == 1.0
+    )
+
+
+def test_random_search():
+    user_settings = {
+        "initial_pattern_attempts": 1,
+        "voice_leading_attempts": 1,
+        "max_available_pitch_materials_deadends": 50,
+    }
+    stats = er_randomize.RandomizationStats()
+    candidates = er_random_search.random_search(
+        user_settings,
+        num_results=2,
+        jobs=2,
+        stats=stats,
+        timeout=5,
+        seed=0,
+        print_out=False,
+    )
+    assert len(candidates) == 2
+    assert stats.successes == 2
+    for candidate in candidates:
+        assert candidate.success
+        assert candidate.pattern.num_voices == candidate.settings.num_voices
+        assert (
+            candidate.settings.randomized_values.keys()
+            == candidate.values.keys()
+        )
+
+
 if __name__ == "__main__":
     test_many_seeds()
+    test_randomization_stats_pairs()
@@ -0,0 +1,92 @@
+import concurrent.futures
+import random
+
+import numpy as np
+
+from efficient_rhythms import (
+    er_changers,
+    er_globals,
+    er_make,
+    er_rng,
+    er_settings,
+)
+
+SETTINGS = {
+    "num_voices": 3,
+    "num_harmonies": 4,
+    "harmony_len": 2,
+    "pattern_len": 4,
+    "seed": 7,
+}
+
+
+def _build(settings):
+    er = er_settings.get_settings(settings, silent=True)
+    super_pattern = er_make.make_super_pattern(er)
+    return [
+        (note.voice, note.pitch, note.onset, note.dur)
+        for voice in super_pattern
+        for note in voice
+    ]
+
+
+def test_streams():
+    streams = er_rng.RNGStreams(0)
+    first = streams.generator("rhythm", 1).random(4)
+    # requesting other streams in between doesn't affect a stream
+    streams.generator("rhythm", 0).random(100)
+    assert np.array_equal(
+        er_rng.RNGStreams(0).generator("rhythm", 1).random(4), first
+    )
+    assert not np.array_equal(streams.generator("rhythm", 2).random(4), first)
+    assert np.array_equal(streams.child("rhythm").generator(1).random(4), first)
+
+
+def test_build_reproducible():
+    notes = _build(SETTINGS)
+    assert notes
+    # the streams are derived from the seed of the settings, so the state of
+    #   the global generators after the settings are processed doesn't matter
+    er = er_settings.get_settings(SETTINGS, silent=True)
+    random.seed(1234)
+    er_globals.RNG = np.random.default_rng(1234)
+    super_pattern = er_make.make_super_pattern(er)
+    assert [
+        (note.voice, note.pitch, note.onset, note.dur)
+        for voice in super_pattern
+        for note in voice
+    ] == notes
+    assert _build(SETTINGS | {"seed": 8}) != notes
+
+
+def test_build_in_worker_process():
+    serial = [_build(SETTINGS | {"seed": seed}) for seed in (7, 8)]
+    with concurrent.futures.ProcessPoolExecutor(2) as executor:
+        parallel = list(
+            executor.map(_build, [SETTINGS | {"seed": seed} for seed in (7, 8)])
+        )
+    assert parallel == serial
+
+
+def test_changers_reproducible():
+    er = er_settings.get_settings(SETTINGS, silent=True)
+    super_pattern = er_make.make_super_pattern(er)
+    changed = []
+    for _ in range(2):
+        changers = {
+            0: er_changers.RandomOctaveTransformer(super_pattern),
+            1: er_changers.VelocityTransformer(super_pattern, humanize=20),
+        }
+        changed.append(er_changers.apply(super_pattern, changers, seed=er.seed))
+    assert [
+        [(note.pitch, note.velocity) for note in voice] for voice in changed[0]
+    ] == [
+        [(note.pitch, note.velocity) for note in voice] for voice in changed[1]
+    ]
+
+
+if __name__ == "__main__":
+    test_streams()
+    test_build_reproducible()
+    test_build_in_worker_process()
+    test_changers_reproducible()
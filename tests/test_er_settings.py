@@ -1,6 +1,9 @@
+import os
+import pickle
 import typing
 
 import numpy as np
+import pytest
 
 from efficient_rhythms import er_settings
 from efficient_rhythms import er_constants
@@ -119,8 +122,128 @@ def test_replace_pitch_constants():
         assert np.equal(out, vals).all()
 
 
+def _state(er):
+    return {
+        attr: repr(val)
+        for attr, val in vars(er).items()
+        if attr not in ("build_status_printer", "_silent")
+    }
+
+
+def test_cached_settings(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    output_path = str(tmp_path / "effrhy.mid")
+    settings_path = str(tmp_path / "settings.py")
+    with open(settings_path, "w", encoding="utf-8") as outf:
+        outf.write(
+            '{"num_voices": 3, "foot_pcs": (0, 5, 7, 0), '
+            '"scales": [DIATONIC_SCALE], "voice_ranges": CONTIGUOUS_OCTAVES * OCTAVE3 * C}'
+        )
+    for seed in (1, 2):
+        er = er_settings.get_settings(
+            [settings_path], seed=seed, silent=True, output_path=output_path
+        )
+        for _ in range(2):  # first compile, then load
+            cached_er = er_settings.get_cached_settings(
+                [settings_path],
+                seed=seed,
+                silent=True,
+                output_path=output_path,
+                cache_dir=cache_dir,
+            )
+            assert _state(cached_er) == _state(er)
+    assert len(os.listdir(cache_dir)) == 1
+    with open(os.path.join(cache_dir, os.listdir(cache_dir)[0]), "rb") as inf:
+        assert not pickle.load(inf)["seed_dependent"]
+
+    # the snapshot is invalidated when the settings file changes
+    with open(settings_path, "w", encoding="utf-8") as outf:
+        outf.write('{"num_voices": 4, "foot_pcs": (0, 5, 7, 0)}')
+    cached_er = er_settings.get_cached_settings(
+        [settings_path], seed=1, silent=True, cache_dir=cache_dir
+    )
+    assert cached_er.num_voices == 4
+    assert len(os.listdir(cache_dir)) == 2
+
+    # settings that depend on the seed (here because foot_pcs are chosen at
+    # random) aren't snapshotted
+    user_settings = {"num_voices": 2}
+    for seed in (1, 2):
+        er = er_settings.get_settings(
+            user_settings.copy(), seed=seed, silent=True
+        )
+        cached_er = er_settings.get_cached_settings(
+            user_settings, seed=seed, silent=True, cache_dir=cache_dir
+        )
+        assert cached_er.foot_pcs == er.foot_pcs
+    snapshot_path = os.path.join(
+        cache_dir, er_settings.snapshot.snapshot_key(user_settings) + ".pickle"
+    )
+    with open(snapshot_path, "rb") as inf:
+        snapshot = pickle.load(inf)
+    assert snapshot["seed_dependent"] and snapshot["state"] is None
+    assert cached_er._random_fields == ("foot_pcs",)
+
+    er_settings.clear_settings_cache(cache_dir)
+    assert not os.path.exists(cache_dir)
+
+
+def test_cached_settings_cache_limits(tmp_path, monkeypatch):
+    user_settings = {"num_voices": 2, "foot_pcs": (0, 5, 7, 0)}
+    # if the cache can't be written to, we warn and return the settings
+    blocker = tmp_path / "blocker"
+    blocker.touch()
+    with pytest.warns(UserWarning, match="Unable to write settings snapshot"):
+        er = er_settings.get_cached_settings(
+            user_settings,
+            seed=1,
+            silent=True,
+            cache_dir=str(blocker / "cache"),
+        )
+    assert er.num_voices == 2
+
+    # only the most recently used snapshots are kept
+    monkeypatch.setattr(er_settings.snapshot, "SETTINGS_CACHE_SIZE", 2)
+    cache_dir = str(tmp_path / "cache")
+    for num_voices in (2, 3, 4):
+        er_settings.get_cached_settings(
+            dict(user_settings, num_voices=num_voices),
+            seed=1,
+            silent=True,
+            cache_dir=cache_dir,
+        )
+    assert sorted(os.listdir(cache_dir)) == sorted(
+        er_settings.snapshot.snapshot_key(dict(user_settings, num_voices=n))
+        + ".pickle"
+        for n in (3, 4)
+    )
+
+
+def test_views():
+    settings = [
+        {"num_voices": 3},
+        {
+            "num_voices": 4,
+            "num_harmonies": 3,
+            "max_alternations": [2, 3],
+            "pitch_loop": [4, 0, 2],
+            "consonance_modulo": [[0.5], [0.25]],
+        },
+    ]
+    for user_settings in settings:
+        er = er_settings.get_settings(user_settings, silent=True)
+        for i in range(2 * er.num_voices + 3):
+            for attr in er_settings.views.VOICE_VIEW_ATTRS:
+                assert getattr(er.voice[i], attr) is er.get(i, attr)
+        harmony_attrs = er_settings.views.HARMONY_VIEW_ATTRS
+        for i in range(2 * er.num_harmonies + 3):
+            for attr, view_attr in harmony_attrs.items():
+                assert getattr(er.harmony[i], view_attr) is er.get(i, attr)
+
+
 if __name__ == "__main__":
     test_categories()
     test_field_process()
     test_from_if_none()
     test_replace_pitch_constants()
+    test_views()
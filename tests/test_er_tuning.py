@@ -17,5 +17,34 @@ def test_approximate_just_interval():
         ), "er_tuning.approximate_just_interval(item, tet) != return_value"
 
 
+def test_temper_pitch_materials():
+    intervals = [3 / 2, 5 / 4, 7 / 4, 1 / 3, -9 / 8, 2.0, er_constants.A]
+    pitches = [0, 11, 12, 60, 61, 127]
+    for tet in (12, 19, 31, 53, 72, 1000):
+        just = er_tuning.approximate_just_intervals(intervals, tet).tolist()
+        assert just == [
+            er_tuning.approximate_just_interval(item, tet) for item in intervals
+        ]
+        tempered = er_tuning.approximate_12_tet_pitches(pitches, tet).tolist()
+        assert tempered == [
+            er_tuning.approximate_12_tet_pitch(pitch, tet) for pitch in pitches
+        ]
+        # The nesting is restored, with lists in place of other iterables
+        materials = (tuple(intervals), [None, tuple(pitches)], None, 3 / 2)
+        assert er_tuning.temper_pitch_materials(materials, tet) == [
+            just,
+            [None, pitches],
+            None,
+            just[0],
+        ]
+        assert er_tuning.temper_pitch_materials(
+            materials, tet, integers_in_12_tet=True
+        ) == [just, [None, tempered], None, just[0]]
+        split_points = [60, [3 / 2]]
+        er_tuning.temper_pitch_materials_in_place(split_points, tet, True)
+        assert split_points == [tempered[3], [just[0]]]
+
+
 if __name__ == "__main__":
     test_approximate_just_interval()
+    test_temper_pitch_materials()
@@ -0,0 +1,55 @@
+import json
+import os
+import subprocess
+import sys
+
+from efficient_rhythms import PACKAGE_DIR
+
+# Modules that should not be imported by a headless build from the command
+# line
+HEAVY_MODULES = (
+    "pygame",
+    "mspell",
+    "efficient_rhythms.er_playback",
+    "efficient_rhythms.er_output_notation",
+)
+
+
+def _imported_modules(statement):
+    # We run the import in a fresh interpreter so that the modules imported
+    # by the tests themselves don't interfere
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            f"{statement}; import json, sys; print(json.dumps(list(sys.modules)))",
+        ],
+        cwd=os.path.realpath(PACKAGE_DIR),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return set(json.loads(result.stdout.splitlines()[-1]))
+
+
+def test_headless_imports():
+    imported = _imported_modules("import efficient_rhythms.__main__")
+    assert "efficient_rhythms.er_make_handler" in imported
+    for module in HEAVY_MODULES:
+        assert module not in imported, f"{module} imported at startup"
+
+
+def test_lazy_attrs():
+    imported = _imported_modules("import efficient_rhythms")
+    assert "efficient_rhythms.er_make_handler" not in imported
+    imported = _imported_modules(
+        "from efficient_rhythms import get_settings, make_super_pattern"
+    )
+    assert "efficient_rhythms.er_make_handler" in imported
+    for module in HEAVY_MODULES:
+        assert module not in imported, f"{module} imported"
+
+
+if __name__ == "__main__":
+    test_headless_imports()
+    test_lazy_attrs()